@@ -11,6 +11,8 @@ from janitor import clean_names              # snake_case 형식으로 컬럼명
 from tqdm import tqdm
 import logging
 
+from date_index import add_contract_dates, datetime_to_month_idx, set_month_columns
+
 # ---------------------------------------------------------------------------
 # 1. CLI 설정.
 # ---------------------------------------------------------------------------
@@ -35,8 +37,8 @@ OUT.mkdir(exist_ok=True, parents=True)
 # ---------------------------------------------------------------------------
 def _prep_date(df, col):
     df[col] = pd.to_datetime(df[col])
-    df["year_month"] = df[col].dt.to_period("M").dt.to_timestamp()
-    return df
+    # year_month·month_idx는 월 인덱스 정수 연산으로 생성(to_period 재파싱 없음)
+    return set_month_columns(df, datetime_to_month_idx(df[col]))
 
 # ---------------------------------------------------------------------------
 # 3. 레이어 로드.
@@ -71,19 +73,13 @@ if "계약년월" in B.columns and "계약일" in B.columns:
         '시군구': 'region_full'
     })
     # 계약일 생성
-    # 계약년월, 계약일 float에 .0 제거 후 정수->문자열로 변환하여 정확한 날짜 파싱
-    ym = B['contract_ym'].fillna(0).astype(int).astype(str)
-    day = B['contract_day'].fillna(0).astype(int).astype(str).str.zfill(2)
-    B['contract_date'] = pd.to_datetime(
-        ym + day,
-        format='%Y%m%d', errors='coerce'
-    )
+    # 계약년월·계약일 정수 필드에서 NumPy 연산으로 contract_date·year_month·month_idx 생성
+    # (결측·잘못된 일자는 NaT)
+    B = add_contract_dates(B)
     # 문자열→숫자(만원 단위), NaN은 0 처리 후 원 단위 환산
     B['price'] = pd.to_numeric(B['price'].str.replace(',', '', regex=False), errors='coerce').fillna(0).astype(int) * 10000
     # area_m2 숫자
     B['area_m2'] = B['area_m2'].astype(float)
-    # period 처리
-    B = _prep_date(B, 'contract_date')
     # complex_id 초기화
     B['complex_id'] = np.nan
 else:
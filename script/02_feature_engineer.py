@@ -8,6 +8,9 @@ from janitor import clean_names
 from tqdm import tqdm
 import unicodedata  # 한글 NFC 정규화를 위한 유니코드 정규화
 
+from date_index import (MONTH_IDX_COL, add_contract_dates, datetime_to_month_idx,
+                        ensure_month_idx, month_idx_values, set_month_columns)
+
 # ---------------------------------------------------------------------------
 # 1. CLI 설정.
 # ---------------------------------------------------------------------------
@@ -48,17 +51,16 @@ if "일반공급_경쟁률" in df.columns:
 # ---------------------------------------------------------------------------
 # 3. 날짜 누락 보강 및 파싱.
 # ---------------------------------------------------------------------------
-# 1) contract_ym, contract_day 기반으로 contract_date 보강
+# 1) contract_ym, contract_day 기반으로 contract_date 보강(결측 일자는 1일)
+#    → contract_date·year_month·month_idx를 정수 연산으로 함께 갱신
 if "contract_ym" in df.columns and "contract_day" in df.columns:
-    ym_str = df["contract_ym"].fillna(0).astype(int).astype(str).str.zfill(6)
-    day_str = df["contract_day"].fillna(1).astype(int).astype(str).str.zfill(2)
-    df["contract_date"] = df.get("contract_date").fillna(
-        pd.to_datetime(ym_str + day_str, format="%Y%m%d", errors="coerce"))
-# 2) contract_date 기반 year_month 생성
-if "contract_date" in df.columns:
-    df["year_month"] = pd.to_datetime(df["contract_date"]).dt.to_period("M").dt.to_timestamp()
-# 3) contract_year 추출
-df["contract_year"] = df["year_month"].dt.year
+    df = add_contract_dates(df, default_day=1, fill_existing=True)
+# 2) contract_date 기반 year_month·month_idx 생성
+elif "contract_date" in df.columns:
+    df = set_month_columns(df, datetime_to_month_idx(df["contract_date"]))
+df = ensure_month_idx(df)
+# 3) contract_year 추출(month_idx 정수 연산)
+df["contract_year"] = np.floor_divide(month_idx_values(df), 12) + 1970
 
 # built_year 파생: 사용승인일 컬럼이 있으면 연도만 추출하여 built_year로 설정
 if "built_year" not in df.columns and "사용승인일" in df.columns:
@@ -119,14 +121,14 @@ missing_rate = df.isna().mean()
 print("▶ Missing rate per column (top 10):", missing_rate.sort_values(ascending=False).head(10).to_dict())
 _initial_drop = missing_rate[missing_rate > args.drop_threshold].index.tolist()
 # key 컬럼 보호: multiindex와 주요 파생 변수를 위해 제외
-protected = {"complex_id","year_month","price","area_m2","contract_date","contract_year"}
+protected = {"complex_id","year_month",MONTH_IDX_COL,"price","area_m2","contract_date","contract_year"}
 drop_cols = [c for c in _initial_drop if c not in protected]
 if drop_cols:
     print(f"⚠️  Removing high-NA columns (>{args.drop_threshold:%}):", drop_cols)
     df.drop(columns=drop_cols, inplace=True)
 
 # 잔여 결측 → 단지/지역 단위 평균 대체 (drop된 컬럼 제외)
-for col in [c for c in num_cols if c in df.columns]:
+for col in [c for c in num_cols if c in df.columns and c != MONTH_IDX_COL]:
     if df[col].isna().any():
         df[col] = df.groupby("complex_id")[col].transform(
             lambda s: s.fillna(s.mean()))
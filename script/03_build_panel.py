@@ -5,6 +5,10 @@ import pandas as pd
 from janitor import clean_names
 import unicodedata
 
+from date_index import ensure_month_idx, month_idx_to_yyyymm, month_idx_values
+from panel_builder import PANEL_KEYS, build_panels
+from panel_io import write_panel
+
 # ---------------------------------------------------------------------------
 # 1. CLI 설정.
 # ---------------------------------------------------------------------------
@@ -22,7 +26,7 @@ parser.add_argument(
 parser.add_argument(
     "--add_time_dummies",
     action="store_true",
-    help="월별 고정효과(dummy) 변수를 추가 생성"
+    help="월별 고정효과(dummy) 변수를 추가 생성 (모델링에는 07 단계 --absorb year_month 권장: 더미 없이 흡수)"
 )
 parser.add_argument(
     "--sparse_dummies",
@@ -34,6 +38,17 @@ parser.add_argument(
     default="tm",
     help="시간 더미 변수의 접두사 (기본: tm)"
 )
+parser.add_argument(
+    "--dedup",
+    choices=["first", "none"],
+    default="first",
+    help="거래 단위 패널 중복 처리: first=키별 첫 행 유지, none=모든 거래 유지"
+)
+parser.add_argument(
+    "--output_agg",
+    default="output/panel_agg.parquet",
+    help="단지×월 집계 패널 저장 경로 (빈 문자열이면 생략)"
+)
 args = parser.parse_args()
 
 IN  = Path(args.input)
@@ -52,8 +67,10 @@ df.columns = [unicodedata.normalize("NFC", c.strip()) for c in df.columns]
 # 3. 시간 식별자 생성.
 # ---------------------------------------------------------------------------
 df["year_month"] = pd.to_datetime(df["year_month"])
+# 02 단계에서 계산된 month_idx 재사용(없을 때만 year_month에서 파생).
+df = ensure_month_idx(df)
 # YYYYMM 형식의 정수로 변환(예: 2021-07 → 202107).
-df["time_id"] = df["year_month"].dt.year * 100 + df["year_month"].dt.month
+df["time_id"] = pd.array(month_idx_to_yyyymm(month_idx_values(df)), dtype="Int64")
 print(f"▶ Created time_id, unique periods: {df['time_id'].nunique()}")
 
 # ---------------------------------------------------------------------------
@@ -74,18 +91,21 @@ if args.add_time_dummies:
     df = pd.concat([df, dummies], axis=1)
 
 # ---------------------------------------------------------------------------
-# 5. 인덱스 설정 및 중복 제거.
+# 5. 인덱스 설정 및 단지×월 집계(단일 정렬·groupby 패스).
 # ---------------------------------------------------------------------------
-print("▶ Setting complex_id and year_month as multiindex and removing duplicates")
+print(f"▶ Building transaction panel (dedup={args.dedup}) and complex-month aggregate panel")
 initial = len(df)
-df.set_index(["complex_id", "year_month"], inplace=True)
-# 동일 complex_id+year_month가 중복되면 첫 행만 유지.
-df = df[~df.index.duplicated(keep="first")]
+# 거래 단위 패널(complex_id, year_month MultiIndex)과 집계 패널을 함께 생성.
+df, agg = build_panels(df, keys=PANEL_KEYS, dedup=args.dedup)
 removed = initial - len(df)
 print(f"▶ Duplicate removal: {removed} rows removed, final rows: {len(df)}")
+print(f"▶ Aggregated panel: {len(agg)} complex-months, median trades/key={agg['n_trades'].median():.0f}")
 
 # ---------------------------------------------------------------------------
 # 6. 저장.
 # ---------------------------------------------------------------------------
-df.to_parquet(OUT)
+write_panel(df, OUT)
 print(f"✅ Panel dataset saved → {OUT} ({len(df)} rows × {df.shape[1]} cols)")
+if args.output_agg:
+    write_panel(agg, args.output_agg)
+    print(f"✅ Aggregated panel saved → {args.output_agg} ({len(agg)} rows × {agg.shape[1]} cols)")
@@ -1,13 +1,18 @@
 import argparse
+import json
 from pathlib import Path
 
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
 from scipy import stats
-import matplotlib.pyplot as plt
-from statsmodels.stats.outliers_influence import variance_inflation_factor
 from unidecode import unidecode  # 영문 전용 레이블을 위해 컬럼명을 ASCII로 음역.
 
+from collinearity import MomentAccumulator, collinearity_report
+from corr_topk import ColumnBuffer, topk_correlations
+from figure_service import FigureQueue
+from qc_profiler import numeric_columns, profile_parquet
+
 # ---------------------------------------------------------------------------
 # 1. CLI 설정.
 # ---------------------------------------------------------------------------
@@ -16,94 +21,134 @@ parser.add_argument("--input",  default="output/panel_panel.parquet",
                     help="03단계 출력 패널 데이터 경로")
 parser.add_argument("--output_dir", default="output",
                     help="QC 결과 저장 디렉토리")
+parser.add_argument("--sample_size", type=int, default=5000,
+                    help="Shapiro/Box-Cox용 균등 표본 크기(스트리밍 bottom-k 표본)")
+parser.add_argument("--corr_topk", type=int, default=50,
+                    help="저장할 |상관| 상위 피처 쌍 수")
+parser.add_argument("--corr_per_feature", type=int, default=5,
+                    help="피처별로 저장할 |상관| 상위 상대 피처 수(0이면 생략)")
+parser.add_argument("--corr_block", type=int, default=512,
+                    help="상관 탐색 블록 크기(컬럼 수)")
+parser.add_argument("--fig_jobs", type=int, default=2,
+                    help="그림 렌더링 워커 프로세스 수(0이면 순차 렌더링)")
 args = parser.parse_args()
 
 IN_PATH  = Path(args.input)
 OUT_DIR  = Path(args.output_dir)
 OUT_DIR.mkdir(exist_ok=True, parents=True)
+figs = FigureQueue(OUT_DIR, n_jobs=args.fig_jobs)
 
 # ---------------------------------------------------------------------------
-# 2. 데이터 로드 및 컬럼명 ASCII 음역.
+# 2. 수치형 컬럼 선택(스키마만 조회) 및 ASCII 음역 레이블.
 # ---------------------------------------------------------------------------
-df = pd.read_parquet(IN_PATH)
-# 컬럼명 한글 → ASCII 음역.
-df.columns = [unidecode(c) for c in df.columns]
-all_num = df.select_dtypes(include=[np.number]).columns.tolist()
 exclude_prefixes = ('reg_','tm_')  # 지역/시간 더미 변수 접두사.
-num_cols = [c for c in all_num if c != 'time_id' and not any(c.startswith(p) for p in exclude_prefixes)]
+raw_cols = [c for c in numeric_columns(IN_PATH)
+            if c not in ('time_id', 'month_idx') and not any(unidecode(c).startswith(p) for p in exclude_prefixes)]
+# 컬럼명 한글 → ASCII 음역(출력 레이블용).
+label = {c: unidecode(c) for c in raw_cols}
+norm_feats = ["price_per_m2", "ln_price", "built_age", "unsold_units_12m", "comp_rate_ma3"]
 
 # ---------------------------------------------------------------------------
-# 3. 결측률 분석.
+# 3. row group 단일 패스 프로파일링.
+# ---------------------------------------------------------------------------
+# 결측·적률·분위수 스케치, VIF용 공적률을 누적하고, 같은 패스에서 상관 탐색용 float32
+# 행렬을 채운다(쌍별 p×p 합은 누적하지 않음).
+vif_acc = MomentAccumulator(raw_cols)
+corr_buf = ColumnBuffer(raw_cols, pq.ParquetFile(IN_PATH).metadata.num_rows)
+profile = profile_parquet(IN_PATH, raw_cols, consumers=[vif_acc.update, corr_buf.update],
+                          sample_cols=[c for c in raw_cols if label[c] in norm_feats],
+                          sample_size=args.sample_size, pairwise=False)
+print(f"▶ Profiled {profile.n_rows} rows × {len(raw_cols)} numeric cols in one pass")
+summary = profile.summary().rename(index=label)
+summary.to_csv(OUT_DIR / "qc_profile.csv", index_label="feature")
+
 # ---------------------------------------------------------------------------
-missing_rate = df[num_cols].isna().mean().sort_values(ascending=False)
+# 4. 결측률 분석.
+# ---------------------------------------------------------------------------
+missing_rate = summary["missing_rate"].sort_values(ascending=False)
 missing_rate.to_csv(OUT_DIR / "qc_missing_rate.csv", header=["missing_rate"])
 
-# 시각화: 상위 50개 변수 결측 히트맵
-plt.figure(figsize=(10,6))
-plt.barh(missing_rate.head(50).index[::-1],
-         missing_rate.head(50).values[::-1])
-plt.xlabel("Missing Rate")
-plt.title("Top 50 Features by Missing Rate")
-plt.tight_layout()
-plt.savefig(OUT_DIR / "fig_missing_rate.png", dpi=150)
-plt.close()
+# 시각화: 상위 50개 변수 결측 히트맵(백그라운드 렌더링)
+figs.submit(OUT_DIR / "fig_missing_rate.png", "barh",
+            {"labels": missing_rate.head(50).index[::-1].tolist(),
+             "values": missing_rate.head(50).values[::-1]},
+            figsize=(10, 6), xlabel="Missing Rate", title="Top 50 Features by Missing Rate")
 
 # ---------------------------------------------------------------------------
-# 4. 정규성 검사(Shapiro–Wilk) 및 Box-Cox 변환 최적 λ.
+# 5. 정규성 검사(Shapiro–Wilk) 및 Box-Cox 변환 최적 λ.
 # ---------------------------------------------------------------------------
+# 왜도·첨도·Jarque–Bera는 전체 행 적률, Shapiro·Box-Cox λ는 균등 표본 기반.
 qc_norm = []
-for col in ["price_per_m2", "ln_price", "built_age",
-            "unsold_units_12m", "comp_rate_ma3"]:
-    if col in df:
-        series = df[col].dropna()
-        # Shapiro–Wilk 검정(표본이 5000개 이상일 경우 샘플링).
-        samp = series if len(series)<=5000 else series.sample(5000, random_state=0)
+raw_by_label = {v: k for k, v in label.items()}
+for col in norm_feats:
+    if col in raw_by_label:
+        samp = profile.sample(raw_by_label[col])
+        if len(samp) < 3:
+            continue
         stat, pval = stats.shapiro(samp)
         # Box-Cox 변환(양수 값만).
-        if (series>0).all():
-            bc_data, bc_lambda = stats.boxcox(series)
+        if summary.loc[col, "min"] > 0:
+            bc_data, bc_lambda = stats.boxcox(samp)
         else:
             bc_lambda = np.nan
         qc_norm.append({
             "feature": col,
-            "n": len(series),
+            "n": int(summary.loc[col, "n"]),
             "shapiro_p": pval,
-            "boxcox_lambda": bc_lambda
+            "boxcox_lambda": bc_lambda,
+            "skew": summary.loc[col, "skew"],
+            "kurtosis": summary.loc[col, "kurtosis"],
+            "jb_p": summary.loc[col, "jb_p"],
         })
 qc_norm_df = pd.DataFrame(qc_norm)
 qc_norm_df.to_csv(OUT_DIR / "qc_shapiro_boxcox.csv", index=False)
 
 # ---------------------------------------------------------------------------
-# 5. 다중공선성(VIF).
+# 6. 다중공선성(VIF).
 # ---------------------------------------------------------------------------
-# VIF 계산을 위해 상수항 포함.
-vif_df = pd.DataFrame(columns=["feature","vif"])
-X = df[num_cols].dropna().iloc[:5000]  # 속도 위해 표본 5k
-X = X.assign(const=1.0)
-for i, col in enumerate(X.columns):
-    if col == "const":
-        continue
-    vif = variance_inflation_factor(X.values, i)
-    # pandas 2.x: DataFrame.append가 deprecated되어 loc로 행 추가.
-    vif_df.loc[len(vif_df)] = [col, vif]
-vif_df.sort_values("vif", ascending=False).to_csv(OUT_DIR / "qc_vif.csv", index=False)
+# 전체 행(결측 행 제외)의 공적률을 row group 단위로 누적 → 상관행렬 역행렬 대각으로 VIF 일괄 계산.
+# (상수항 포함 회귀의 VIF와 동일; 표본 추출 편향 없음)
+colin = collinearity_report(vif_acc)
+colin["vif"]["feature"] = colin["vif"]["feature"].map(label)
+colin["near_duplicates"][["feature_a", "feature_b"]] = colin["near_duplicates"][["feature_a", "feature_b"]].apply(lambda s: s.map(label))
+colin["vif"].sort_values("vif", ascending=False).to_csv(OUT_DIR / "qc_vif.csv", index=False)
+colin["near_duplicates"].to_csv(OUT_DIR / "qc_near_duplicates.csv", index=False)
+(OUT_DIR / "qc_collinearity.json").write_text(json.dumps({
+    "n_rows": colin["n_rows"],
+    "condition_number": colin["condition_number"],
+    "top_condition_indices": colin["condition_indices"][::-1][:10].tolist(),
+    "n_near_duplicate_pairs": len(colin["near_duplicates"]),
+    "constant_columns": [label[c] for c in colin["constant"]],
+}, indent=2, ensure_ascii=False))
+print(f"▶ VIF computed on {colin['n_rows']} rows, condition number={colin['condition_number']:.1f}")
 
 # ---------------------------------------------------------------------------
-# 6. 상관관계 히트맵.
+# 7. 상위 상관 탐색 및 히트맵.
 # ---------------------------------------------------------------------------
-corr = df[num_cols].corr().abs()
-# 상위 20개 피처 선택.
-top_feats = missing_rate.head(20).index.tolist()
-sub_corr = corr.loc[top_feats, top_feats]
+# float32 행렬을 프로파일러의 전체 행 평균·표준편차로 제자리 표준화한 뒤 컬럼 블록 쌍마다
+# BLAS 행렬곱으로 상관(쌍별 완전 관측 정의)을 계산해 |상관| 상위 쌍만 유지.
+# 히트맵 피처: 상관이 가장 강한 쌍에 등장하는 순서로 20개 → 그 컬럼들의 부분 상관행렬만 계산.
+corr_res = topk_correlations(corr_buf.values, raw_cols, k=args.corr_topk, per_feature=args.corr_per_feature,
+                             block=args.corr_block, mean=summary["mean"].to_numpy(),
+                             std=summary["std"].to_numpy(), n_features=20)
+del corr_buf
+sub_corr = corr_res["submatrix"].abs()
+top_feats = [label[c] for c in corr_res["features"]]
+
+pairs = corr_res["pairs"]
+pairs[["feature_a", "feature_b"]] = pairs[["feature_a", "feature_b"]].apply(lambda s: s.map(label))
+pairs.to_csv(OUT_DIR / "qc_top_corr_pairs.csv", index=False)
+if "per_feature" in corr_res:
+    per_feat = corr_res["per_feature"]
+    per_feat[["feature", "partner"]] = per_feat[["feature", "partner"]].apply(lambda s: s.map(label))
+    per_feat.to_csv(OUT_DIR / "qc_top_corr_per_feature.csv", index=False)
+print(f"▶ Top |corr| pairs: {len(pairs)} kept (max |r|={pairs['corr'].abs().max() if len(pairs) else float('nan'):.3f})")
 
-plt.figure(figsize=(8,6))
-plt.imshow(sub_corr, vmin=0, vmax=1, cmap="viridis")
-plt.colorbar(label="|Correlation|")
-plt.xticks(range(len(top_feats)), top_feats, rotation=90)
-plt.yticks(range(len(top_feats)), top_feats)
-plt.title("Correlation Heatmap (Top 20 by Missing Rate)")
-plt.tight_layout()
-plt.savefig(OUT_DIR / "fig_corr_heatmap.png", dpi=150)
-plt.close()
+figs.submit(OUT_DIR / "fig_corr_heatmap.png", "heatmap",
+            {"matrix": sub_corr.to_numpy(), "labels": top_feats},
+            figsize=(8, 6), vmin=0, vmax=1, cmap="viridis", colorbar_label="|Correlation|",
+            title="Correlation Heatmap (Top 20 by |Correlation|)")
 
+figs.close()
+print(f"▶ Figures: {figs.rendered} rendered, {figs.skipped} unchanged (cached)")
 print("✅ EDA/QC complete. Results saved to", OUT_DIR)
@@ -1,6 +1,7 @@
 import argparse
 from pathlib import Path
-import pandas as pd
+
+from panel_io import read_panel, write_panel
 
 # ---------------------------------------------------------------------------
 # 1. CLI 설정.
@@ -19,8 +20,8 @@ OUT_PATH.parent.mkdir(exist_ok=True, parents=True)
 # ---------------------------------------------------------------------------
 # 2. 데이터 로드 및 백업.
 # ---------------------------------------------------------------------------
-df = pd.read_parquet(IN_PATH)
-df.to_parquet(BACKUP_PATH, index=False)
+df = read_panel(IN_PATH)
+write_panel(df, BACKUP_PATH)
 print(f"▶ Backup saved → {BACKUP_PATH} ({df.shape[0]} rows × {df.shape[1]} cols)")
 
 # ---------------------------------------------------------------------------
@@ -29,15 +30,18 @@ print(f"▶ Backup saved → {BACKUP_PATH} ({df.shape[0]} rows × {df.shape[1]}
 # ID 컬럼.
 drop_cols = ["no"]
 # 날짜 관련 컬럼.
-drop_cols += ["contract_day", "contract_ym", "contract_year", "time_id"]
+drop_cols += ["contract_day", "contract_ym", "contract_year", "time_id", "month_idx"]
 # 시간 더미 컬럼(tm_*).
 drop_cols += [c for c in df.columns if str(c).startswith("tm_")]
 
 df_model = df.drop(columns=drop_cols, errors="ignore")
+# 패널 키(complex_id, year_month)는 인덱스 대신 컬럼으로 보존(07 고정효과 흡수용, 비수치형이라 회귀 피처에서는 제외됨).
+if any(name in ("complex_id", "year_month") for name in df_model.index.names):
+    df_model = df_model.reset_index()
 print(f"▶ Dropped {len(drop_cols)} columns: {drop_cols[:5]}{'...' if len(drop_cols)>5 else ''}")
 
 # ---------------------------------------------------------------------------
 # 4. 모델 데이터 저장.
 # ---------------------------------------------------------------------------
-df_model.to_parquet(OUT_PATH, index=False)
+write_panel(df_model, OUT_PATH)
 print(f"✅ Model dataset saved → {OUT_PATH} ({df_model.shape[0]} rows × {df_model.shape[1]} cols)") 
\ No newline at end of file
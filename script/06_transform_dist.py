@@ -2,9 +2,11 @@ import argparse
 from pathlib import Path
 import pandas as pd
 import numpy as np
-from scipy.stats import yeojohnson
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
+
+from dist_transform import DistributionTransformer, skewed_features
+from diagnostics import submit_distribution
+from figure_service import FigureQueue
+from panel_io import read_panel, write_panel
 
 # ---------------------------------------------------------------------------
 # 1. CLI 설정.
@@ -13,67 +15,82 @@ parser = argparse.ArgumentParser(description="Distribution transform for model d
 parser.add_argument("--input", default="output/panel_model.parquet", help="모델용 데이터 경로")
 parser.add_argument("--output", default="output/panel_model_transformed.parquet", help="변환된 데이터 저장 경로")
 parser.add_argument("--output_dir", default="output", help="진단 플롯 저장 디렉토리")
+parser.add_argument("--params", default="output/transform_params.json",
+                    help="변환 파라미터(λ·윈저 경계·적합 표본 정보) JSON 저장 경로")
+parser.add_argument("--apply_params", default="",
+                    help="기존 파라미터 파일 경로 ─ 지정 시 재적합 없이 그대로 적용")
+parser.add_argument("--fit_sample", type=int, default=0,
+                    help="λ·윈저 경계 적합에 쓸 최대 표본 수(0이면 전체 관측치)")
+parser.add_argument("--seed", type=int, default=0, help="적합 표본 추출 시드")
+parser.add_argument("--auto_skew", type=float, default=0.0,
+                    help="|왜도|가 이 값 이상인 수치형 피처를 자동으로 변환 대상에 추가(0이면 사용 안 함, 예: 0.75)")
+parser.add_argument("--memory_budget", type=float, default=0,
+                    help="λ 적합 작업 메모리 예산(MB, 0이면 제한 없음) ─ 피처 블록 크기 자동 결정")
+parser.add_argument("--n_jobs", type=int, default=1, help="λ 정밀화(Brent) 병렬 프로세스 수")
+parser.add_argument("--plot_top", type=int, default=10,
+                    help="자동 선택 피처 중 진단 플롯을 그릴 상위 개수(|왜도| 순)")
+parser.add_argument("--qq_points", type=int, default=200, help="QQ 플롯 점 수(분위수 스케치 기반, 행 수와 무관)")
+parser.add_argument("--fig_jobs", type=int, default=2, help="그림 렌더링 워커 프로세스 수(0이면 순차 렌더링)")
 args = parser.parse_args()
 
 IN_PATH = Path(args.input)
 OUT_PATH = Path(args.output)
 PLOT_DIR = Path(args.output_dir)
 PLOT_DIR.mkdir(exist_ok=True, parents=True)
+figs = FigureQueue(PLOT_DIR, n_jobs=args.fig_jobs)
 
 # 데이터 로드.
 print(f"▶ Loading model data from {IN_PATH}")
-df = pd.read_parquet(IN_PATH)
+df = read_panel(IN_PATH)
 print(f"   Loaded: {df.shape[0]} rows × {df.shape[1]} cols")
 
-# 변환 대상 피처.
+# 변환 대상 피처(기본 가격 변수 + 선택 시 왜도 기준 자동 탐지).
 features = ["price_per_m2", "ln_price"]
+auto_feats = []
+if args.auto_skew > 0 and not args.apply_params:
+    auto_feats = [c for c in skewed_features(df, args.auto_skew, exclude=("complex_id", "month_idx", "time_id"))
+                  if c not in features]
+    print(f"▶ Auto-detected {len(auto_feats)} skewed features (|skew| ≥ {args.auto_skew})")
+    features += auto_feats
 
-# 변환 및 플롯.
-lambdas = {}
-bounds = {}
-for feat in features:
-    if feat not in df.columns:
-        continue
-    print(f"▶ Transforming feature: {feat}")
-    series = df[feat].dropna()
-    # Yeo–Johnson 변환.
-    yj_data, lam = yeojohnson(series)
-    lambdas[feat] = lam
-    col_yj = f"yj_{feat}"
-    df[col_yj] = np.nan
-    df.loc[series.index, col_yj] = yj_data
-    # 윈저라이즈(1% 하/상위 절단).
-    lower = np.nanpercentile(df[col_yj], 1)
-    upper = np.nanpercentile(df[col_yj], 99)
-    bounds[feat] = (lower, upper)
-    col_w = f"{col_yj}_w"
-    df[col_w] = df[col_yj].clip(lower, upper)
-    # 히스토그램 및 QQ-플롯 저장.
-    for col in [feat, col_yj, col_w]:
-        data = df[col].dropna()
-        plt.figure(figsize=(6,4))
-        plt.hist(data, bins=50)
-        plt.title(f"Histogram of {col}")
-        plt.xlabel(col); plt.ylabel("Count")
-        plt.tight_layout()
-        plt.savefig(PLOT_DIR / f"fig_hist_{col}.png", dpi=150)
-        plt.close()
+# 변환기 적합(또는 기존 파라미터 로드) 후 벡터화 적용.
+if args.apply_params:
+    transformer = DistributionTransformer.load(args.apply_params)
+    print(f"▶ Applying saved transform parameters from {args.apply_params}")
+else:
+    transformer = DistributionTransformer(features, method="yeo-johnson", winsor=(0.01, 0.99),
+                                          sample_size=args.fit_sample, seed=args.seed)
+    transformer.fit(df, source=IN_PATH, n_jobs=args.n_jobs, memory_budget=args.memory_budget or None)
+    transformer.save(args.params)
+    print(f"▶ Transform parameters saved → {args.params}")
+df = transformer.transform(df)
 
-        plt.figure(figsize=(6,6))
-        sm.qqplot(data, line="45", fit=True)
-        plt.title(f"QQ-plot of {col}")
-        plt.tight_layout()
-        plt.savefig(PLOT_DIR / f"fig_qq_{col}.png", dpi=150)
-        plt.close()
+# λ 요약(변환 전후 왜도) 저장.
+lam_df = pd.DataFrame([{"feature": f, **p} for f, p in transformer.params.items()])
+if not lam_df.empty:
+    lam_df["skew_before"] = [df[f].skew() for f in lam_df["feature"]]
+    lam_df["skew_after"] = [df[transformer.column(f)].skew() for f in lam_df["feature"]]
+    lam_df.to_csv(PLOT_DIR / "transform_lambdas.csv", index=False)
+
+# 히스토그램(사전 구간화)·QQ-플롯(스케치 분위수 + 신뢰 포락선) 저장(자동 선택 피처는 상위 일부만).
+plot_feats = [f for f in transformer.params if f not in auto_feats] + auto_feats[:args.plot_top]
+for feat in plot_feats:
+    if feat not in transformer.params:
+        continue
+    for col in [feat, transformer.column(feat), transformer.column(feat, True)]:
+        submit_distribution(figs, PLOT_DIR, col, df[col].to_numpy(dtype="float64", na_value=np.nan),
+                            bins=50, n_points=args.qq_points)
 
 # 변환 정보 출력.
 print("▶ Yeo–Johnson λ values:")
-for feat, lam in lambdas.items():
-    print(f"   {feat}: λ = {lam:.4f}")
+for feat, p in list(transformer.params.items())[:20]:
+    print(f"   {feat}: λ = {p['lambda']:.4f} (fit on {p['n_fit']}/{p['n_valid']} obs)")
 print("▶ Winsorize bounds (1%,99%):")
-for feat, (low, high) in bounds.items():
-    print(f"   yj_{feat}: low={low:.4f}, high={high:.4f}")
+for feat, p in list(transformer.params.items())[:20]:
+    print(f"   {transformer.column(feat)}: low={p['lower']:.4f}, high={p['upper']:.4f}")
 
 # 저장.
-df.to_parquet(OUT_PATH, index=False)
+write_panel(df, OUT_PATH)
+figs.close()
+print(f"▶ Figures: {figs.rendered} rendered, {figs.skipped} unchanged (cached)")
 print(f"✅ Transformed data saved → {OUT_PATH} ({df.shape[0]} rows × {df.shape[1]} cols)") 
\ No newline at end of file
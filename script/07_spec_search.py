@@ -0,0 +1,76 @@
+import argparse
+from pathlib import Path
+import pandas as pd
+import numpy as np
+
+from dist_transform import derived_columns, load_transformer, target_to_price
+from gram_ols import design_matrix, feature_columns, finite_rows, kfold_ids
+from panel_io import read_panel
+from spec_search import SpecSearch, stepwise
+
+# ---------------------------------------------------------------------------
+# 1. CLI 설정.
+# ---------------------------------------------------------------------------
+parser = argparse.ArgumentParser(description="Hedonic specification search with Cholesky-updated Gram CV")
+parser.add_argument("--input", default="output/panel_model_transformed.parquet", help="모델용 데이터 경로")
+parser.add_argument("--output_dir", default="output", help="결과 저장 디렉토리")
+parser.add_argument("--target", default="ln_price", help="회귀 타겟 변수(07단계와 동일)")
+parser.add_argument("--n_folds", type=int, default=5, help="교차검증 폴드 수(07단계와 같은 분할)")
+parser.add_argument("--mode", choices=["forward", "backward"], default="forward", help="단계적 탐색 방향")
+parser.add_argument("--criterion", choices=["cv_r2", "cv_mape", "aic", "bic"], default="bic",
+                    help="단계마다 사양을 고르는 기준")
+parser.add_argument("--include", default="", help="항상 포함할 피처(쉼표 구분)")
+parser.add_argument("--exclude", default="", help="후보에서 제외할 피처(쉼표 구분)")
+parser.add_argument("--max_features", type=int, default=None, help="전진 탐색 최대 피처 수")
+parser.add_argument("--mape_sample", type=int, default=50_000,
+                    help="가격 척도 MAPE 평가 표본 행 수(0이면 MAPE 생략)")
+parser.add_argument("--transform_params", default="output/transform_params.json",
+                    help="06단계 변환 파라미터(누수 컬럼 제외, 변환 타겟 역변환)")
+args = parser.parse_args()
+
+IN_PATH = Path(args.input)
+OUT_DIR = Path(args.output_dir)
+OUT_DIR.mkdir(exist_ok=True, parents=True)
+
+# 2. 데이터 로드 및 후보 피처(07단계와 같은 규칙: 수치형 − 타겟 − 타겟 파생 컬럼).
+print(f"▶ Loading data from {IN_PATH}")
+df = read_panel(IN_PATH)
+target = args.target
+transformer = load_transformer(args.transform_params)
+leak_cols = derived_columns(target, transformer)
+exclude = [c.strip() for c in args.exclude.split(",") if c.strip()]
+features = feature_columns(df, [target, *leak_cols, *exclude])
+include = [c.strip() for c in args.include.split(",") if c.strip()]
+missing = [c for c in include if c not in features]
+if missing:
+    raise ValueError(f"Included features not among candidates: {missing}")
+
+# 폴드 번호는 행 제외 전에 파일 행 순서로 배정하고 피처·타겟 결측 행을 제외(07단계와 같은 분할).
+df["_fold"] = kfold_ids(len(df), args.n_folds, seed=0)
+finite = finite_rows(df, features + [target])
+if not finite.all():
+    print(f"   {int((~finite).sum())} rows with missing feature/target values skipped")
+    df = df[finite].reset_index(drop=True)
+print(f"   {len(df)} rows, {len(features)} candidate features")
+
+# 3. 전체 후보 설계행렬로 폴드별 Gram을 한 번만 누적.
+names = ["const"] + features
+search = SpecSearch(design_matrix(df, features), df[target].to_numpy(dtype="float64"),
+                    df["_fold"].to_numpy(dtype="int64"), names,
+                    price_fn=lambda v: target_to_price(v, target, transformer),
+                    mape_rows=args.mape_sample)
+del df
+
+# 4. 단계적 탐색(모든 평가 사양 기록).
+rows = stepwise(search, mode=args.mode, criterion=args.criterion,
+                include=[names.index(c) for c in include], max_features=args.max_features)
+result = pd.DataFrame(rows)
+result["features"] = result["features"].map("+".join)
+result.to_csv(OUT_DIR / "spec_search.csv", index=False)
+print(f"▶ {len(result)} specifications evaluated → {OUT_DIR/'spec_search.csv'}")
+
+# 5. 선택 경로 요약.
+path = result[result["selected"]]
+print(path[["step", "action", "feature", "n_features", "cv_r2", "cv_mape", "aic", "bic"]].to_string(index=False))
+best = path.iloc[-1]
+print(f"✅ Selected specification ({args.criterion}): {best['features'] or '(const only)'}")
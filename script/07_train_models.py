@@ -1,12 +1,22 @@
 import argparse
+import sys
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import statsmodels.api as sm
-from sklearn.model_selection import KFold
+import pyarrow.parquet as pq
 from sklearn.metrics import r2_score, mean_absolute_percentage_error
-import matplotlib.pyplot as plt
-from pandas.api.types import is_numeric_dtype  # numeric 컬럼 필터링
+
+from bootstrap import bootstrap_coefs, percentile_intervals
+from dist_transform import derived_columns, load_transformer, target_to_price
+from figure_service import FigureQueue
+from fixed_effects import factorize_columns, factorize_levels
+from gbm_engine import hgb_design, hgb_fold_fit
+from gram_ols import (GramCV, StreamedGramCV, absorbed_fit, absorbed_fold_fit, chunk_rows, design_matrix,
+                      feature_columns, finite_rows, kfold_ids)
+from parallel_jobs import SharedArrays, parallel_map
+from model_artifact import HedonicModel, data_fingerprint, frame_dtypes
+from panel_io import iter_row_groups, read_panel, schema_frame
+from sparse_ols import dummy_effects, mixed_design, share_csr, sparse_fold_fit, sparse_ols
 
 # ---------------------------------------------------------------------------
 # 1. CLI 설정.
@@ -17,100 +27,427 @@ parser.add_argument("--output_dir", default="output", help="결과 저장 디렉
 parser.add_argument("--target", default="ln_price", help="회귀 타겟 변수 (로그 가격)")
 parser.add_argument("--n_folds", type=int, default=5, help="교차검증 폴드 수")
 parser.add_argument("--top_coef", type=int, default=20, help="표시할 상위 회귀계수 개수")
+parser.add_argument("--engine", choices=["ols", "hgb"], default="ols",
+                    help="모델 엔진(ols: 헤도닉 OLS, hgb: 히스토그램 그래디언트 부스팅)")
+parser.add_argument("--hgb_categorical", default="시군구명,complex_id",
+                    help="hgb 엔진에서 네이티브 범주형으로 쓸 컬럼(쉼표 구분, 데이터에 있는 것만 사용)")
+parser.add_argument("--hgb_max_iter", type=int, default=500, help="hgb 최대 부스팅 반복 수")
+parser.add_argument("--hgb_learning_rate", type=float, default=0.1, help="hgb 학습률")
+parser.add_argument("--hgb_max_leaf_nodes", type=int, default=31, help="hgb 트리당 최대 리프 수")
+parser.add_argument("--hgb_min_samples_leaf", type=int, default=20, help="hgb 리프 최소 표본 수")
+parser.add_argument("--hgb_l2", type=float, default=0.0, help="hgb 리프 값 L2 정규화")
+parser.add_argument("--hgb_patience", type=int, default=20,
+                    help="hgb 조기 종료: 학습 폴드 내 검증 손실이 개선되지 않는 허용 반복 수(0이면 조기 종료 끔)")
+parser.add_argument("--hgb_validation", type=float, default=0.1, help="hgb 조기 종료용 검증 표본 비율(학습 폴드 내)")
+parser.add_argument("--absorb", default="",
+                    help="흡수할 고정효과 컬럼(쉼표 구분, 예: complex_id,시군구명,year_month) ─ 더미 없이 교대 투영으로 제거")
+parser.add_argument("--sparse_fe", default="",
+                    help="희소 더미로 추정할 고정효과 컬럼(쉼표 구분, 예: complex_id) ─ CSR 혼합 설계로 직접 적합"
+                         "(HC3 레버리지는 단일 컬럼이면 FWL로 빠르게, 여러 컬럼이면 더미 수 × 행 수에 비례해"
+                         " 느리므로 --cluster 권장)")
+parser.add_argument("--sparse_method", choices=["cholesky", "lsqr"], default="cholesky",
+                    help="희소 설계 풀이법(cholesky: 희소 정규방정식, lsqr: 반복법)")
+parser.add_argument("--cluster", default="",
+                    help="전체 표본 적합의 클러스터 강건 표준오차 기준 컬럼(예: complex_id, 미지정 시 HC3 ─ --absorb는 HC1)")
+parser.add_argument("--fe_tol", type=float, default=1e-8, help="고정효과 교대 투영 수렴 허용오차")
+parser.add_argument("--fe_unseen", choices=["zero", "nan", "error"], default="zero",
+                    help="모델 산출물로 예측할 때 학습에 없던 고정효과 수준 처리(zero: 평균 수준, nan: 결측, error: 오류)")
+parser.add_argument("--dtype", choices=["float64", "float32"], default="float64",
+                    help="설계행렬 저장 dtype(float32면 메모리 절반, Gram·해는 청크별 float64로 계산; 일반 OLS 전용)")
+parser.add_argument("--memory_budget", type=float, default=0,
+                    help="설계행렬·작업 청크 메모리 예산(MB, 0이면 제한 없음) ─ 초과 시 설계행렬을 memmap으로 두고 청크 크기 자동 결정(일반 OLS 전용)")
+parser.add_argument("--n_jobs", type=int, default=1,
+                    help="폴드 병렬 워커 수(-1이면 모든 코어, 설계행렬은 memmap으로 공유; 결과는 순차 실행과 동일)")
+parser.add_argument("--bootstrap", type=int, default=0,
+                    help="전체 표본 계수의 부트스트랩 복제 수(0이면 생략, 일반 OLS 전용)")
+parser.add_argument("--boot_scheme", choices=["dirichlet", "cluster"], default="dirichlet",
+                    help="부트스트랩 가중치(dirichlet: 행별 베이지안, cluster: 클러스터 복원추출)")
+parser.add_argument("--boot_cluster", default="complex_id", help="cluster 부트스트랩의 클러스터 컬럼")
+parser.add_argument("--boot_level", type=float, default=0.95, help="부트스트랩 백분위 구간 수준")
+parser.add_argument("--streaming", action="store_true",
+                    help="Parquet row group 단위 out-of-core OLS(전체 패널을 메모리에 올리지 않음, 일반 OLS 전용)")
+parser.add_argument("--plot_points", type=int, default=20_000,
+                    help="스트리밍 모드에서 예측 vs 실제 그림에 쓸 표본 점 수(무작위 추출)")
+parser.add_argument("--transform_params", default="output/transform_params.json",
+                    help="06단계 변환 파라미터(타겟이 변환 컬럼이면 역변환해 가격 척도 MAPE 계산)")
+parser.add_argument("--model_out", default="output/model.json",
+                    help="모델 산출물(계수·공분산·피처 스키마·변환 파라미터·학습 데이터 지문) 저장 경로")
+parser.add_argument("--fig_jobs", type=int, default=2, help="그림 렌더링 워커 프로세스 수(0이면 순차 렌더링)")
 args = parser.parse_args()
 
 IN_PATH = Path(args.input)
 OUT_DIR = Path(args.output_dir)
 OUT_DIR.mkdir(exist_ok=True, parents=True)
+figs = FigureQueue(OUT_DIR, n_jobs=args.fig_jobs)
+
+target = args.target
+transformer = load_transformer(args.transform_params)
+leak_cols = derived_columns(target, transformer)
+
+# 결과 저장용 컨테이너.
+metrics = []
+coef_list = []
+y_true_all = []
+y_pred_all = []
+
+
+# ---------------------------------------------------------------------------
+# 결과 저장(스트리밍·메모리 경로 공통): CV 메트릭·평균 계수·모델 산출물·그림.
+# ---------------------------------------------------------------------------
+def save_results(features, coef_names, full, train_dtypes, fingerprint, fe_note, fe_effects=None):
+    """결과 컨테이너(metrics·coef_list·y_true_all·y_pred_all)와 전체 표본 적합으로 산출물 저장.
+
+    ``fe_effects``(고정효과 컬럼 → 수준별 효과)가 있으면 모델 산출물에 함께 저장해 예측에 더한다.
+    """
+    # 메트릭 저장(OLS 이외 엔진은 파일명에 엔진명 접미사).
+    suffix = "" if args.engine == "ols" else f"_{args.engine}"
+    metrics_df = pd.DataFrame(metrics)
+    metrics_path = OUT_DIR/f"cv_metrics{suffix}.csv"
+    metrics_df.to_csv(metrics_path, index=False)
+    print(f"▶ CV metrics saved → {metrics_path}")
+
+    # 계수 기반 산출물(평균 계수·모델 산출물·계수 그림)은 선형 엔진에서만 저장.
+    if coef_list:
+        # 평균 회귀계수 저장.
+        coef_df = pd.concat(coef_list, ignore_index=True)
+        coef_mean_df = coef_df.groupby('feature')['coef'].mean().reset_index()
+        coef_mean_df.to_csv(OUT_DIR/"coef_mean.csv", index=False)
+        print(f"▶ Mean coefficients saved → {OUT_DIR/'coef_mean.csv'}")
+
+        # 모델 산출물: 전체 표본 적합(공분산 포함)이 있으면 그 계수, 없으면 CV 평균 계수.
+        if full is not None:
+            model_coef = pd.Series(full["params"][:len(coef_names)], index=coef_names)
+            model_cov, coef_source = full.get("cov"), "full_sample"
+            cov_type = full.get("cov_type", "cluster" if args.cluster else "HC3")
+        else:
+            mean_coef = coef_mean_df.set_index('feature')['coef']
+            model_coef = mean_coef.reindex(["const"] + [c for c in features if c in mean_coef.index])
+            model_cov, coef_source, cov_type = None, "cv_mean", None
+        model = HedonicModel(model_coef, target, cov=model_cov, dtypes=train_dtypes, transformer=transformer,
+                             fingerprint=fingerprint,
+                             meta={"coef_source": coef_source, "n_folds": args.n_folds, "fixed_effects": fe_note,
+                                   "cov_type": cov_type},
+                             fe_effects=fe_effects, fe_unseen=args.fe_unseen)
+        model.save(args.model_out)
+        n_levels = sum(len(e) for e in (fe_effects or {}).values())
+        print(f"▶ Model artifact saved → {args.model_out} ({coef_source}, {len(model_coef)} coefficients"
+              f"{f', {n_levels} fixed-effect levels' if n_levels else ''})")
+
+        # 회귀계수 평균화 및 시각화.
+        coef_mean = coef_df.groupby('feature')['coef'].mean().abs().sort_values(ascending=False).head(args.top_coef).sort_values()
+        figs.submit(OUT_DIR/"fig_coef.png", "barh",
+                    {"labels": coef_mean.index.tolist(), "values": coef_mean.to_numpy()},
+                    figsize=(8, 6), title='Top Regression Coefficients (abs mean)')
+
+    # 예측 vs 실제 시각화.
+    figs.submit(OUT_DIR/f"fig_pred_vs_true{suffix}.png", "scatter",
+                {"x": np.asarray(y_true_all), "y": np.asarray(y_pred_all)},
+                figsize=(6, 6), alpha=0.3, diagonal=True,
+                xlabel='True Price_per_m2', ylabel='Predicted Price_per_m2', title='Predicted vs True')
+    figs.close()
+    if coef_list:
+        print(f"▶ Coefficient plot saved → {OUT_DIR/'fig_coef.png'}")
+    print(f"▶ Prediction plot saved → {OUT_DIR/f'fig_pred_vs_true{suffix}.png'}")
+    print("✅ Hedonic regression CV complete.")
+
+
+# 2'. 스트리밍 모드: 스키마만 읽고 row group 단위 두 패스(메모리 ∝ row group 1개).
+# 피처 규칙(수치형·bool)과 결측 행 제외 규칙은 메모리 경로와 같다.
+if args.streaming:
+    if args.absorb or args.sparse_fe or args.cluster or args.engine != "ols":
+        raise ValueError("--streaming supports plain OLS only (no --absorb/--sparse_fe/--cluster/--engine hgb)")
+    features = feature_columns(schema_frame(IN_PATH), [target, *leak_cols])
+    coef_names = ["const"] + features
+    n_rows = pq.ParquetFile(IN_PATH).metadata.num_rows
+    print(f"▶ Streaming {n_rows} rows from {IN_PATH} by row group ({len(features)} features)")
+
+    # 첫 패스: 폴드별 XᵀX·Xᵀy·yᵀy 누적(폴드 번호는 KFold와 같은 분할을 행 위치로 생성).
+    cv = StreamedGramCV(IN_PATH, features, target, kfold_ids(n_rows, args.n_folds, seed=0))
+    if cv.n_dropped:
+        print(f"   {cv.n_dropped} rows with missing feature/target values skipped")
+    fold_fits = cv.fit_folds()
+    full = cv.fit()
+
+    # 두 번째 패스: 폴드별 검증 예측 통계(R²·MAPE)와 전체 표본 HC3 meat 누적.
+    acc = np.zeros((args.n_folds, 5))  # 폴드별 n, Σy, Σy², SSE, Σ|APE|
+    plot_rate = min(1.0, args.plot_points / max(n_rows, 1))
+    rng = np.random.default_rng(0)
+
+    def _accumulate(k, y_true, y_pred):
+        true_price = np.asarray(target_to_price(y_true, target, transformer), dtype="float64")
+        pred_price = np.asarray(target_to_price(y_pred, target, transformer), dtype="float64")
+        ape = np.abs(pred_price - true_price) / np.maximum(np.abs(true_price), np.finfo("float64").eps)
+        acc[k] += (len(y_true), y_true.sum(), y_true @ y_true, ((y_true - y_pred) ** 2).sum(), ape.sum())
+        pick = rng.random(len(y_true)) < plot_rate
+        y_true_all.extend(true_price[pick])
+        y_pred_all.extend(pred_price[pick])
+
+    cv.second_pass([f["params"] for f in fold_fits], on_fold=_accumulate, full=full)
+    for fold, fit in enumerate(fold_fits, start=1):
+        n_k, sy, syy, sse, sape = acc[fold - 1]
+        print(f"▶ Fold {fold}/{args.n_folds} (rows={int(n_k)})")
+        metrics.append({"fold": fold, "r2": 1 - sse / (syy - sy ** 2 / n_k), "mape": sape / n_k})
+        params = pd.DataFrame({"feature": coef_names, "coef": fit["params"]})
+        params["fold"] = fold
+        coef_list.append(params)
+
+    coef_full = pd.DataFrame({"feature": coef_names, "coef": full["params"], "se_hc3": full["bse"]})
+    coef_full.to_csv(OUT_DIR/"coef_full_hc3.csv", index=False)
+    print(f"▶ Full-sample coefficients with HC3 SE saved → {OUT_DIR/'coef_full_hc3.csv'} (rank={full['rank']}/{len(coef_names)})")
+    train_dtypes = frame_dtypes(IN_PATH, features)
+    fingerprint = data_fingerprint((c[finite_rows(c, features + [target])]
+                                    for c in iter_row_groups(IN_PATH, columns=features + [target])),
+                                   features + [target])
+    save_results(features, coef_names, full, train_dtypes, fingerprint, fe_note=[])
+    sys.exit(0)
 
 # 2. 데이터 로드.
 print(f"▶ Loading data from {IN_PATH}")
-df = pd.read_parquet(IN_PATH)
+df = read_panel(IN_PATH)
 print(f"   Loaded {df.shape[0]} rows × {df.shape[1]} cols")
 
 # 3. 특성 및 타겟 설정.
-target = args.target
-# numeric 타입 칼럼만 사용.
-numeric_cols = [c for c in df.columns if is_numeric_dtype(df[c])]
-features = [c for c in numeric_cols if c != target]
-X = df[features]
+# 수치형(정수·실수·bool) 칼럼만 사용하고, 타겟과 같은 원 피처에서 파생된 변환 컬럼
+# (예: ln_price ↔ yj_ln_price)은 누수이므로 제외.
+features = feature_columns(df, [target, *leak_cols])
+
+# 폴드 번호는 행 제외 전에 파일 행 순서로 배정(스트리밍 경로와 같은 분할).
+df["_fold"] = kfold_ids(len(df), args.n_folds, seed=0)
+
+# 선형 엔진은 피처·타겟 결측 행을 제외(스트리밍 경로와 같은 규칙). hgb는 피처 결측을 직접
+# 처리하므로 타겟 결측 행만 제외.
+finite = finite_rows(df, features + [target] if args.engine == "ols" else [target])
+if not finite.all():
+    print(f"   {int((~finite).sum())} rows with missing "
+          f"{'feature/target' if args.engine == 'ols' else 'target'} values skipped")
+    df = df[finite].reset_index(drop=True)
+
+# 클러스터 키가 결측인 행은 고정효과 코드 생성 전에 제거.
+if args.cluster:
+    if args.cluster not in df.columns:
+        raise ValueError(f"Cluster column not found in data: {args.cluster}")
+    df = df.dropna(subset=[args.cluster]).reset_index(drop=True)
+
+# 고정효과 흡수 설정: 키 결측 행 제거 후 그룹 코드만 보관(더미 행렬 미생성).
+absorb_cols = [c.strip() for c in args.absorb.split(",") if c.strip()]
+fe_codes, fe_levels = [], []
+if absorb_cols:
+    missing = [c for c in absorb_cols if c not in df.columns]
+    if missing:
+        raise ValueError(f"Absorb columns not found in data: {missing}")
+    features = [c for c in features if c not in absorb_cols]
+    df = df.dropna(subset=absorb_cols).reset_index(drop=True)
+    fe_codes, fe_levels = factorize_levels(df, absorb_cols)
+    print(f"▶ Absorbing fixed effects: {absorb_cols} (groups={[int(c.max()) + 1 for c in fe_codes]})")
+
+# 희소 고정효과 설정: 흡수와 달리 더미 계수를 직접 추정(CSR 혼합 설계, 밀집 더미 행렬 미생성).
+sparse_cols = [c.strip() for c in args.sparse_fe.split(",") if c.strip()]
+sparse_codes, sparse_levels = [], []
+if sparse_cols:
+    if absorb_cols:
+        raise ValueError("--absorb and --sparse_fe cannot be combined")
+    missing = [c for c in sparse_cols if c not in df.columns]
+    if missing:
+        raise ValueError(f"Sparse FE columns not found in data: {missing}")
+    features = [c for c in features if c not in sparse_cols]
+    df = df.dropna(subset=sparse_cols).reset_index(drop=True)
+    sparse_codes, sparse_levels = factorize_levels(df, sparse_cols)
+    print(f"▶ Sparse fixed-effect dummies: {sparse_cols} (levels={[int(c.max()) + 1 for c in sparse_codes]}, "
+          f"solver={args.sparse_method})")
+
+cluster_codes = factorize_columns(df, [args.cluster])[0] if args.cluster else None
+
+# hgb 엔진: 시군구·단지 코드는 고정효과 대신 네이티브 범주형 피처로 사용.
+hgb_cats = []
+if args.engine == "hgb":
+    if absorb_cols or sparse_cols:
+        raise ValueError("--engine hgb uses native categoricals; --absorb/--sparse_fe are OLS-only")
+    hgb_cats = [c.strip() for c in args.hgb_categorical.split(",") if c.strip() in df.columns]
+    features = [c for c in features if c not in hgb_cats]
+
+# 저장 dtype·메모리 예산은 청크 단위로 읽는 밀집 OLS 설계에만 적용된다(흡수·희소·hgb 적합은
+# 전체 float64 작업 사본을 만들므로 조용히 무시하지 않고 거부).
+if (absorb_cols or sparse_cols or args.engine == "hgb") and (args.dtype != "float64" or args.memory_budget):
+    raise ValueError("--dtype float32/--memory_budget apply to plain OLS only "
+                     "(--absorb/--sparse_fe/--engine hgb build float64 working copies)")
+
 y = df[target]
+coef_names = ["const"] + features
 
-# 4. 교차검증 설정.
-kf = KFold(n_splits=args.n_folds, shuffle=True, random_state=0)
+# 4. 교차검증 설정(행별 폴드 번호, 제외 행이 없으면 KFold(shuffle=True, random_state=0)와 같은 분할).
+fold_ids = df.pop("_fold").to_numpy(dtype="int64")
+splits = [(np.flatnonzero(fold_ids != k), np.flatnonzero(fold_ids == k)) for k in range(args.n_folds)]
 
-# 5. 결과 저장용 컨테이너.
-metrics = []
-coef_list = []
-y_true_all = []
-y_pred_all = []
+# 메모리 계획: 설계행렬이 예산의 절반을 넘으면 임시 .npy memmap에 두고, 나머지 예산으로
+# float64 작업 청크 크기를 정한다(피처 DataFrame 사본·폴드별 iloc 사본은 만들지 않음).
+design_shape = (len(df), len(features) + 1)
+design_mb = np.prod(design_shape) * np.dtype(args.dtype).itemsize / 1024 ** 2
+use_memmap = bool(args.memory_budget) and design_mb > args.memory_budget / 2
+chunk = chunk_rows(design_shape[1], args.memory_budget / 4 if args.memory_budget else None)
+print(f"   Design matrix {design_shape[0]} × {design_shape[1]} {args.dtype}: {design_mb:.1f} MB"
+      f"{' (memmap)' if use_memmap else ''}, work chunk={chunk} rows")
+
+# 설계행렬·타겟·그룹 코드는 임시 .npy memmap으로 한 번만 저장해 워커와 공유(피클 복사 없음).
+shared = SharedArrays(enabled=args.n_jobs != 1 or use_memmap)
+y_arr = shared.put("y", y.to_numpy(dtype="float64", na_value=np.nan))
+row_order = np.arange(len(df))
+cv = None
+X_sp = None
+if args.engine == "hgb":
+    # 폴드는 순차 실행하고 각 적합이 OpenMP로 모든 코어를 사용(프로세스 병렬과 중복 방지).
+    X_hgb, hgb_names, cat_mask = hgb_design(df, features, hgb_cats)
+    hgb_params = {"max_iter": args.hgb_max_iter, "learning_rate": args.hgb_learning_rate,
+                  "max_leaf_nodes": args.hgb_max_leaf_nodes, "min_samples_leaf": args.hgb_min_samples_leaf,
+                  "l2_regularization": args.hgb_l2, "early_stopping": args.hgb_patience > 0,
+                  "n_iter_no_change": max(args.hgb_patience, 1), "validation_fraction": args.hgb_validation,
+                  "random_state": 0}
+    print(f"▶ HistGradientBoosting: {len(features)} numeric + {len(hgb_cats)} categorical {hgb_cats}")
+    fold_fits = [hgb_fold_fit(X_hgb, y_arr, cat_mask, tr, te, hgb_params) for tr, te in splits]
+elif sparse_cols:
+    # [const | 피처 | 더미] CSR 설계를 memmap으로 공유하고 폴드별 희소 적합을 병렬 실행.
+    X_sp, sp_names = mixed_design(design_matrix(df, features), sparse_codes, sparse_cols, coef_names)
+    X_parts = share_csr(shared, "Xsp", X_sp) if shared.enabled else X_sp
+    print(f"   Sparse design: {X_sp.shape[0]} × {X_sp.shape[1]} (nnz={X_sp.nnz})")
+    fold_fits = parallel_map(sparse_fold_fit,
+                             [(X_parts, y_arr, tr, te, args.sparse_method) for tr, te in splits],
+                             args.n_jobs)
+elif not fe_codes:
+    # 설계행렬(상수항 포함)을 폴드 순으로 행을 정렬해 한 번만 만들고(폴드 슬라이스 = 뷰),
+    # 폴드별 XᵀX·Xᵀy·yᵀy를 한 패스로 누적. 폴드 안 행 순서는 원래 순서라 예측 순서도 동일.
+    row_order = np.argsort(fold_ids, kind="stable")
+    X_design = design_matrix(df, features, dtype=args.dtype, rows=row_order,
+                             out=shared.empty("X", design_shape, args.dtype) if shared.enabled else None)
+    cv = GramCV(X_design, shared.put("y_sorted", y_arr[row_order]), fold_ids[row_order],
+                n_jobs=args.n_jobs, chunk=chunk)
+    fold_fits = cv.fit_folds()
+else:
+    # 폴드별 고정효과 흡수 적합을 워커에서 병렬 실행(학습 폴드 내에서 demean → 상수항은 고정효과에 포함).
+    X_feat = design_matrix(df, features, const=False, dtype=args.dtype,
+                           out=shared.empty("X", (len(df), len(features)), args.dtype) if shared.enabled else None)
+    codes_mm = [shared.put(f"fe{j}", c) for j, c in enumerate(fe_codes)]
+    fold_fits = parallel_map(absorbed_fold_fit,
+                             [(X_feat, y_arr, codes_mm, tr, te, args.fe_tol) for tr, te in splits],
+                             args.n_jobs)
 
-# 6. CV 수행.
-for fold, (train_idx, test_idx) in enumerate(kf.split(X), start=1):
+# 6. CV 결과 집계(폴드 순서 고정).
+for fold, (train_idx, test_idx) in enumerate(splits, start=1):
     print(f"▶ Fold {fold}/{args.n_folds}")
-    X_train = X.iloc[train_idx]
-    X_test = X.iloc[test_idx]
-    y_train = y.iloc[train_idx]
     y_test = y.iloc[test_idx]
+    fit = fold_fits[fold - 1]
 
-    # 상수항 추가.
-    X_train_sm = sm.add_constant(X_train)
-    X_test_sm = sm.add_constant(X_test)
-
-    # 모델 학습(강건 표준오차).
-    model = sm.OLS(y_train, X_train_sm).fit(cov_type='HC3')
-
-    # 예측 및 메트릭.
-    y_pred = model.predict(X_test_sm)
+    if args.engine == "hgb":
+        print(f"   Boosting stopped at {fit['n_iter']} iterations (validation loss={fit['val_loss']:.6g})")
+        y_pred = pd.Series(fit["y_pred"], index=y_test.index)
+        coef = None
+    elif fe_codes:
+        kept = [c for c, k in zip(features, fit["keep"]) if k]
+        if len(kept) < len(features):
+            print(f"   {len(features) - len(kept)} features collinear with fixed effects omitted")
+        print(f"   FE demeaning converged in {fit['n_iter']} iterations (absorbed dof={fit['dof_absorbed']})")
+        y_pred = pd.Series(fit["y_pred"], index=y_test.index)
+        coef = pd.concat([pd.Series({"const": fit["const"]}), pd.Series(fit["params"], index=kept)])
+    elif sparse_cols:
+        # 더미 계수는 집계에서 제외하고 상수항·밀집 피처만 보고.
+        if fit["n_iter"]:
+            print(f"   LSQR converged in {fit['n_iter']} iterations")
+        y_pred = pd.Series(fit["y_pred"], index=y_test.index)
+        coef = pd.Series(fit["params"][:len(coef_names)], index=coef_names)
+    else:
+        # 학습 해 = (전체 − 검증 폴드) Gram의 Cholesky 풀이(데이터 재계산 없음).
+        y_pred = pd.Series(cv.predict(fit["params"], fold - 1), index=y_test.index)
+        coef = pd.Series(fit["params"], index=coef_names)
     # 테스트 R2.
     r2 = r2_score(y_test, y_pred)
-    # 원래 가격 MAPE(exp of 로그).
-    true_price = np.exp(y_test)
-    pred_price = np.exp(y_pred)
+    # 원래 가격 MAPE(변환 타겟은 저장된 λ로 역변환 후 exp of 로그).
+    true_price = target_to_price(y_test, target, transformer)
+    pred_price = target_to_price(y_pred, target, transformer)
     mape = mean_absolute_percentage_error(true_price, pred_price)
 
     metrics.append({"fold": fold, "r2": r2, "mape": mape})
     y_true_all.extend(true_price)
     y_pred_all.extend(pred_price)
 
-    # 회귀계수 저장.
-    params = model.params.reset_index()
-    params.columns = ['feature', 'coef']
-    params['fold'] = fold
-    coef_list.append(params)
-
-# 메트릭 저장.
-metrics_df = pd.DataFrame(metrics)
-metrics_df.to_csv(OUT_DIR/"cv_metrics.csv", index=False)
-print(f"▶ CV metrics saved → {OUT_DIR/'cv_metrics.csv'}")
-
-# 평균 회귀계수 저장.
-coef_df = pd.concat(coef_list, ignore_index=True)
-coef_mean_df = coef_df.groupby('feature')['coef'].mean().reset_index()
-coef_mean_df.to_csv(OUT_DIR/"coef_mean.csv", index=False)
-print(f"▶ Mean coefficients saved → {OUT_DIR/'coef_mean.csv'}")
-
-# 회귀계수 평균화 및 시각화.
-coef_mean = coef_df.groupby('feature')['coef'].mean().abs().sort_values(ascending=False).head(args.top_coef)
-plt.figure(figsize=(8,6))
-coef_mean.sort_values().plot(kind='barh')
-plt.title('Top Regression Coefficients (abs mean)')
-plt.tight_layout()
-plt.savefig(OUT_DIR/"fig_coef.png", dpi=150)
-plt.close()
-print(f"▶ Coefficient plot saved → {OUT_DIR/'fig_coef.png'}")
-
-# 예측 vs 실제 시각화.
-plt.figure(figsize=(6,6))
-plt.scatter(y_true_all, y_pred_all, alpha=0.3)
-lims = [min(min(y_true_all), min(y_pred_all)), max(max(y_true_all), max(y_pred_all))]
-plt.plot(lims, lims, 'k--')
-plt.xlabel('True Price_per_m2')
-plt.ylabel('Predicted Price_per_m2')
-plt.title('Predicted vs True')
-plt.tight_layout()
-plt.savefig(OUT_DIR/"fig_pred_vs_true.png", dpi=150)
-plt.close()
-print(f"▶ Prediction plot saved → {OUT_DIR/'fig_pred_vs_true.png'}")
-
-print("✅ Hedonic regression CV complete.") 
\ No newline at end of file
+    # 회귀계수 저장(선형 엔진만).
+    if coef is not None:
+        params = coef.reset_index()
+        params.columns = ['feature', 'coef']
+        params['fold'] = fold
+        coef_list.append(params)
+
+# 전체 표본 적합 + HC3(또는 클러스터) 강건 표준오차(hgb 엔진은 없음).
+# 희소 설계는 희소 풀이로 밀집 피처의 공분산 블록만 계산하고, 밀집 설계는 Gram을 재사용해
+# 청크 단위 한 패스로, 고정효과 흡수 모드는 demean한 설계로 흡수 자유도를 반영한 공분산을 계산.
+full, fe_effects = None, None
+se_type = "cluster" if cluster_codes is not None else "hc3"
+if X_sp is not None:
+    full = sparse_ols(X_sp, y_arr, method=args.sparse_method,
+                      cov="cluster" if se_type == "cluster" else "HC3", se_cols=np.arange(len(coef_names)),
+                      clusters=cluster_codes, fe_codes=sparse_codes, n_dense=len(coef_names))
+    coef_full = pd.DataFrame({"feature": coef_names, "coef": full["params"][:len(coef_names)],
+                              f"se_{se_type}": full["bse"]})
+    coef_full.to_csv(OUT_DIR/f"coef_full_{se_type}.csv", index=False)
+    print(f"▶ Full-sample coefficients with {se_type.upper()} SE saved → {OUT_DIR/f'coef_full_{se_type}.csv'} "
+          f"(backend={full.get('backend', args.sparse_method)})")
+    if sparse_codes:
+        # 더미 계수 → 수준별 효과(학습 빈도 가중 평균 0, 이동량은 상수항으로) ─ 산출물 예측에 사용.
+        # 이동된 상수항의 분산은 더미 계수 공분산이 필요하므로 공분산의 상수항 행·열은 NaN.
+        shift, effs = dummy_effects(full["params"], sparse_codes, len(coef_names))
+        params = full["params"][:len(coef_names)].copy()
+        params[0] += shift
+        cov = np.array(full["cov"])
+        cov[0, :] = cov[:, 0] = np.nan
+        full = {**full, "params": params, "cov": cov}
+        fe_effects = {c: pd.Series(e, index=lv) for c, e, lv in zip(sparse_cols, effs, sparse_levels)}
+elif cv is not None:
+    # Gram은 재사용, 레버리지(또는 클러스터 점수 합) 계산에 청크 단위 한 패스.
+    # 설계행렬은 폴드 순으로 정렬돼 있으므로 클러스터 코드도 같은 순서로 맞춤.
+    full = cv.fit(cov="cluster" if se_type == "cluster" else "HC3",
+                  clusters=cluster_codes[row_order] if cluster_codes is not None else None)
+    coef_full = pd.DataFrame({"feature": coef_names, "coef": full["params"], f"se_{se_type}": full["bse"]})
+    coef_full.to_csv(OUT_DIR/f"coef_full_{se_type}.csv", index=False)
+    print(f"▶ Full-sample coefficients with {se_type.upper()} SE saved → {OUT_DIR/f'coef_full_{se_type}.csv'} "
+          f"(rank={full['rank']}/{len(coef_names)}"
+          f"{', clusters=' + str(full['n_clusters']) if se_type == 'cluster' else ''})")
+elif fe_codes:
+    # 전체 표본 흡수 적합(클러스터 키가 있으면 클러스터, 없으면 HC1 ─ 흡수 모형에는 HC3 레버리지 없음).
+    se_type = "cluster" if cluster_codes is not None else "hc1"
+    fe_full = absorbed_fit(X_feat, y_arr, fe_codes, tol=args.fe_tol,
+                           cov="cluster" if se_type == "cluster" else "HC1", clusters=cluster_codes)
+    kept = [c for c, k in zip(features, fe_full["keep"]) if k]
+    coef_full = pd.DataFrame({"feature": kept, "coef": fe_full["params"], f"se_{se_type}": fe_full["bse"]})
+    coef_full.to_csv(OUT_DIR/f"coef_full_{se_type}.csv", index=False)
+    print(f"▶ Full-sample absorbed-FE coefficients with {se_type.upper()} SE saved → "
+          f"{OUT_DIR/f'coef_full_{se_type}.csv'} (absorbed dof={fe_full['dof_absorbed']}"
+          f"{', clusters=' + str(fe_full['n_clusters']) if se_type == 'cluster' else ''})")
+    # 산출물: 상수항 + 식별된 피처 계수 + 수준별 흡수 효과(상수항 공분산은 없으므로 NaN 행·열).
+    cov = np.full((len(kept) + 1,) * 2, np.nan)
+    cov[1:, 1:] = fe_full["cov"]
+    full = {"params": np.concatenate([[fe_full["const"]], fe_full["params"]]), "cov": cov,
+            "cov_type": "cluster" if se_type == "cluster" else "HC1"}
+    coef_names = ["const"] + kept
+    fe_effects = {c: pd.Series(a, index=lv) for c, a, lv in zip(absorb_cols, fe_full["alphas"], fe_levels)}
+
+# 부트스트랩 계수 구간(복제 B개의 가중 Gram을 배치 행렬곱으로 누적해 한 번에 풀이).
+if args.bootstrap > 0:
+    if cv is None:
+        raise ValueError("--bootstrap is available for plain OLS only (no --absorb/--sparse_fe/--engine hgb)")
+    boot_codes = None
+    if args.boot_scheme == "cluster":
+        if args.boot_cluster not in df.columns:
+            raise ValueError(f"Bootstrap cluster column not found in data: {args.boot_cluster}")
+        boot_codes = factorize_columns(df, [args.boot_cluster])[0][row_order]
+        if (boot_codes < 0).any():
+            raise ValueError(f"Bootstrap cluster column has missing values: {args.boot_cluster}")
+    draws = bootstrap_coefs(cv.X, cv.y, args.bootstrap, args.boot_scheme, boot_codes, seed=0, n_jobs=args.n_jobs,
+                            memory_mb=args.memory_budget / 4 if args.memory_budget else None)
+    boot_df = pd.DataFrame({"feature": coef_names, "coef": cv.fit()["params"],
+                            **percentile_intervals(draws, args.boot_level)})
+    boot_df.to_csv(OUT_DIR/"coef_bootstrap.csv", index=False)
+    print(f"▶ {args.bootstrap} {args.boot_scheme} bootstrap replicates "
+          f"({args.boot_level:.0%} percentile intervals) saved → {OUT_DIR/'coef_bootstrap.csv'}")
+shared.close()
+train_dtypes = frame_dtypes(df, features)
+fingerprint = data_fingerprint([df], features + [target])
+fe_note = absorb_cols + sparse_cols
+
+save_results(features, coef_names, full, train_dtypes, fingerprint, fe_note, fe_effects)
@@ -2,8 +2,14 @@ import argparse
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from statsmodels.nonparametric.smoothers_lowess import lowess
+
+from date_index import ensure_month_idx, month_idx_values
+from event_study import coef_table, event_study, pretrend_test, tau_bins
+from figure_service import FigureQueue
+from fixed_effects import factorize_columns
+from launch_calendar import LaunchCalendar
+from scale_curve import (POOLED, bootstrap_curves, cluster_aggregates, cohort_codes, curve_bands, curve_table,
+                         smooth_curves, tau_aggregates)
 
 # ---------------------------------------------------------------------------
 # 1. CLI 설정.
@@ -11,63 +17,140 @@ parser = argparse.ArgumentParser(description="Event study: price vs tau")
 parser.add_argument("--panel_feat", default="output/panel_feat.parquet", help="panel feat data path")
 parser.add_argument("--meta_a", default="output/layer_A_complex_meta.pickle", help="A layer meta pickle with expected move-in date")
 parser.add_argument("--frac", type=float, default=0.15, help="LOWESS smoothing fraction")
+parser.add_argument("--cohort_cols", default="시군구명",
+                    help="comma-separated cohort columns (panel or meta A, e.g. new town / generation); "
+                         "the pooled 'all' curve is always included")
+parser.add_argument("--unweighted", action="store_true",
+                    help="smooth tau means without transaction-count weights (previous behaviour)")
+parser.add_argument("--n_jobs", type=int, default=1, help="number of worker processes for per-cohort smoothing")
 parser.add_argument("--tau_min", type=int, default=-36, help="minimum tau")
 parser.add_argument("--tau_max", type=int, default=60, help="maximum tau")
 parser.add_argument("--output_csv", default="output/scale_curve.csv", help="output CSV path")
 parser.add_argument("--output_fig", default="output/fig_scale_curve.png", help="output figure path")
+parser.add_argument("--n_boot", type=int, default=0,
+                    help="complex-cluster bootstrap replicates for scale-curve bands (0 = no bands)")
+parser.add_argument("--boot_level", type=float, default=0.95, help="bootstrap band coverage")
+parser.add_argument("--boot_seed", type=int, default=0, help="bootstrap random seed")
+parser.add_argument("--regression", action="store_true",
+                    help="also estimate the leads-and-lags event-study regression (complex + month FE, clustered SE)")
+parser.add_argument("--es_outcome", default="price_per_m2", help="event-study outcome column")
+parser.add_argument("--es_level", action="store_true", help="use the outcome in levels instead of logs")
+parser.add_argument("--es_bin_width", type=int, default=1, help="tau bin width in months")
+parser.add_argument("--es_ref", type=int, default=-1, help="reference tau (its bin is normalised to 0)")
+parser.add_argument("--es_endpoints", choices=["bin", "drop"], default="bin",
+                    help="pool taus outside [tau_min, tau_max] into the end bins, or drop them")
+parser.add_argument("--es_method", choices=["demean", "sparse"], default="demean",
+                    help="fixed-effect handling: alternating-projection demeaning or sparse dummies")
+parser.add_argument("--es_cluster", default="complex_id", help="cluster column for standard errors")
+parser.add_argument("--es_output", default="output/event_study_coef.csv", help="event-study coefficient CSV path")
+parser.add_argument("--fig_jobs", type=int, default=2, help="number of figure rendering worker processes (0 = serial)")
 args = parser.parse_args()
 
 # 2. 데이터 로드.
 df = pd.read_parquet(args.panel_feat)
-# complex_id 타입 일치화.
-df['complex_id'] = df['complex_id'].astype(str).str.replace(r"\.0$", "", regex=True)
-df['complex_id'] = df['complex_id'].astype(str)
-# Load meta and ensure key types
 meta = pd.read_pickle(args.meta_a)
-meta['complex_id'] = meta['complex_id'].astype(str)
 
-# 예상 입주일 컬럼 식별.
-# Assuming meta contains '사용승인일' or similar; find first date-like col
-date_cols = [c for c in meta.columns if '승인' in c or '입주' in c]
-if not date_cols:
-    raise ValueError("No expected move-in date column found in meta A")
-exp_col = date_cols[0]
+# 코호트 컬럼(패널에 없으면 메타 A의 단지 속성에서 가져옴).
+cohort_cols = [c.strip() for c in args.cohort_cols.split(',') if c.strip()]
+meta_cols = [c for c in cohort_cols if c not in df.columns]
+missing = [c for c in meta_cols if c not in meta.columns]
+if missing:
+    raise ValueError(f"Cohort columns not found in panel or meta A: {missing}")
 
-# 예상 입주일 파싱.
-meta['expected_date'] = pd.to_datetime(meta[exp_col], errors='coerce')
-meta['expected_ym'] = meta['expected_date'].dt.to_period('M').dt.to_timestamp()
+# 단지별 입주 월 인덱스(예상 입주일 컬럼 자동 탐지; 09단계와 같은 조회표).
+calendar = LaunchCalendar.from_meta(meta, attrs=meta_cols)
+# 행별 단지 코드로 정수 gather ─ 거래 행에 메타를 병합하지 않음.
+complex_code = calendar.codes(df['complex_id'])
+for c in meta_cols:
+    df[c] = calendar.attr(c, complex_code)
 
-# 패널 피처와 예상 입주일 병합.
-df = df.merge(meta[['complex_id','expected_ym']], on='complex_id', how='left')
+# 02 단계의 month_idx 재사용(없으면 year_month에서 파생).
+df = ensure_month_idx(df)
+# tau = month_idx − launch_idx[단지 코드].
+df['tau'] = calendar.tau(complex_code, month_idx_values(df))
+# 코호트 × tau 칸별 가격 합·건수를 한 번에 집계(tau 범위 밖은 제외).
+codes, cohorts = cohort_codes(df, cohort_cols)
+sums, counts = tau_aggregates(df['tau'].to_numpy(dtype='float64', na_value=np.nan),
+                              df['price_per_m2'].to_numpy(dtype='float64', na_value=np.nan),
+                              codes, len(cohorts), args.tau_min, args.tau_max)
+taus = np.arange(args.tau_min, args.tau_max + 1)
+with np.errstate(invalid='ignore', divide='ignore'):
+    means = sums / counts
+# 코호트별 (건수 가중) LOWESS 병렬 평활.
+smoothed = smooth_curves(sums, counts, taus, frac=args.frac, weighted=not args.unweighted, n_jobs=args.n_jobs)
 
-# year_month를 datetime 타입으로 변환.
-df['year_month'] = pd.to_datetime(df['year_month'])
-# tau 계산.
-df['tau'] = (df['year_month'].dt.year*12 + df['year_month'].dt.month) - (df['expected_ym'].dt.year*12 + df['expected_ym'].dt.month)
-# tau 범위 필터링.
-df = df[(df['tau'] >= args.tau_min) & (df['tau'] <= args.tau_max)]
+# 단지 클러스터 부트스트랩 밴드(선택): 단지별 칸 합계를 한 번 집계 후 복제마다 가중 재집계·재평활.
+bands = None
+if args.n_boot:
+    complex_codes = factorize_columns(df, ['complex_id'])[0]
+    S, N = cluster_aggregates(df['tau'].to_numpy(dtype='float64', na_value=np.nan),
+                              df['price_per_m2'].to_numpy(dtype='float64', na_value=np.nan),
+                              codes, len(cohorts), complex_codes, args.tau_min, args.tau_max)
+    draws = bootstrap_curves(S, N, taus, n_boot=args.n_boot, frac=args.frac, weighted=not args.unweighted,
+                             seed=args.boot_seed, n_jobs=args.n_jobs)
+    bands = curve_bands(draws, taus, level=args.boot_level)
+    print(f"▶ Bootstrap bands: {args.n_boot} complex-cluster replicates ({S.shape[0]} contributing complexes)")
 
-# tau별 원시 평균 가격 집계.
-agg = df.groupby('tau')['price_per_m2'].mean().reset_index(name='raw_mean_price')
-# LOWESS 스무딩.
-tau = agg['tau'].values
-raw = agg['raw_mean_price'].values
-smoothed = lowess(raw, tau, frac=args.frac, return_sorted=True)
-# smoothed는 (tau, 가격) 배열.
-agg['smoothed_price'] = np.interp(tau, smoothed[:,0], smoothed[:,1])
+# 롱 포맷 CSV 저장(cohort_var, cohort, tau, n_obs, raw_mean_price, smoothed_price[, 밴드]).
+curve = curve_table(cohorts, taus, counts, means, smoothed, extra=bands)
+curve.to_csv(args.output_csv, index=False)
+print(f"▶ 스케일 곡선 CSV 저장 → {args.output_csv} ({len(cohorts)} cohorts)")
+agg = curve[curve['cohort_var'] == POOLED]
 
-# Save CSV
-agg.to_csv(args.output_csv, index=False)
-print(f"▶ 스케일 곡선 CSV 저장 → {args.output_csv}")
+# 리드·래그 회귀(선택): tau 구간 더미 + 단지·역월 고정효과 흡수, 클러스터 표준오차.
+es = None
+if args.regression:
+    y_raw = df[args.es_outcome].to_numpy(dtype='float64', na_value=np.nan)
+    month = month_idx_values(df)
+    ok = np.isfinite(y_raw) & np.isfinite(month) & df['complex_id'].notna().to_numpy()
+    ok &= df[args.es_cluster].notna().to_numpy()
+    if not args.es_level:
+        ok &= y_raw > 0
+    bins, starts, ref_bin, keep = tau_bins(df['tau'].to_numpy(dtype='float64', na_value=np.nan),
+                                           args.tau_min, args.tau_max, width=args.es_bin_width,
+                                           ref=args.es_ref, endpoints=args.es_endpoints)
+    ok &= keep
+    reg = df.loc[ok, list(dict.fromkeys(['complex_id', args.es_cluster]))].assign(month_idx=month[ok])
+    y_es = y_raw[ok] if args.es_level else np.log(y_raw[ok])
+    fe_codes = factorize_columns(reg, ['complex_id', 'month_idx'])
+    cluster_codes = factorize_columns(reg, [args.es_cluster])[0]
+    fit = event_study(y_es, bins[ok], len(starts), ref_bin, fe_codes, cluster_codes, method=args.es_method)
+    es = coef_table(fit, starts, args.es_bin_width, ref_bin)
+    es.to_csv(args.es_output, index=False)
+    print(f"▶ Event-study coefficients saved → {args.es_output} "
+          f"(n={fit['n']}, clusters={fit['n_clusters']}, FE iterations={fit['n_iter']})")
+    pre = pretrend_test(fit, ref_bin)
+    if pre is not None:
+        print(f"   Pre-trend Wald χ²({pre['df']}) = {pre['wald']:.2f}, p = {pre['p_value']:.3f}")
 
 # Plot
-plt.figure(figsize=(8,4))
-plt.plot(agg['tau'], agg['raw_mean_price'], color='gray', label='Raw mean')
-plt.plot(agg['tau'], agg['smoothed_price'], color='red', label='LOWESS smoothed')
-plt.xlabel('사건 시점(tau 개월)')
-plt.ylabel('평균 평당 가격')
-plt.title('사건 연구: 가격 vs tau')
-plt.legend()
-plt.tight_layout()
-plt.savefig(args.output_fig, dpi=150)
+figs = FigureQueue(Path(args.output_fig).parent, n_jobs=args.fig_jobs)
+figs.submit(args.output_fig, "lines", {"lines": [
+    {"x": agg['tau'].to_numpy(), "y": agg['raw_mean_price'].to_numpy(), "color": 'gray', "label": 'Raw mean'},
+    {"x": agg['tau'].to_numpy(), "y": agg['smoothed_price'].to_numpy(), "color": 'red', "label": 'LOWESS smoothed'},
+] + ([
+    {"x": agg['tau'].to_numpy(), "y": agg['smoothed_lo'].to_numpy(), "color": 'red', "linestyle": '--',
+     "label": f'{args.boot_level:.0%} bootstrap band'},
+    {"x": agg['tau'].to_numpy(), "y": agg['smoothed_hi'].to_numpy(), "color": 'red', "linestyle": '--'},
+] if bands is not None else [])}, figsize=(8, 4), xlabel='사건 시점(tau 개월)', ylabel='평균 평당 가격', title='사건 연구: 가격 vs tau')
+# 첫 코호트 컬럼 수준별 평활 곡선 비교.
+if cohort_cols:
+    sub = curve[curve['cohort_var'] == cohort_cols[0]]
+    out_cohort = Path(args.output_fig).with_name(Path(args.output_fig).stem + '_cohorts.png')
+    figs.submit(out_cohort, "lines", {"lines": [
+        {"x": g['tau'].to_numpy(), "y": g['smoothed_price'].to_numpy(), "label": str(name)}
+        for name, g in sub.groupby('cohort', sort=True)
+    ]}, figsize=(8, 4), xlabel='사건 시점(tau 개월)', ylabel='평균 평당 가격',
+        title=f'코호트별 스케일 곡선: {cohort_cols[0]}')
+if es is not None:
+    est = es[es['coef'].notna()]
+    figs.submit(Path(args.es_output).with_name('fig_event_study.png'), "lines", {"lines": [
+        {"x": est['tau_start'].to_numpy(), "y": est['coef'].to_numpy(), "color": 'navy', "marker": 'o',
+         "markersize": 3, "label": 'Coefficient'},
+        {"x": est['tau_start'].to_numpy(), "y": est['ci_low'].to_numpy(), "color": 'navy', "linestyle": '--',
+         "label": '95% CI'},
+        {"x": est['tau_start'].to_numpy(), "y": est['ci_high'].to_numpy(), "color": 'navy', "linestyle": '--'},
+    ]}, figsize=(8, 4), xlabel='사건 시점(tau 개월)', ylabel='로그 가격 효과' if not args.es_level else '가격 효과',
+        title='리드·래그 사건 연구(단지·월 고정효과)')
+figs.close()
 print(f"▶ 플롯 저장 → {args.output_fig}") 
\ No newline at end of file
@@ -3,7 +3,13 @@ from pathlib import Path
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import statsmodels.api as sm
+
+from date_index import ensure_month_idx, month_idx_values
+from launch_calendar import LaunchCalendar
+from model_artifact import HedonicModel
+from panel_io import read_panel, write_chunks
+from scale_curve import POOLED, select_curve
+from scenario_grid import iter_band_frames, parse_grid, scale_path, scenario_table, shock_multipliers
 
 # ---------------------------------------------------------------------------
 # 1. CLI 설정.
@@ -12,75 +18,115 @@ parser = argparse.ArgumentParser(description="Predict 3rd phase hedonic prices w
 parser.add_argument("--panel", default="output/panel_model_transformed.parquet", help="Transformed panel data path")
 parser.add_argument("--meta_a", default="output/layer_A_complex_meta.pickle", help="A layer meta pickle with launch date")
 parser.add_argument("--launch_date_col", default="사용승인일", help="column name in meta A for launch date")
-parser.add_argument("--model_coef", default="output/coef_mean.csv", help="CSV of mean regression coefficients")
+parser.add_argument("--model", default="output/model.json",
+                    help="07단계 모델 산출물(계수·피처 스키마·변환 파라미터, 변환 타겟 역변환)")
+parser.add_argument("--batch_size", type=int, default=100_000, help="예측 배치 행 수")
 parser.add_argument("--scale_curve", default="output/scale_curve.csv", help="CSV of tau vs smoothed price curve")
+parser.add_argument("--scale_cohort", default=POOLED,
+                    help="Cohort of the long-format scale curve to apply (default: pooled 'all')")
 parser.add_argument("--tau_list", default="36,60", help="Comma-separated tau values to compute")
+parser.add_argument("--scenario_out", default="output/pred_3rd_bands.parquet",
+                    help="Scenario-grid price band table (complex × tau × scenario); empty string to skip")
+parser.add_argument("--scenario_taus", default="0:120", help="Tau grid: 'start:stop[:step]' (inclusive) or list")
+parser.add_argument("--rate_shocks", default="-1,-0.5,0,0.5,1", help="Interest-rate shocks in %p (grid spec)")
+parser.add_argument("--ltv_shocks", default="-10,0,10", help="LTV cap shocks in %p (grid spec)")
+parser.add_argument("--supply_shocks", default="-0.2,0,0.2", help="Proportional supply shocks (grid spec)")
+parser.add_argument("--rate_elasticity", type=float, default=-0.03, help="Log-price change per 1%p rate shock")
+parser.add_argument("--ltv_elasticity", type=float, default=0.004, help="Log-price change per 1%p LTV shock")
+parser.add_argument("--supply_elasticity", type=float, default=-0.1,
+                    help="Log-price change per unit proportional supply shock")
+parser.add_argument("--phase_in", type=float, default=0,
+                    help="Months over which shocks phase in linearly (0 = immediate)")
+parser.add_argument("--scenario_block_rows", type=int, default=2_000_000, help="Rows per written block")
 parser.add_argument("--output_csv", default="output/pred_3rd.csv", help="Predictions output CSV")
 parser.add_argument("--output_fig", default="output/fig_pred_3rd.png", help="Predictions figure path")
 args = parser.parse_args()
 
 # 2. 입력 데이터 로드.
-panel_trans = pd.read_parquet(args.panel)
+panel_trans = read_panel(args.panel)
 # 3. 인덱스 포함 베이스 패널 로드(complex_id, year_month).
-panel_base = pd.read_parquet("output/panel_panel.parquet")
+panel_base = read_panel("output/panel_panel.parquet")
 panel_base = panel_base.reset_index()
 # 4. 베이스 패널 인덱스와 변환된 피처 결합.
 panel_trans = panel_trans.reset_index(drop=True)
+# 05 단계부터 키 컬럼이 함께 저장되므로 중복 제거 후 결합.
+panel_trans = panel_trans.drop(columns=['complex_id','year_month','month_idx'], errors='ignore')
 if len(panel_base) != len(panel_trans):
     raise ValueError("Row count mismatch between panel_base and panel_transformed")
-panel = pd.concat([panel_base[['complex_id','year_month']], panel_trans.reset_index(drop=True)], axis=1)
-# 5. 메타 병합을 위해 panel에서 기존 complex_name 제거.
+key_cols = [c for c in ['complex_id','year_month','month_idx'] if c in panel_base.columns]
+panel = pd.concat([panel_base[key_cols], panel_trans.reset_index(drop=True)], axis=1)
+# 5. 단지명은 메타 A 조회표에서 가져오므로 panel의 기존 complex_name 제거.
 if 'complex_name' in panel.columns:
     panel.drop(columns=['complex_name'], inplace=True)
-panel['complex_id'] = panel['complex_id'].astype(str).str.replace(r"\.0$", "", regex=True)
-panel['complex_id'] = panel['complex_id'].astype(str)
 meta = pd.read_pickle(args.meta_a)
-meta['complex_id'] = meta['complex_id'].astype(str)
-coef_df = pd.read_csv(args.model_coef)
-scale_df = pd.read_csv(args.scale_curve)
+model = HedonicModel.load(args.model)
+scale_df = select_curve(pd.read_csv(args.scale_curve), args.scale_cohort)
 
-# 6. 회귀계수 준비.
-coef_series = coef_df.set_index('feature')['coef']
-# 7. 스케일 곡선 매핑 준비.
+# 6~7. 스케일 곡선 매핑 준비.
 scale_map = scale_df.set_index('tau')['smoothed_price'].to_dict()
 f0 = scale_map.get(0, 1.0)
+# 08단계 부트스트랩 비율 밴드(f_τ / f₀의 백분위, 있으면 가격 밴드로 전달).
+has_bands = {'ratio_lo', 'ratio_hi'} <= set(scale_df.columns)
+band_map = scale_df.set_index('tau')[['ratio_lo', 'ratio_hi']] if has_bands else None
 
-# 8. 출시 월 메타 A 처리.
-if args.launch_date_col not in meta.columns:
-    raise ValueError(f"Launch date column '{args.launch_date_col}' not found in meta A")
-meta['launch_date'] = pd.to_datetime(meta[args.launch_date_col], errors='coerce')
-meta['launch_ym'] = meta['launch_date'].dt.to_period('M').dt.to_timestamp()
+# 8. 단지별 출시 월 인덱스(08단계와 같은 조회표, 단지 하나당 정수 하나).
+calendar = LaunchCalendar.from_meta(meta, date_col=args.launch_date_col, attrs=['complex_name'])
 
-# 9. 출시 시점의 패널 피처 병합.
-df = panel.merge(meta[['complex_id','complex_name','launch_ym']], on='complex_id', how='inner')
-df_launch = df[df['year_month'] == df['launch_ym']].copy()
+# 9. 출시 시점 행 선택(tau = month_idx − launch_idx[단지 코드] == 0, 메타 병합 없음).
+panel = ensure_month_idx(panel)
+complex_code = calendar.codes(panel['complex_id'])
+at_launch = calendar.tau(complex_code, month_idx_values(panel)) == 0
+df_launch = panel[at_launch].copy()
 if df_launch.empty:
     raise ValueError("No panel records found for complexes at their launch month")
+launch_code = complex_code[at_launch]
+df_launch['complex_id'] = calendar.keys[launch_code]
+df_launch['complex_name'] = calendar.attr('complex_name', launch_code)
+df_launch['launch_ym'] = calendar.launch_dates(launch_code)
 
-# 10. 피처 행렬 생성.
-feature_cols = [c for c in coef_series.index if c != 'const']
-X = df_launch[feature_cols]
-X_sm = sm.add_constant(X)
-
-# 11. 기본 로그 가격 및 가격 예측.
-base_ln = X_sm.dot(coef_series)
-df_launch['base_price'] = np.exp(base_ln)
+# 10~11. 출시 시점 가격 예측(스키마 검사 후 배치 예측; 변환 피처는 모델에 저장된 λ로 재계산,
+# 변환 타겟이면 역변환해 가격 척도로 반환).
+df_launch['base_price'] = model.score(df_launch, batch_size=args.batch_size, price=True)['pred']
 
 # 12. 향후 tau 가격 계산.
 taus = [int(t) for t in args.tau_list.split(',')]
 for tau in taus:
     f_tau = scale_map.get(tau, np.nan)
     df_launch[f'price_tau{tau}'] = df_launch['base_price'] * (f_tau / f0)
+    if has_bands:
+        lo, hi = band_map.reindex([tau]).iloc[0]
+        df_launch[f'price_tau{tau}_lo'] = df_launch['base_price'] * lo
+        df_launch[f'price_tau{tau}_hi'] = df_launch['base_price'] * hi
 
 # 13. 예측 결과 저장.
-out_cols = ['complex_id','complex_name','launch_ym','base_price'] + [f'price_tau{t}' for t in taus]
+band_cols = [f'price_tau{t}_{b}' for t in taus for b in ('lo', 'hi')] if has_bands else []
+out_cols = ['complex_id','complex_name','launch_ym','base_price'] + [f'price_tau{t}' for t in taus] + band_cols
 df_launch[out_cols].to_csv(args.output_csv, index=False)
 print(f"▶ Predictions saved → {args.output_csv}")
 
+# 13-1. 시나리오 격자 가격 밴드(단지 × tau × 시나리오 브로드캐스트, 단지 블록 단위 Parquet 저장).
+if args.scenario_out:
+    scen_taus = parse_grid(args.scenario_taus).astype('int64')
+    scenarios = scenario_table(parse_grid(args.rate_shocks), parse_grid(args.ltv_shocks),
+                               parse_grid(args.supply_shocks))
+    path = scale_path(scale_df, scen_taus)
+    mult = shock_multipliers(scenarios, scen_taus, args.rate_elasticity, args.ltv_elasticity,
+                             args.supply_elasticity, phase_in=args.phase_in)
+    frames = iter_band_frames(df_launch['complex_id'].to_numpy(), df_launch['base_price'].to_numpy(),
+                              scen_taus, path, mult, scenarios=scenarios, block_rows=args.scenario_block_rows)
+    n_rows = write_chunks(frames, args.scenario_out)
+    print(f"▶ Scenario bands saved → {args.scenario_out} ({len(df_launch)} complexes × {len(scen_taus)} taus × "
+          f"{len(scenarios)} scenarios = {n_rows} rows; extrapolated taus: {int(path['extrapolated'].sum())})")
+
 # 14. tau별 평균 가격 시각화.
 mean_prices = df_launch[['base_price'] + [f'price_tau{t}' for t in taus]].mean()
+yerr = None
+if has_bands:
+    lo = np.r_[mean_prices['base_price'], [df_launch[f'price_tau{t}_lo'].mean() for t in taus]]
+    hi = np.r_[mean_prices['base_price'], [df_launch[f'price_tau{t}_hi'].mean() for t in taus]]
+    yerr = np.vstack([mean_prices.to_numpy() - lo, hi - mean_prices.to_numpy()])
 plt.figure(figsize=(6,4))
-mean_prices.plot(kind='bar')
+mean_prices.plot(kind='bar', yerr=yerr, capsize=4)
 plt.ylabel('Predicted price per m2')
 plt.title('Predicted price at launch and future tau')
 plt.tight_layout()
@@ -2,47 +2,61 @@ import argparse
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
-from pandas.api.types import is_numeric_dtype
+
+from dist_transform import ensure_transformed
+from diagnostics import binned_histogram, qq_from_values
+from figure_service import FigureQueue
+from gram_ols import chunk_rows
+from model_artifact import HedonicModel
+from panel_io import panel_columns, read_panel
 
 # ---------------------------------------------------------------------------
 # 1. CLI 설정.
 # ---------------------------------------------------------------------------
 parser = argparse.ArgumentParser(description="Residual time series analysis for hedonic model")
 parser.add_argument("--panel_feat", default="output/panel_feat.parquet", help="panel feature data path")
-parser.add_argument("--coef", default="output/coef_mean.csv", help="CSV of mean regression coefficients")
+parser.add_argument("--model", default="output/model.json",
+                    help="Model artifact from stage 07 (coefficients, feature schema, transform parameters)")
+parser.add_argument("--batch_size", type=int, default=100_000, help="Rows per scoring batch")
+parser.add_argument("--memory_budget", type=float, default=0,
+                    help="Scoring working-memory budget in MB (0 = use --batch_size); sets the batch size")
 parser.add_argument("--output_dir", default="output", help="Directory to save residual results and plots")
 parser.add_argument("--rolling_window", type=int, default=12, help="Rolling window size in months for trend")
+parser.add_argument("--qq_points", type=int, default=200, help="Number of QQ points drawn from the quantile sketch")
+parser.add_argument("--fig_jobs", type=int, default=2, help="Number of figure rendering worker processes (0 = serial)")
 args = parser.parse_args()
 
 PANEL_PATH = Path(args.panel_feat)
-COEF_PATH = Path(args.coef)
+MODEL_PATH = Path(args.model)
 OUT_DIR = Path(args.output_dir)
 OUT_DIR.mkdir(exist_ok=True, parents=True)
+figs = FigureQueue(OUT_DIR, n_jobs=args.fig_jobs)
+
+# 2. 모델 산출물 로드(계수·피처 순서·변환 파라미터).
+model = HedonicModel.load(MODEL_PATH)
+target = model.target
+print(f"▶ Model loaded from {MODEL_PATH} (target={target}, {len(model.features)} features, "
+      f"{model.meta.get('coef_source')})")
 
-# 2. 데이터 로드.
+# 3. 데이터 로드(모델 입력·타겟·시점 컬럼만 읽음).
+# 피처 파일에 없는 변환 컬럼(yj_*)은 원 피처를 읽어 모델에 저장된 파라미터로 재계산.
 print(f"▶ Loading panel features from {PANEL_PATH}")
-df = pd.read_parquet(PANEL_PATH)
+available = panel_columns(PANEL_PATH)
+model.validate(available)
+wanted = model.input_columns(available) + [target, 'year_month']
+if target not in available and model.transformer is not None:
+    wanted.append(model.transformer.source_feature(target))
+needed = list(dict.fromkeys(c for c in wanted if c in available))
+df = read_panel(PANEL_PATH, columns=needed)
+if 'year_month' in df.index.names:
+    df = df.reset_index()
+df = ensure_transformed(df, [target], model.transformer)
 print(f"   Loaded: {df.shape[0]} rows × {df.shape[1]} cols")
 
-# 3. 회귀계수 로드.
-coef_df = pd.read_csv(COEF_PATH)
-coef_series = coef_df.set_index('feature')['coef']
-
-# 4. 피처 행렬 준비.
-target = 'ln_price'
-# 모델에 사용된 숫자형 피처 컬럼 선택.
-feature_cols = [f for f in coef_series.index if f != 'const' and f in df.columns]
-X = df[feature_cols]
-# 상수항 추가.
-X_sm = sm.add_constant(X)
-
-# 5. 실제값 및 예측값.
+# 4~5. 실제값 및 예측값(스키마 검사 후 배치 예측, 누락 피처는 0 채움 대신 예외).
 y_true = df[target]
-# X_sm 컬럼을 coef_series 인덱스에 맞추기(누락 컬럼은 0으로 채움).
-X_sm = X_sm.reindex(columns=coef_series.index, fill_value=0)
-y_pred = X_sm.dot(coef_series)
+batch_size = chunk_rows(len(model.coef), args.memory_budget) if args.memory_budget else args.batch_size
+y_pred = model.score(df, batch_size=batch_size)["pred"]
 
 # 6. 잔차(로그 공간).
 df_res = pd.DataFrame({
@@ -58,34 +72,22 @@ res_ts['residual_roll_mean'] = res_ts['residual'].rolling(window=args.rolling_wi
 res_ts.to_csv(OUT_DIR / 'residual_timeseries.csv', index=False)
 print(f"▶ Residual time series saved → {OUT_DIR/'residual_timeseries.csv'}")
 
-# 8. 잔차 히스토그램.
-plt.figure(figsize=(6,4))
-plt.hist(df_res['residual'].dropna(), bins=50, color='skyblue', edgecolor='k')
-plt.title('Histogram of Residuals')
-plt.xlabel('Residual (log price)')
-plt.ylabel('Count')
-plt.tight_layout()
-plt.savefig(OUT_DIR / 'fig_residual_hist.png', dpi=150)
-print(f"▶ Residual histogram saved → {OUT_DIR/'fig_residual_hist.png'}")
-plt.close()
+# 8. 잔차 히스토그램(NumPy 사전 구간화 → 행 수와 무관한 명세, 렌더링은 워커 프로세스).
+resid = df_res['residual'].dropna().to_numpy()
+figs.submit(OUT_DIR / 'fig_residual_hist.png', "hist", binned_histogram(resid, bins=50),
+            figsize=(6, 4), color='skyblue', edgecolor='k',
+            title='Histogram of Residuals', xlabel='Residual (log price)', ylabel='Count')
 
-# 9. QQ-플롯.
-gg = sm.qqplot(df_res['residual'].dropna(), line='45', fit=True)
-gg.figure.set_size_inches(6,6)
-gg.figure.tight_layout()
-gg.figure.savefig(OUT_DIR / 'fig_residual_qq.png', dpi=150)
-print(f"▶ QQ-plot of residuals saved → {OUT_DIR/'fig_residual_qq.png'}")
-plt.close()
+# 9. QQ-플롯(분위수 스케치에서 고정 개수 점 + 95% 신뢰 포락선).
+figs.submit(OUT_DIR / 'fig_residual_qq.png', "qq", qq_from_values(resid, n_points=args.qq_points), figsize=(6, 6))
 
 # 10. 잔차 추세 플롯.
-plt.figure(figsize=(8,4))
-plt.plot(res_ts['year_month'], res_ts['residual'], label='Mean Residual', alpha=0.6)
-plt.plot(res_ts['year_month'], res_ts['residual_roll_mean'], label=f'{args.rolling_window}-month Rolling Mean', color='red')
-plt.xlabel('Year-Month')
-plt.ylabel('Mean Residual (log price)')
-plt.title('Residual Trend Over Time')
-plt.legend()
-plt.tight_layout()
-plt.savefig(OUT_DIR / 'fig_residual_trend.png', dpi=150)
-print(f"▶ Residual trend plot saved → {OUT_DIR/'fig_residual_trend.png'}")
-plt.close() 
\ No newline at end of file
+figs.submit(OUT_DIR / 'fig_residual_trend.png', "lines", {"lines": [
+    {"x": res_ts['year_month'].to_numpy(), "y": res_ts['residual'].to_numpy(), "label": 'Mean Residual', "alpha": 0.6},
+    {"x": res_ts['year_month'].to_numpy(), "y": res_ts['residual_roll_mean'].to_numpy(),
+     "label": f'{args.rolling_window}-month Rolling Mean', "color": 'red'},
+]}, figsize=(8, 4), xlabel='Year-Month', ylabel='Mean Residual (log price)', title='Residual Trend Over Time')
+figs.close()
+print(f"▶ Residual histogram saved → {OUT_DIR/'fig_residual_hist.png'}")
+print(f"▶ QQ-plot of residuals saved → {OUT_DIR/'fig_residual_qq.png'}")
+print(f"▶ Residual trend plot saved → {OUT_DIR/'fig_residual_trend.png'}") 
\ No newline at end of file
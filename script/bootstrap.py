@@ -0,0 +1,152 @@
+"""가중 부트스트랩(베이지안·단지 클러스터) 헤도닉 계수 구간 ── 배치 Gram 행렬 연산.
+
+복제 B개의 가중 Gram 행렬 Gᵦ = Xᵀ diag(wᵦ) X 를 행 청크마다 복제별 행렬곱
+Xcᵀ(wᵦ∘Xc)로 누적하고(행별 xxᵀ를 펼친 청크 × p² 행렬은 만들지 않음), B개의 정규방정식을
+한 번에 푼다. OLS 계수는 가중치의 상수배에 불변이므로 디리클레 가중치는 정규화 없이 Exp(1)
+난수로 만든다.
+
+- ``dirichlet``: 행마다 Exp(1) 가중치(베이지안 부트스트랩).
+- ``cluster``: 클러스터(단지)를 복원추출한 횟수(다항분포)를 가중치로 쓴다. 클러스터별 Gram
+  (C × p²)이 메모리 예산 안이면 먼저 합산해 복제 하나의 비용을 클러스터 수에 비례하게 하고,
+  넘으면 횟수를 행에 펼쳐 행 청크 누적으로 계산한다(같은 난수라 결과 동일).
+
+복제는 블록 단위로 나눠 ``parallel_map``으로 실행하며, 블록마다 ``SeedSequence`` 자식
+시드를 쓰므로 결과는 워커 수와 무관하다.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from gram_ols import CHUNK_MB, GramFactor, chunk_rows
+from parallel_jobs import parallel_map
+
+
+def _gram(X: np.ndarray, chunk: int) -> np.ndarray:
+    p = X.shape[1]
+    G = np.zeros((p, p))
+    for s in range(0, len(X), chunk):
+        Xc = np.asarray(X[s:s + chunk], dtype="float64")
+        G += Xc.T @ Xc
+    return G
+
+
+def cluster_stats(X: np.ndarray, y: np.ndarray, codes: np.ndarray, chunk: int = 65_536):
+    """클러스터별 (XᵀX, Xᵀy) 합계 ── (C, p, p), (C, p)."""
+    codes = np.asarray(codes, dtype="int64")
+    C, p = int(codes.max()) + 1, X.shape[1]
+    UG = np.zeros((C, p, p))
+    Ub = np.zeros((C, p))
+    for s in range(0, len(X), chunk):
+        Xc = np.asarray(X[s:s + chunk], dtype="float64")
+        yc = np.asarray(y[s:s + chunk], dtype="float64")
+        cc = codes[s:s + chunk]
+        # 코드 순 정렬 후 구간 합(reduceat)으로 클러스터 합계 누적(임시 메모리는 청크 × p).
+        order = np.argsort(cc, kind="stable")
+        cs, Z = cc[order], Xc[order]
+        starts = np.flatnonzero(np.r_[True, cs[1:] != cs[:-1]])
+        for j in range(p):
+            UG[cs[starts], :, j] += np.add.reduceat(Z * Z[:, j:j + 1], starts, axis=0)
+        Ub[cs[starts]] += np.add.reduceat(Z * yc[order, None], starts, axis=0)
+    return UG, Ub
+
+
+def _solve_batch(G: np.ndarray, b: np.ndarray, null: np.ndarray) -> np.ndarray:
+    """B개의 정규방정식을 대각 스케일링 후 한 번에 풀이.
+
+    특이하면 유사역행렬 해를 전체 표본 영공간(``null``)에 직교하도록 사영해 ``GramFactor``와
+    같은 최소 노름 해로 맞춘다(양의 가중치는 영공간을 바꾸지 않음).
+    """
+    d = np.sqrt(np.clip(np.einsum("bii->bi", G), 0, None))
+    s = 1.0 / np.where(d > 0, d, 1.0)
+    Gs = G * s[:, :, None] * s[:, None, :]
+    bs = b * s
+    try:
+        L = np.linalg.cholesky(Gs)
+        z = np.linalg.solve(L, bs[:, :, None])
+        beta = np.linalg.solve(np.swapaxes(L, 1, 2), z)[:, :, 0]
+        if np.isfinite(beta).all():
+            return beta * s
+    except np.linalg.LinAlgError:
+        pass
+    beta = np.einsum("bij,bj->bi", np.linalg.pinv(Gs, rcond=1e-10, hermitian=True), bs) * s
+    return beta - (beta @ null) @ null.T
+
+
+def _row_block(X, y, n_rep: int, seed, chunk: int, null: np.ndarray,
+               codes: Optional[np.ndarray] = None) -> np.ndarray:
+    """행 청크 누적 복제 블록의 계수 (n_rep, p).
+
+    ``codes``가 없으면 행마다 Exp(1) 가중치, 있으면 클러스터 복원추출 횟수를 행에 펼쳐 쓴다.
+    Exp(1) 난수는 행 순서로(행마다 n_rep개) 소비하므로 결과가 청크 크기와 무관하다.
+    """
+    rng = np.random.default_rng(seed)
+    p = X.shape[1]
+    if codes is not None:
+        C = int(codes.max()) + 1
+        Wc = rng.multinomial(C, np.full(C, 1.0 / C), size=n_rep).astype("float64")
+    G = np.zeros((n_rep, p, p))
+    b = np.zeros((n_rep, p))
+    for s in range(0, len(X), chunk):
+        Xc = np.asarray(X[s:s + chunk], dtype="float64")
+        yc = np.asarray(y[s:s + chunk], dtype="float64")
+        W = rng.exponential(size=(len(Xc), n_rep)).T if codes is None else Wc[:, codes[s:s + chunk]]
+        for r in range(n_rep):
+            G[r] += Xc.T @ (Xc * W[r, :, None])
+        b += W @ (Xc * yc[:, None])
+    return _solve_batch(G, b, null)
+
+
+def _cluster_block(UG, Ub, n_rep: int, seed, null: np.ndarray) -> np.ndarray:
+    """클러스터 복원추출(다항 횟수 가중치) 복제 블록의 계수 (n_rep, p)."""
+    rng = np.random.default_rng(seed)
+    C, p = Ub.shape
+    W = rng.multinomial(C, np.full(C, 1.0 / C), size=n_rep).astype("float64")
+    return _solve_batch((W @ UG.reshape(C, -1)).reshape(n_rep, p, p), W @ Ub, null)
+
+
+def bootstrap_coefs(X: np.ndarray, y: np.ndarray, n_boot: int = 1_000, scheme: str = "dirichlet",
+                    clusters: Optional[np.ndarray] = None, seed: int = 0, n_jobs: int = 1,
+                    block: int = 250, memory_mb: Optional[float] = None) -> np.ndarray:
+    """부트스트랩 계수 행렬 (n_boot, p).
+
+    Parameters
+    ----------
+    X, y : 설계행렬(상수항 포함)과 타겟(결측 없음, 병렬 실행 시 memmap 권장).
+    scheme : ``"dirichlet"``(행 가중치) 또는 ``"cluster"``(``clusters`` 코드 필요).
+    block : 작업 하나가 맡는 복제 수(누적 Gram block × p² × 8바이트는 청크와 별도).
+    memory_mb : 작업 하나의 청크 임시 메모리(기본 ``CHUNK_MB``) ── 청크 행 수는
+        (block + 2p) × 8바이트 기준으로 정하고, 클러스터별 Gram(C × p² × 8바이트)이 이 값을
+        넘으면 행 청크 누적으로 전환한다.
+    """
+    p = X.shape[1]
+    chunk = chunk_rows(block + 2 * p, memory_mb)
+    null = GramFactor(_gram(X, chunk_rows(p, memory_mb))).null
+    sizes = [min(block, n_boot - s) for s in range(0, n_boot, block)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if scheme == "dirichlet":
+        tasks = [(X, y, m, sd, chunk, null) for m, sd in zip(sizes, seeds)]
+        parts = parallel_map(_row_block, tasks, n_jobs)
+    elif scheme == "cluster":
+        if clusters is None:
+            raise ValueError("cluster bootstrap requires cluster codes")
+        codes = np.asarray(clusters, dtype="int64")
+        if (int(codes.max()) + 1) * p * p * 8 <= (memory_mb or CHUNK_MB) * 1024 ** 2:
+            UG, Ub = cluster_stats(X, y, codes, chunk_rows(p, memory_mb))
+            parts = parallel_map(_cluster_block, [(UG, Ub, m, sd, null) for m, sd in zip(sizes, seeds)],
+                                 n_jobs)
+        else:
+            tasks = [(X, y, m, sd, chunk, null, codes) for m, sd in zip(sizes, seeds)]
+            parts = parallel_map(_row_block, tasks, n_jobs)
+    else:
+        raise ValueError(f"unknown bootstrap scheme: {scheme}")
+    return np.vstack(parts)
+
+
+def percentile_intervals(draws: np.ndarray, level: float = 0.95) -> Dict[str, np.ndarray]:
+    """계수별 부트스트랩 평균·표준편차·백분위 구간."""
+    a = (1 - level) / 2
+    lo, hi = np.nanquantile(draws, [a, 1 - a], axis=0)
+    return {"boot_mean": np.nanmean(draws, axis=0), "boot_se": np.nanstd(draws, axis=0, ddof=1),
+            "ci_low": lo, "ci_high": hi}
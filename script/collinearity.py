@@ -0,0 +1,139 @@
+"""다중공선성 진단 ── 스트리밍 적률 누적 기반 닫힌형 VIF.
+
+컬럼별 OLS를 반복하지 않고, 전체 행에 대한 평균·공적률(co-moment) 행렬을 청크 단위로
+누적(Chan 병합 공식)한 뒤 상관행렬 R의 역행렬 대각원소로 모든 VIF를 한 번에 구한다.
+같은 고유분해에서 조건수(condition number)·조건지수와 근사 중복 컬럼도 함께 산출한다.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class MomentAccumulator:
+    """결측 행을 제외(listwise)하며 평균·공적률 행렬을 병합 누적."""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.n = 0
+        self.mean = np.zeros(p)
+        self.comoment = np.zeros((p, p))
+
+    def update(self, X) -> "MomentAccumulator":
+        """청크 하나를 누적(NaN이 포함된 행은 제외)."""
+        if isinstance(X, pd.DataFrame):
+            X = X[self.columns].to_numpy(dtype="float64", na_value=np.nan)
+        X = np.asarray(X, dtype="float64")
+        X = X[np.isfinite(X).all(axis=1)]
+        m = len(X)
+        if m == 0:
+            return self
+        mean_b = X.mean(axis=0)
+        Xc = X - mean_b
+        M_b = Xc.T @ Xc
+        return self._merge(m, mean_b, M_b)
+
+    def merge(self, other: "MomentAccumulator") -> "MomentAccumulator":
+        """다른 누적기(예: 병렬 작업 결과)를 병합."""
+        if other.columns != self.columns:
+            raise ValueError("cannot merge accumulators with different columns")
+        return self._merge(other.n, other.mean, other.comoment)
+
+    def _merge(self, m: int, mean_b: np.ndarray, M_b: np.ndarray) -> "MomentAccumulator":
+        if m == 0:
+            return self
+        n = self.n + m
+        delta = mean_b - self.mean
+        self.comoment += M_b + np.outer(delta, delta) * (self.n * m / n)
+        self.mean += delta * (m / n)
+        self.n = n
+        return self
+
+    # ------------------------------------------------------------------
+    def covariance(self) -> np.ndarray:
+        return self.comoment / max(self.n - 1, 1)
+
+    def correlation(self) -> np.ndarray:
+        sd = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            R = self.comoment / np.outer(sd, sd)
+        return R
+
+
+def accumulate(chunks: Iterable, columns: Sequence[str]) -> MomentAccumulator:
+    """청크 이터러블(DataFrame 또는 ndarray)을 한 번 순회하며 누적."""
+    acc = MomentAccumulator(columns)
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc
+
+
+def frame_chunks(df: pd.DataFrame, chunk_rows: int = 100_000):
+    """메모리 상의 DataFrame을 행 청크로 나누는 제너레이터."""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def collinearity_report(acc: MomentAccumulator,
+                        dup_threshold: float = 0.98,
+                        eig_tol: float = 1e-10) -> Dict[str, object]:
+    """누적 적률로부터 VIF·조건수·근사 중복 컬럼 진단.
+
+    Returns
+    -------
+    dict
+        ``vif``: feature/vif/r2 DataFrame(상수 컬럼은 NaN, 완전 공선 컬럼은 inf),
+        ``near_duplicates``: |r| ≥ ``dup_threshold``인 컬럼 쌍,
+        ``condition_number``: 표준화 설계행렬의 조건수 √(λmax/λmin),
+        ``condition_indices``: 고유값별 조건지수, ``constant``: 분산 0 컬럼 목록.
+    """
+    cols = np.array(acc.columns)
+    var = np.diag(acc.comoment)
+    live = var > 0
+    R = acc.correlation()[np.ix_(live, live)]
+    live_cols = cols[live]
+
+    w, V = np.linalg.eigh(R)
+    w_max = w.max() if len(w) else 1.0
+    small = w <= eig_tol * w_max
+    # diag(R⁻¹) = Σ_i V_ji² / λ_i (영공간 방향 성분이 있으면 완전 공선 → inf)
+    inv_diag = (V[:, ~small] ** 2 / w[~small]).sum(axis=1)
+    null_weight = (V[:, small] ** 2).sum(axis=1)
+    inv_diag = np.where(null_weight > 1e-8, np.inf, inv_diag)
+
+    vif = np.full(len(cols), np.nan)
+    vif[live] = inv_diag
+    with np.errstate(divide="ignore"):
+        r2 = 1.0 - 1.0 / vif
+    vif_df = pd.DataFrame({"feature": cols, "vif": vif, "r2": r2})
+
+    iu = np.triu_indices(len(live_cols), k=1)
+    r_pairs = R[iu]
+    hit = np.abs(r_pairs) >= dup_threshold
+    dup_df = pd.DataFrame({
+        "feature_a": live_cols[iu[0][hit]],
+        "feature_b": live_cols[iu[1][hit]],
+        "corr": r_pairs[hit],
+    }).sort_values("corr", key=np.abs, ascending=False, ignore_index=True)
+
+    with np.errstate(divide="ignore"):
+        cond_idx = np.where(small, np.inf, np.sqrt(w_max / np.where(small, 1.0, w)))[::-1]
+    return {
+        "n_rows": int(acc.n),
+        "vif": vif_df,
+        "near_duplicates": dup_df,
+        "condition_number": float(cond_idx[-1]) if len(cond_idx) else float("nan"),
+        "condition_indices": cond_idx,
+        "constant": cols[~live].tolist(),
+    }
+
+
+def vif_from_frame(df: pd.DataFrame, columns: List[str] | None = None,
+                   chunk_rows: int = 100_000, **kwargs) -> Dict[str, object]:
+    """DataFrame 전체 행에 대한 단축 헬퍼."""
+    columns = list(columns) if columns is not None else df.columns.tolist()
+    acc = accumulate(frame_chunks(df[columns], chunk_rows), columns)
+    return collinearity_report(acc, **kwargs)
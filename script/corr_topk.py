@@ -0,0 +1,212 @@
+"""블록 단위 상위 k 상관 탐색 ── p×p 전체 상관행렬을 만들지 않는다.
+
+컬럼을 한 번 표준화해 float32 행렬로 만든 뒤, 컬럼 블록 쌍마다 BLAS 행렬곱
+(Xᵢᵀ Xⱼ)으로 상관을 계산하고 전역 상위 k 쌍(및 선택적으로 피처별 상위 m 상대)만 유지한다.
+결측이 있으면 마스크 행렬곱으로 쌍별 완전 관측(pandas ``corr()``) 정의를 그대로 따른다.
+메모리는 n×p float32 행렬 + 블록 크기² 로 제한된다. Parquet 입력은 ``ColumnBuffer``를
+프로파일러 패스의 consumer로 붙여 float32 행렬을 채우고, 패스가 끝난 뒤 프로파일러의 정확한
+적률로 제자리 표준화한다(p×p 행렬·DataFrame 없음).
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnBuffer:
+    """row group 청크를 받아 (n_rows, p) float32 행렬로 모으는 consumer(컬럼 단위 복사)."""
+
+    def __init__(self, columns: Sequence[str], n_rows: int):
+        self.columns = list(columns)
+        self.X = np.empty((n_rows, len(self.columns)), dtype="float32")
+        self.n = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        m = len(chunk)
+        if self.n + m > len(self.X):
+            raise ValueError(f"more rows than the buffer holds ({len(self.X)})")
+        for j, c in enumerate(self.columns):
+            self.X[self.n:self.n + m, j] = chunk[c].to_numpy(dtype="float64", na_value=np.nan)
+        self.n += m
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.X[:self.n]
+
+
+def standardize(X, mean=None, std=None, dtype=np.float32) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """컬럼 표준화 행렬(결측 0)과 관측 마스크(결측 없으면 None).
+
+    ``mean``/``std``를 넘기면(예: 스트리밍 프로파일러의 정확한 적률) 그대로 사용한다.
+    입력이 이미 ``dtype`` 배열이면 제자리에서 변환한다.
+    """
+    if isinstance(X, pd.DataFrame):
+        X = X.to_numpy(dtype=dtype, na_value=np.nan)
+    Z = np.asarray(X, dtype=dtype)
+    if not Z.flags.writeable:
+        Z = Z.copy()
+    mask = np.isfinite(Z)
+    has_missing = not mask.all()
+    if mean is None or std is None:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nanmean(Z, axis=0, dtype="float64")
+            std = np.nanstd(Z, axis=0, dtype="float64")
+    mean = np.nan_to_num(np.asarray(mean, dtype="float64"))
+    std = np.asarray(std, dtype="float64")
+    std = np.where(np.isfinite(std) & (std > 0), std, np.inf)  # 상수 컬럼 → 0
+    Z -= mean.astype(dtype)
+    Z /= std.astype(dtype)
+    if has_missing:
+        Z[~mask] = 0
+    return Z, (mask if has_missing else None)
+
+
+def _block_corr(Z, M, norms, a: slice, b: slice, min_periods: int) -> np.ndarray:
+    """블록 (a, b)의 상관 ── 결측 없으면 행렬곱 1회, 있으면 쌍별 완전 관측 공식."""
+    Za, Zb = Z[:, a], Z[:, b]
+    if M is None:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            R = (Za.T @ Zb) / np.outer(norms[a], norms[b])
+    else:
+        Ma, Mb = M[:, a].astype(Z.dtype), M[:, b].astype(Z.dtype)
+        N = Ma.T @ Mb
+        Sa, Sb = Za.T @ Mb, Ma.T @ Zb
+        Qa, Qb = (Za * Za).T @ Mb, Ma.T @ (Zb * Zb)
+        P = Za.T @ Zb
+        with np.errstate(invalid="ignore", divide="ignore"):
+            R = (N * P - Sa * Sb) / np.sqrt((N * Qa - Sa * Sa) * (N * Qb - Sb * Sb))
+        R[N < min_periods] = np.nan
+    R[~np.isfinite(R)] = np.nan
+    return np.clip(R, -1, 1)
+
+
+def _merge_topk(vals, rows, cols, new_v, new_r, new_c, k):
+    vals = np.concatenate([vals, new_v])
+    rows = np.concatenate([rows, new_r])
+    cols = np.concatenate([cols, new_c])
+    if len(vals) > k:
+        keep = np.argpartition(-np.abs(vals), k - 1)[:k]
+        vals, rows, cols = vals[keep], rows[keep], cols[keep]
+    return vals, rows, cols
+
+
+def _merge_per_feature(best_v, best_j, idx_rows, R, col_ids, m):
+    """행 피처별 상위 m 상대를 블록 결과와 병합(NaN·자기 자신은 |r|=-1로 밀어냄)."""
+    score = np.where(np.isfinite(R), np.abs(R), -1.0)
+    R = np.where(np.isfinite(R), R, 0).astype(best_v.dtype)
+    cand_v = np.concatenate([best_v[idx_rows], R], axis=1)
+    cand_s = np.concatenate([np.where(best_j[idx_rows] >= 0, np.abs(best_v[idx_rows]), -2.0), score], axis=1)
+    cand_j = np.concatenate([best_j[idx_rows], np.broadcast_to(col_ids, R.shape)], axis=1)
+    top = np.argpartition(-cand_s, m - 1, axis=1)[:, :m]
+    best_v[idx_rows] = np.take_along_axis(cand_v, top, axis=1)
+    best_j[idx_rows] = np.where(np.take_along_axis(cand_s, top, axis=1) >= 0,
+                                np.take_along_axis(cand_j, top, axis=1), -1)
+
+
+def _column_norms(Z: np.ndarray, M) -> Optional[np.ndarray]:
+    if M is not None:
+        return None
+    norms = np.sqrt(np.einsum("ij,ij->j", Z, Z, dtype="float64")).astype(Z.dtype)
+    return np.where(norms > 0, norms, np.nan)
+
+
+def _search(block_corr, p: int, columns: Sequence[str], k: int, per_feature: int,
+            block: int) -> Dict[str, pd.DataFrame]:
+    """블록 (a, b) 상관 함수로 전역 상위 k 쌍과 피처별 상위 m 상대를 누적."""
+    vals = np.empty(0, dtype="float32")
+    rows = np.empty(0, dtype="int64")
+    cols = np.empty(0, dtype="int64")
+    m = min(per_feature, max(p - 1, 0))
+    if m:
+        best_v = np.zeros((p, m), dtype="float32")
+        best_j = np.full((p, m), -1, dtype="int64")
+    starts = range(0, p, block)
+    for a0 in starts:
+        a = slice(a0, min(a0 + block, p))
+        ia = np.arange(a.start, a.stop)
+        for b0 in starts:
+            if b0 < a0:
+                continue
+            b = slice(b0, min(b0 + block, p))
+            ib = np.arange(b.start, b.stop)
+            R = block_corr(a, b)
+            if a0 == b0:
+                R[np.arange(len(ia)), np.arange(len(ia))] = np.nan
+            if m:
+                _merge_per_feature(best_v, best_j, ia, R, ib, m)
+                if a0 != b0:
+                    _merge_per_feature(best_v, best_j, ib, R.T, ia, m)
+            # 상삼각(i<j)만 전역 후보로 사용.
+            ri, rj = np.nonzero(np.isfinite(R) & (ia[:, None] < ib[None, :]))
+            if len(ri) == 0:
+                continue
+            v = R[ri, rj]
+            if len(v) > k:
+                sel = np.argpartition(-np.abs(v), k - 1)[:k]
+                ri, rj, v = ri[sel], rj[sel], v[sel]
+            vals, rows, cols = _merge_topk(vals, rows, cols, v, ia[ri], ib[rj], k)
+
+    order = np.argsort(-np.abs(vals), kind="stable")
+    cols_arr = np.array(list(columns), dtype=object)
+    out = {"pairs": pd.DataFrame({
+        "feature_a": cols_arr[rows[order]],
+        "feature_b": cols_arr[cols[order]],
+        "corr": vals[order].astype("float64"),
+    })}
+    if m:
+        valid = best_j >= 0
+        rank = np.argsort(np.argsort(-np.abs(best_v), axis=1), axis=1) + 1
+        fi = np.repeat(np.arange(p), m).reshape(p, m)
+        pf = pd.DataFrame({
+            "feature": cols_arr[fi[valid]],
+            "partner": cols_arr[best_j[valid]],
+            "corr": best_v[valid].astype("float64"),
+            "rank": rank[valid],
+        })
+        out["per_feature"] = pf.sort_values(["feature", "rank"], ignore_index=True)
+    return out
+
+
+def topk_correlations(X, columns: Sequence[str], k: int = 20, per_feature: int = 0,
+                      block: int = 512, min_periods: int = 2,
+                      mean=None, std=None, n_features: int = 0) -> Dict[str, object]:
+    """절댓값 기준 상위 ``k`` 상관 쌍(과 피처별 상위 ``per_feature`` 상대) 탐색.
+
+    ``X``가 float32 배열이면 제자리에서 표준화하므로 호출 후 재사용하지 않는다.
+    ``n_features``>0이면 상위 쌍에 등장한 피처 ``n_features``개의 상관 부분행렬도 같은
+    표준화 행렬에서 계산한다(히트맵용).
+
+    Returns
+    -------
+    dict
+        ``pairs``: feature_a/feature_b/corr (|corr| 내림차순),
+        ``per_feature``: feature/partner/corr/rank (``per_feature``>0일 때만),
+        ``features``/``submatrix``: 선택 피처와 그 상관 DataFrame(``n_features``>0일 때만).
+    """
+    Z, M = standardize(X, mean, std)
+    norms = _column_norms(Z, M)
+    out = _search(lambda a, b: _block_corr(Z, M, norms, a, b, min_periods),
+                  Z.shape[1], columns, k, per_feature, block)
+    if n_features:
+        feats = top_features(out["pairs"], n_features)
+        pos = {c: j for j, c in enumerate(columns)}
+        idx = np.array([pos[c] for c in feats], dtype="int64")
+        R = _block_corr(Z, M, norms, idx, idx, min_periods).astype("float64")
+        out["features"] = feats
+        out["submatrix"] = pd.DataFrame(R, index=feats, columns=feats)
+    return out
+
+
+def top_features(pairs: pd.DataFrame, n: int = 20) -> list:
+    """상위 상관 쌍에 등장한 순서대로 중복 없이 피처 ``n``개 선택."""
+    seen: list = []
+    for a, b in zip(pairs["feature_a"], pairs["feature_b"]):
+        for f in (a, b):
+            if f not in seen:
+                seen.append(f)
+            if len(seen) == n:
+                return seen
+    return seen
+
@@ -0,0 +1,119 @@
+"""계약 연월·일 정수 필드로부터 날짜/월 인덱스를 만드는 공용 유틸리티.
+
+문자열 변환·``pd.to_datetime(format=...)`` 파싱 없이 NumPy 정수 연산만으로
+``contract_date``(datetime64), ``year_month``(월초 Timestamp), ``month_idx``
+(1970-01 기준 경과 월 수, nullable Int32)를 생성한다. 이후 단계는
+``month_idx``를 재사용하여 날짜를 다시 파싱하지 않는다.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+MONTH_IDX_COL = "month_idx"
+EPOCH_YEAR = 1970
+
+
+# ---------------------------------------------------------------------------
+# 1. 배열 단위 변환.
+# ---------------------------------------------------------------------------
+
+def ym_to_month_idx(ym) -> np.ndarray:
+    """YYYYMM 정수(또는 float) 배열 → 월 인덱스(float, 결측/오류는 NaN)."""
+    ym = np.asarray(ym, dtype="float64")
+    year = np.floor_divide(ym, 100)
+    month = ym - year * 100
+    valid = np.isfinite(ym) & (month >= 1) & (month <= 12) & (year > 0)
+    return np.where(valid, (year - EPOCH_YEAR) * 12 + (month - 1), np.nan)
+
+
+def month_idx_to_datetime(idx) -> np.ndarray:
+    """월 인덱스 → 월초 datetime64[ns] 배열(NaN은 NaT)."""
+    idx = np.asarray(idx, dtype="float64")
+    out = np.full(idx.shape, np.datetime64("NaT"), dtype="datetime64[M]")
+    ok = np.isfinite(idx)
+    out[ok] = idx[ok].astype("int64").astype("datetime64[M]")
+    return out.astype("datetime64[ns]")
+
+
+def month_idx_to_yyyymm(idx) -> np.ndarray:
+    """월 인덱스 → YYYYMM 정수(float, NaN 유지)."""
+    idx = np.asarray(idx, dtype="float64")
+    return (np.floor_divide(idx, 12) + EPOCH_YEAR) * 100 + np.mod(idx, 12) + 1
+
+
+def datetime_to_month_idx(values) -> np.ndarray:
+    """datetime 계열 → 월 인덱스(float, NaT는 NaN)."""
+    dt = pd.to_datetime(pd.Series(values)).to_numpy(dtype="datetime64[ns]")
+    months = dt.astype("datetime64[M]")
+    out = months.astype("int64").astype("float64")
+    out[np.isnat(months)] = np.nan
+    return out
+
+
+def contract_datetime(ym, day, default_day: int | None = None) -> np.ndarray:
+    """계약년월(YYYYMM)·계약일 정수 → datetime64[ns] 배열.
+
+    ``default_day``가 주어지면 결측 일자를 해당 값으로 채우고, 없으면 NaT로 둔다.
+    월의 일수를 넘는 일자 등 잘못된 조합은 ``errors='coerce'``와 같이 NaT가 된다.
+    """
+    idx = ym_to_month_idx(ym)
+    day = np.asarray(day, dtype="float64")
+    if default_day is not None:
+        day = np.where(np.isfinite(day), day, float(default_day))
+    ok = np.isfinite(idx) & np.isfinite(day)
+    months = np.where(ok, idx, 0).astype("int64").astype("datetime64[M]")
+    start = months.astype("datetime64[D]")
+    n_days = ((months + 1).astype("datetime64[D]") - start).astype("int64")
+    day_i = np.where(ok, day, 1).astype("int64")
+    ok &= (day_i >= 1) & (day_i <= n_days)
+    out = start + (day_i - 1).astype("timedelta64[D]")
+    out[~ok] = np.datetime64("NaT")
+    return out.astype("datetime64[ns]")
+
+
+# ---------------------------------------------------------------------------
+# 2. DataFrame 단위 헬퍼.
+# ---------------------------------------------------------------------------
+
+def _as_int_column(values: np.ndarray) -> pd.arrays.IntegerArray:
+    mask = ~np.isfinite(values)
+    return pd.arrays.IntegerArray(np.where(mask, 0, values).astype("int32"), mask)
+
+
+def set_month_columns(df: pd.DataFrame, idx: np.ndarray) -> pd.DataFrame:
+    """월 인덱스로부터 ``month_idx``·``year_month`` 컬럼을 채운다."""
+    df[MONTH_IDX_COL] = _as_int_column(idx)
+    df["year_month"] = month_idx_to_datetime(idx)
+    return df
+
+
+def add_contract_dates(df: pd.DataFrame,
+                       ym_col: str = "contract_ym",
+                       day_col: str = "contract_day",
+                       default_day: int | None = None,
+                       fill_existing: bool = False) -> pd.DataFrame:
+    """정수 계약 필드로 ``contract_date``·``year_month``·``month_idx``를 만든다.
+
+    ``fill_existing=True``이면 이미 있는 ``contract_date``의 결측만 보강한다.
+    """
+    ym = pd.to_numeric(df[ym_col], errors="coerce").to_numpy(dtype="float64")
+    day = pd.to_numeric(df[day_col], errors="coerce").to_numpy(dtype="float64")
+    date = contract_datetime(ym, day, default_day=default_day)
+    if fill_existing and "contract_date" in df.columns:
+        prev = pd.to_datetime(df["contract_date"]).to_numpy(dtype="datetime64[ns]")
+        date = np.where(np.isnat(prev), date, prev)
+    df["contract_date"] = date
+    return set_month_columns(df, datetime_to_month_idx(date))
+
+
+def ensure_month_idx(df: pd.DataFrame, date_col: str = "year_month") -> pd.DataFrame:
+    """``month_idx``가 없으면 ``date_col``에서 한 번만 파생한다."""
+    if MONTH_IDX_COL not in df.columns:
+        df[MONTH_IDX_COL] = _as_int_column(datetime_to_month_idx(df[date_col]))
+    return df
+
+
+def month_idx_values(df: pd.DataFrame) -> np.ndarray:
+    """``month_idx`` 컬럼을 float 배열(결측 NaN)로 반환."""
+    return df[MONTH_IDX_COL].astype("Float64").to_numpy(dtype="float64", na_value=np.nan)
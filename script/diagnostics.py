@@ -0,0 +1,66 @@
+"""대용량 표본용 분포 진단 ── 사전 집계 히스토그램과 축약 QQ 점.
+
+행 수와 무관한 크기의 그림 명세를 만든다. 히스토그램은 NumPy로 미리 구간화한
+(counts, edges)만, QQ 플롯은 분위수 스케치에서 뽑은 고정 개수의 분위수와 정규 순서통계량
+신뢰 포락선만 ``figure_service``로 넘긴다.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from scipy import stats
+
+from qc_profiler import QuantileSketch
+
+
+def binned_histogram(values, bins: int = 50, value_range=None) -> dict:
+    """유한값의 구간 빈도(``{"counts", "edges"}``, figure_service ``hist`` 입력)."""
+    v = np.asarray(values, dtype="float64")
+    v = v[np.isfinite(v)]
+    if len(v) == 0:
+        return {"counts": np.zeros(0), "edges": np.zeros(1)}
+    counts, edges = np.histogram(v, bins=bins, range=value_range)
+    return {"counts": counts, "edges": edges}
+
+
+def qq_points(sketch: QuantileSketch, mean: float, std: float, n: Optional[int] = None,
+              n_points: int = 200, level: float = 0.95) -> dict:
+    """정규 QQ 점(표준화 표본 분위수)과 점별 신뢰 포락선.
+
+    포락선은 정규 순서통계량의 점근 표준오차 √(p(1−p)/n)/φ(z_p)를 이용한
+    ``z_p ± z_{(1+level)/2}·se`` 이다(statsmodels ``qqplot(line="45", fit=True)``와 같은 척도).
+    """
+    n = int(sketch.n if n is None else n)
+    m = int(min(n_points, max(n, 0)))
+    if m == 0 or not np.isfinite(std) or std <= 0:
+        empty = np.zeros(0)
+        return {"theoretical": empty, "sample": empty, "lower": empty, "upper": empty}
+    p = (np.arange(1, m + 1) - 0.5) / m
+    z = stats.norm.ppf(p)
+    sample = (sketch.quantiles(p) - mean) / std
+    se = np.sqrt(p * (1 - p) / n) / stats.norm.pdf(z)
+    zc = stats.norm.ppf(0.5 + level / 2)
+    return {"theoretical": z, "sample": sample, "lower": z - zc * se, "upper": z + zc * se, "n": n}
+
+
+def qq_from_values(values, n_points: int = 200, level: float = 0.95, sketch_k: int = 2_048) -> dict:
+    """배열 하나에서 스케치·평균·표준편차를 만들어 ``qq_points`` 계산."""
+    v = np.asarray(values, dtype="float64")
+    v = v[np.isfinite(v)]
+    sk = QuantileSketch(sketch_k).update(v)
+    std = v.std(ddof=1) if len(v) > 1 else np.nan
+    return qq_points(sk, v.mean() if len(v) else np.nan, std, len(v), n_points, level)
+
+
+def submit_distribution(figs, out_dir, col: str, values, bins: int = 50, n_points: int = 200,
+                        hist_opts: Optional[dict] = None, qq_opts: Optional[dict] = None) -> None:
+    """히스토그램(``fig_hist_{col}.png``)·QQ(``fig_qq_{col}.png``) 명세를 그림 큐에 등록."""
+    out_dir = Path(out_dir)
+    h_opts = {"figsize": (6, 4), "title": f"Histogram of {col}", "xlabel": col, "ylabel": "Count"}
+    h_opts.update(hist_opts or {})
+    q_opts = {"figsize": (6, 6), "title": f"QQ-plot of {col}"}
+    q_opts.update(qq_opts or {})
+    figs.submit(out_dir / f"fig_hist_{col}.png", "hist", binned_histogram(values, bins), **h_opts)
+    figs.submit(out_dir / f"fig_qq_{col}.png", "qq", qq_from_values(values, n_points), **q_opts)
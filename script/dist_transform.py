@@ -0,0 +1,383 @@
+"""분포 변환기 ── 한 번 적합하고 여러 단계에서 같은 파라미터로 적용.
+
+Yeo–Johnson(또는 Box-Cox) λ와 윈저라이즈 경계를 (선택적으로 부분 표본에서) 적합해
+JSON 파라미터 파일로 저장한다. 06 단계가 적합·저장하고, 07·09·10 단계는 파일을 읽어
+같은 변환(``transform``)과 역변환(``inverse_transform``)을 벡터 연산으로 적용한다.
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize_scalar
+
+PARAMS_VERSION = 1
+METHODS = {"yeo-johnson": "yj_", "box-cox": "bc_"}
+LAMBDA_GRID = np.linspace(-3.0, 3.0, 25)
+
+
+# ---------------------------------------------------------------------------
+# 1. 벡터화 변환식.
+# ---------------------------------------------------------------------------
+
+def yeojohnson_transform(x, lam: float) -> np.ndarray:
+    """Yeo–Johnson 변환(NaN 보존)."""
+    x = np.asarray(x, dtype="float64")
+    out = np.full(x.shape, np.nan)
+    pos = x >= 0
+    neg = x < 0
+    if abs(lam) < 1e-12:
+        out[pos] = np.log1p(x[pos])
+    else:
+        out[pos] = np.expm1(lam * np.log1p(x[pos])) / lam
+    if abs(lam - 2) < 1e-12:
+        out[neg] = -np.log1p(-x[neg])
+    else:
+        out[neg] = -np.expm1((2 - lam) * np.log1p(-x[neg])) / (2 - lam)
+    return out
+
+
+def yeojohnson_inverse(y, lam: float) -> np.ndarray:
+    """Yeo–Johnson 역변환(NaN 보존)."""
+    y = np.asarray(y, dtype="float64")
+    out = np.full(y.shape, np.nan)
+    pos = y >= 0
+    neg = y < 0
+    if abs(lam) < 1e-12:
+        out[pos] = np.expm1(y[pos])
+    else:
+        out[pos] = np.expm1(np.log1p(lam * y[pos]) / lam)
+    if abs(lam - 2) < 1e-12:
+        out[neg] = -np.expm1(-y[neg])
+    else:
+        out[neg] = -np.expm1(np.log1p(-(2 - lam) * y[neg]) / (2 - lam))
+    return out
+
+
+def boxcox_transform(x, lam: float) -> np.ndarray:
+    """Box-Cox 변환(양수가 아닌 값은 NaN)."""
+    x = np.asarray(x, dtype="float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lx = np.where(x > 0, np.log(x), np.nan)
+    return lx if abs(lam) < 1e-12 else np.expm1(lam * lx) / lam
+
+
+def boxcox_inverse(y, lam: float) -> np.ndarray:
+    y = np.asarray(y, dtype="float64")
+    if abs(lam) < 1e-12:
+        return np.exp(y)
+    with np.errstate(invalid="ignore"):
+        return np.exp(np.log1p(lam * y) / lam)
+
+
+_FORWARD = {"yeo-johnson": yeojohnson_transform, "box-cox": boxcox_transform}
+_INVERSE = {"yeo-johnson": yeojohnson_inverse, "box-cox": boxcox_inverse}
+
+
+# ---------------------------------------------------------------------------
+# 2. λ 최대우도 추정 ── 피처 전체에 대한 격자 평가 + 피처별 Brent 정밀화.
+# ---------------------------------------------------------------------------
+
+def loglik_grid(X, grid: np.ndarray = LAMBDA_GRID, method: str = "yeo-johnson") -> np.ndarray:
+    """λ 격자 × 컬럼 로그우도 행렬(g × p). ``X``는 NaN을 허용하는 n×p 배열.
+
+    로그 항(log1p|x| 또는 log x)을 한 번만 계산해 두고, 격자점마다 expm1 한 번과
+    결측을 0으로 둔 합계 두 번으로 컬럼별 분산을 구한다(음수가 있는 YJ 컬럼만 음수 분기 계산).
+    """
+    X = np.asarray(X, dtype="float64")
+    X = X[:, None] if X.ndim == 1 else X
+    if method == "box-cox":
+        X = np.where(X > 0, X, np.nan)
+    valid = np.isfinite(X)
+    n = valid.sum(axis=0)
+    n_safe = np.maximum(n, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if method == "yeo-johnson":
+            A = np.where(valid, np.log1p(np.abs(X)), 0.0)
+            neg = valid & (X < 0)
+        else:
+            A = np.where(valid, np.log(X), 0.0)
+            neg = np.zeros_like(valid)
+    jac = np.where(neg, -A, A).sum(axis=0)
+    has_neg = neg.any(axis=0)
+    An = A[:, has_neg]
+    negn = neg[:, has_neg]
+    out = np.empty((len(grid), X.shape[1]))
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for i, lam in enumerate(grid):
+            T = A if abs(lam) < 1e-12 else np.expm1(lam * A) / lam
+            if method == "yeo-johnson" and has_neg.any():
+                mu = 2.0 - lam
+                Tn = -An if abs(mu) < 1e-12 else -np.expm1(mu * An) / mu
+                T = T.copy() if T is A else T
+                T[:, has_neg] = np.where(negn, Tn, T[:, has_neg])
+            T = np.where(valid, T, 0.0)
+            m = T.sum(axis=0) / n_safe
+            D = np.where(valid, T - m, 0.0)
+            var = np.einsum("ij,ij->j", D, D) / n_safe
+            llf = -0.5 * n * np.log(var) + (lam - 1.0) * jac
+            out[i] = np.where(np.isfinite(llf) & (n > 2), llf, -np.inf)
+    return out
+
+
+def _refine_lambda(x: np.ndarray, lo: float, hi: float, method: str) -> float:
+    """격자 최댓값 주변 구간에서 Brent(유계) 최적화(로그 항은 한 번만 계산)."""
+    x = x[np.isfinite(x)]
+    if method == "box-cox":
+        x = x[x > 0]
+        A, neg = np.log(x), np.zeros(len(x), dtype=bool)
+    else:
+        A, neg = np.log1p(np.abs(x)), x < 0
+    n = len(x)
+    jac = np.where(neg, -A, A).sum()
+    An, pos = A[neg], ~neg
+
+    def nll(lam: float) -> float:
+        with np.errstate(over="ignore", invalid="ignore"):
+            T = np.empty(n)
+            T[pos] = A[pos] if abs(lam) < 1e-12 else np.expm1(lam * A[pos]) / lam
+            if len(An):
+                mu = 2.0 - lam
+                T[neg] = -An if abs(mu) < 1e-12 else -np.expm1(mu * An) / mu
+            v = 0.5 * n * np.log(T.var()) - (lam - 1.0) * jac
+        return v if np.isfinite(v) else 1e300
+
+    res = minimize_scalar(nll, bounds=(lo, hi), method="bounded", options={"xatol": 1e-6})
+    return float(res.x)
+
+
+def _parallel_map(fn, arg_list: List[tuple], n_jobs: int) -> list:
+    """fork 프로세스 풀 병렬 map(fork 불가·``n_jobs`` ≤ 1이면 순차)."""
+    if n_jobs <= 1 or len(arg_list) <= 1 or "fork" not in mp.get_all_start_methods():
+        return [fn(*a) for a in arg_list]
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=mp.get_context("fork")) as pool:
+        return list(pool.map(fn, *zip(*arg_list), chunksize=max(1, len(arg_list) // (4 * n_jobs))))
+
+
+def estimate_lambdas(X, method: str = "yeo-johnson", grid: np.ndarray = LAMBDA_GRID,
+                     n_jobs: int = 1) -> np.ndarray:
+    """컬럼별 최대우도 λ ── 격자 로그우도를 한 번에 평가하고 최댓값 인접 구간만 정밀화."""
+    X = np.asarray(X, dtype="float64")
+    X = X[:, None] if X.ndim == 1 else X
+    L = loglik_grid(X, grid, method)
+    best = L.argmax(axis=0)
+    lo = grid[np.maximum(best - 1, 0)]
+    hi = grid[np.minimum(best + 1, len(grid) - 1)]
+    out = _parallel_map(_refine_lambda, [(X[:, j], lo[j], hi[j], method) for j in range(X.shape[1])], n_jobs)
+    return np.asarray(out, dtype="float64")
+
+
+def estimate_lambda(values: np.ndarray, method: str = "yeo-johnson") -> float:
+    """단일 컬럼 최대우도 λ."""
+    return float(estimate_lambdas(values, method)[0])
+
+
+def skewed_features(df: pd.DataFrame, threshold: float = 0.75,
+                    exclude: Sequence[str] = (),
+                    exclude_prefixes: Sequence[str] = ("yj_", "bc_", "reg_", "tm_"),
+                    min_unique: int = 3) -> List[str]:
+    """|왜도| ≥ ``threshold``인 연속형 수치 컬럼(더미·식별자 접두사 제외, |왜도| 내림차순)."""
+    cols = [c for c in df.select_dtypes("number").columns
+            if c not in exclude and not str(c).startswith(tuple(exclude_prefixes))]
+    if not cols:
+        return []
+    sub = df[cols].astype("float64")
+    nunique = sub.nunique()
+    skew = sub.skew()
+    keep = skew[(nunique >= min_unique) & (skew.abs() >= threshold)]
+    return keep.abs().sort_values(ascending=False).index.tolist()
+
+
+# ---------------------------------------------------------------------------
+# 3. 변환기.
+# ---------------------------------------------------------------------------
+
+class DistributionTransformer:
+    """피처별 λ·윈저라이즈 경계를 적합·저장·적용하는 변환기.
+
+    Parameters
+    ----------
+    features : 변환 대상 컬럼.
+    method : ``"yeo-johnson"`` 또는 ``"box-cox"``.
+    winsor : 변환 후 값의 하/상위 절단 분위수(``None``이면 절단 없음).
+    sample_size : 적합에 사용할 최대 행 수(행 단위 무작위 추출, 0/None이면 전체 행).
+    seed : 부분 표본 추출 시드.
+
+    출력 컬럼은 ``{prefix}{feat}``(변환)과 ``{prefix}{feat}_w``(윈저라이즈)이며
+    prefix는 Yeo–Johnson ``yj_``, Box-Cox ``bc_``이다.
+    """
+
+    def __init__(self, features: Sequence[str] = (), method: str = "yeo-johnson",
+                 winsor: Optional[Tuple[float, float]] = (0.01, 0.99),
+                 sample_size: Optional[int] = None, seed: int = 0):
+        if method not in METHODS:
+            raise ValueError(f"unknown transform method: {method}")
+        self.features = list(features)
+        self.method = method
+        self.winsor = tuple(winsor) if winsor is not None else None
+        self.sample_size = sample_size or None
+        self.seed = seed
+        self.params: Dict[str, dict] = {}
+        self.meta: dict = {}
+
+    @property
+    def prefix(self) -> str:
+        return METHODS[self.method]
+
+    def column(self, feat: str, winsorized: bool = False) -> str:
+        return f"{self.prefix}{feat}{'_w' if winsorized else ''}"
+
+    # ------------------------------------------------------------------
+    def fit(self, df: pd.DataFrame, source: Optional[str] = None,
+            n_jobs: int = 1, memory_budget: Optional[float] = None) -> "DistributionTransformer":
+        """피처별 λ와 (변환 공간의) 윈저라이즈 경계 적합(λ 정밀화는 ``n_jobs`` 병렬).
+
+        행은 부분 표본을 먼저 뽑은 뒤 컬럼 블록 단위로만 float64 배열로 만든다.
+        ``memory_budget``(MB)을 주면 λ 격자 탐색 작업 배열(컬럼당 약 6 × 행 수 × 8바이트)이
+        예산 안에 들도록 블록 크기를 정한다(결과는 블록 크기와 무관).
+        """
+        feats = [f for f in self.features if f in df.columns]
+        rows = None
+        if self.sample_size and len(df) > self.sample_size:
+            rng = np.random.default_rng(self.seed)
+            rows = np.sort(rng.choice(len(df), self.sample_size, replace=False))
+        n_rows = len(df) if rows is None else len(rows)
+        block = len(feats) or 1
+        if memory_budget:
+            block = max(1, min(block, int(memory_budget * 1024 ** 2 // (6 * 8 * max(n_rows, 1)))))
+        for s in range(0, len(feats), block):
+            self._fit_block(df, feats[s:s + block], rows, n_jobs)
+        self.meta = {
+            "n_rows": int(len(df)),
+            "source": None if source is None else str(source),
+            "fitted_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+        }
+        return self
+
+    def _fit_block(self, df: pd.DataFrame, feats: List[str], rows: Optional[np.ndarray], n_jobs: int) -> None:
+        """컬럼 블록 하나의 λ·윈저 경계 적합(``rows``는 적합 표본 행 위치)."""
+        cols = df[feats]
+        if self.method == "box-cox":
+            n_valid = (cols > 0).sum().to_numpy()
+        else:
+            n_valid = cols.notna().sum().to_numpy()
+        X = (cols if rows is None else cols.iloc[rows]).to_numpy(dtype="float64", na_value=np.nan)
+        if self.method == "box-cox":
+            X = np.where(X > 0, X, np.nan)
+        n_fit = np.isfinite(X).sum(axis=0)
+        ok = n_fit >= 3
+        lams = np.full(len(feats), np.nan)
+        if ok.any():
+            lams[ok] = estimate_lambdas(X[:, ok], self.method, n_jobs=n_jobs)
+        for j, feat in enumerate(feats):
+            if not ok[j]:
+                continue
+            t = _FORWARD[self.method](X[:, j], lams[j])
+            t = t[np.isfinite(t)]
+            lower, upper = (np.quantile(t, self.winsor) if self.winsor is not None else (-np.inf, np.inf))
+            self.params[feat] = {
+                "lambda": float(lams[j]),
+                "lower": float(lower),
+                "upper": float(upper),
+                "n_fit": int(n_fit[j]),
+                "n_valid": int(n_valid[j]),
+            }
+
+    def transform(self, df: pd.DataFrame, features: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """변환·윈저라이즈 컬럼을 추가한 복사본 반환(대상 컬럼이 없는 피처는 건너뜀)."""
+        out = df.copy()
+        for feat in (features if features is not None else self.params):
+            if feat not in self.params or feat not in out.columns:
+                continue
+            p = self.params[feat]
+            t = _FORWARD[self.method](out[feat].to_numpy(dtype="float64", na_value=np.nan), p["lambda"])
+            out[self.column(feat)] = t
+            out[self.column(feat, True)] = np.clip(t, p["lower"], p["upper"])
+        return out
+
+    def inverse_transform(self, values, feat: str) -> np.ndarray:
+        """변환 공간 값을 원래 척도로 복원."""
+        return _INVERSE[self.method](values, self.params[feat]["lambda"])
+
+    def source_feature(self, column: str) -> Optional[str]:
+        """변환 컬럼명(``yj_x``/``yj_x_w``)에 대응하는 원 피처명(해당 없으면 None)."""
+        for feat in self.params:
+            if column in (self.column(feat), self.column(feat, True)):
+                return feat
+        return None
+
+    # ------------------------------------------------------------------
+    def to_dict(self) -> dict:
+        return {
+            "version": PARAMS_VERSION,
+            "method": self.method,
+            "winsor": list(self.winsor) if self.winsor is not None else None,
+            "fit": {"sample_size": self.sample_size, "seed": self.seed, **self.meta},
+            "features": self.params,
+        }
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False))
+        return path
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "DistributionTransformer":
+        if d.get("version") != PARAMS_VERSION:
+            raise ValueError(f"unsupported transform params version: {d.get('version')}")
+        fit = dict(d.get("fit", {}))
+        tr = cls(list(d["features"]), method=d["method"], winsor=d.get("winsor"),
+                 sample_size=fit.pop("sample_size", None), seed=fit.pop("seed", 0))
+        tr.params = {k: dict(v) for k, v in d["features"].items()}
+        tr.meta = fit
+        return tr
+
+    @classmethod
+    def load(cls, path) -> "DistributionTransformer":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+def load_transformer(path) -> Optional[DistributionTransformer]:
+    """파라미터 파일이 있으면 변환기, 없으면 None."""
+    path = Path(path) if path else None
+    if path is None or not path.exists():
+        return None
+    return DistributionTransformer.load(path)
+
+
+def ensure_transformed(df: pd.DataFrame, columns: Sequence[str],
+                       transformer: Optional[DistributionTransformer]) -> pd.DataFrame:
+    """``columns`` 중 누락된 변환 컬럼을 저장된 파라미터로 생성(원 피처가 있어야 함)."""
+    if transformer is None:
+        return df
+    need = {transformer.source_feature(c) for c in columns if c not in df.columns}
+    need = [f for f in need if f is not None and f in df.columns]
+    return transformer.transform(df, need) if need else df
+
+
+def target_to_price(values, target: str,
+                    transformer: Optional[DistributionTransformer] = None) -> np.ndarray:
+    """모델 타겟 척도 값을 가격 척도로 복원(변환 컬럼이면 역변환, ``ln_`` 접두사면 exp)."""
+    v = np.asarray(values, dtype="float64")
+    base = transformer.source_feature(target) if transformer is not None else None
+    if base is not None:
+        v = transformer.inverse_transform(v, base)
+    else:
+        base = target
+    return np.exp(v) if base.startswith("ln_") else v
+
+
+def derived_columns(target: str, transformer: Optional[DistributionTransformer]) -> list:
+    """타겟과 같은 원 피처에서 파생된 컬럼(피처에서 제외해야 누수가 없음)."""
+    if transformer is None:
+        return []
+    base = transformer.source_feature(target) or target
+    if base not in transformer.params:
+        return []
+    return [c for c in (base, transformer.column(base), transformer.column(base, True)) if c != target]
@@ -0,0 +1,275 @@
+"""병렬·캐시 인식 그림 렌더링 서비스.
+
+파이프라인 단계는 matplotlib를 직접 호출하는 대신 ``FigureQueue.submit``으로
+(그림 종류, 입력 데이터, 옵션) 명세를 넘기고 계산을 계속한다. 명세는 Agg 백엔드를
+쓰는 프로세스 풀에서 렌더링되며, 명세·데이터·렌더러 코드 해시가 이전 실행과 같고 파일이
+남아 있으면 렌더링을 건너뛴다. 단계 마지막에 ``close()``(또는 with 블록 종료)로 완료를 기다린다.
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import multiprocessing as mp
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+CACHE_FILE = ".figure_cache.json"
+DEFAULT_DPI = 150
+
+
+# ---------------------------------------------------------------------------
+# 1. 렌더러(워커 프로세스에서 실행, 모듈 최상위 함수여야 pickle 가능).
+# ---------------------------------------------------------------------------
+
+def _decorate(ax, opts: dict) -> None:
+    if opts.get("title"):
+        ax.set_title(opts["title"])
+    if opts.get("xlabel"):
+        ax.set_xlabel(opts["xlabel"])
+    if opts.get("ylabel"):
+        ax.set_ylabel(opts["ylabel"])
+
+
+def _render_barh(plt, data, opts):
+    fig, ax = plt.subplots(figsize=opts.get("figsize", (10, 6)))
+    ax.barh(list(data["labels"]), data["values"])
+    _decorate(ax, opts)
+    return fig
+
+
+def _render_bar(plt, data, opts):
+    fig, ax = plt.subplots(figsize=opts.get("figsize", (6, 4)))
+    ax.bar(list(data["labels"]), data["values"])
+    ax.tick_params(axis="x", rotation=opts.get("rotation", 90))
+    _decorate(ax, opts)
+    return fig
+
+
+def _render_heatmap(plt, data, opts):
+    fig, ax = plt.subplots(figsize=opts.get("figsize", (8, 6)))
+    im = ax.imshow(data["matrix"], vmin=opts.get("vmin"), vmax=opts.get("vmax"),
+                   cmap=opts.get("cmap", "viridis"))
+    fig.colorbar(im, ax=ax, label=opts.get("colorbar_label", ""))
+    labels = list(data.get("labels", []))
+    ax.set_xticks(range(len(labels)), labels, rotation=90)
+    ax.set_yticks(range(len(labels)), labels)
+    _decorate(ax, opts)
+    return fig
+
+
+def _render_hist(plt, data, opts):
+    """``{"counts", "edges"}``(사전 구간화) 또는 ``{"values"}``(원자료) 히스토그램."""
+    fig, ax = plt.subplots(figsize=opts.get("figsize", (6, 4)))
+    if "counts" in data:
+        edges = np.asarray(data["edges"])
+        ax.stairs(np.asarray(data["counts"]), edges, fill=True, color=opts.get("color"))
+        if opts.get("edgecolor"):
+            ax.stairs(np.asarray(data["counts"]), edges, color=opts["edgecolor"])
+    else:
+        ax.hist(data["values"], bins=opts.get("bins", 50), color=opts.get("color"),
+                edgecolor=opts.get("edgecolor"))
+    _decorate(ax, opts)
+    return fig
+
+
+def _render_qq(plt, data, opts):
+    """``{"theoretical", "sample", "lower", "upper"}``(축약 QQ 점·포락선) 또는 ``{"values"}``."""
+    if "theoretical" in data:
+        fig, ax = plt.subplots(figsize=opts.get("figsize", (6, 6)))
+        z = np.asarray(data["theoretical"])
+        if "lower" in data:
+            ax.fill_between(z, data["lower"], data["upper"], color="0.85")
+        ax.plot(z, data["sample"], "o", ms=3, mfc="none")
+        if len(z):
+            ax.plot([z[0], z[-1]], [z[0], z[-1]], "r-")
+        ax.set_xlabel("Theoretical Quantiles")
+        ax.set_ylabel("Sample Quantiles")
+        _decorate(ax, opts)
+        return fig
+    import statsmodels.api as sm
+
+    fig = sm.qqplot(np.asarray(data["values"]), line="45", fit=True)
+    fig.set_size_inches(*opts.get("figsize", (6, 6)))
+    ax = fig.axes[0]
+    _decorate(ax, opts)
+    return fig
+
+
+def _render_lines(plt, data, opts):
+    fig, ax = plt.subplots(figsize=opts.get("figsize", (8, 4)))
+    for line in data["lines"]:
+        kw = {k: v for k, v in line.items() if k not in ("x", "y")}
+        ax.plot(line["x"], line["y"], **kw)
+    if opts.get("legend", True):
+        ax.legend()
+    _decorate(ax, opts)
+    return fig
+
+
+def _render_scatter(plt, data, opts):
+    fig, ax = plt.subplots(figsize=opts.get("figsize", (6, 6)))
+    x, y = np.asarray(data["x"]), np.asarray(data["y"])
+    ax.scatter(x, y, alpha=opts.get("alpha", 0.3), s=opts.get("s"))
+    if opts.get("diagonal") and len(x):
+        lims = [min(x.min(), y.min()), max(x.max(), y.max())]
+        ax.plot(lims, lims, "k--")
+    _decorate(ax, opts)
+    return fig
+
+
+RENDERERS: Dict[str, Callable] = {
+    "barh": _render_barh,
+    "bar": _render_bar,
+    "heatmap": _render_heatmap,
+    "hist": _render_hist,
+    "qq": _render_qq,
+    "lines": _render_lines,
+    "scatter": _render_scatter,
+}
+
+
+def render(path: str, kind: str, data: dict, opts: dict) -> str:
+    """단일 명세 렌더링(Agg 백엔드)."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig = RENDERERS[kind](plt, data, opts)
+    fig.tight_layout()
+    fig.savefig(path, dpi=opts.get("dpi", DEFAULT_DPI))
+    plt.close(fig)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# 2. 명세 해시.
+# ---------------------------------------------------------------------------
+
+def _feed(h, obj) -> None:
+    if isinstance(obj, dict):
+        for k in sorted(obj, key=str):
+            h.update(str(k).encode())
+            _feed(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for v in obj:
+            _feed(h, v)
+        h.update(b"]")
+    elif hasattr(obj, "__array__") and not isinstance(obj, (str, bytes)):
+        arr = np.asarray(obj)
+        if arr.dtype == object:
+            h.update(json.dumps(arr.tolist(), default=str, ensure_ascii=False).encode())
+        else:
+            h.update(str((arr.dtype.str, arr.shape)).encode())
+            h.update(np.ascontiguousarray(arr).tobytes())
+    else:
+        h.update(repr(obj).encode())
+
+
+_RENDERER_TAGS: Dict[str, str] = {}
+
+
+def _source_tag(fn: Callable) -> str:
+    try:
+        return inspect.getsource(fn)
+    except (OSError, TypeError):
+        code = fn.__code__
+        return repr((code.co_code, code.co_consts))
+
+
+def renderer_tag(kind: str) -> str:
+    """렌더러 코드 버전 태그 ── 렌더러·공통 장식·저장 함수 소스의 해시(코드가 바뀌면 캐시 무효)."""
+    if kind not in _RENDERER_TAGS:
+        src = "".join(_source_tag(fn) for fn in (RENDERERS[kind], _decorate, render))
+        _RENDERER_TAGS[kind] = hashlib.sha1(src.encode()).hexdigest()
+    return _RENDERER_TAGS[kind]
+
+
+def spec_hash(kind: str, data: dict, opts: dict) -> str:
+    h = hashlib.sha1(kind.encode())
+    h.update(renderer_tag(kind).encode())
+    _feed(h, data)
+    _feed(h, opts)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# 3. 큐.
+# ---------------------------------------------------------------------------
+
+class FigureQueue:
+    """그림 명세 큐 ── 변경된 명세만 프로세스 풀에서 비동기 렌더링.
+
+    Parameters
+    ----------
+    out_dir : 캐시 파일(``.figure_cache.json``)을 둘 디렉토리.
+    n_jobs : 워커 프로세스 수(0 또는 1이면 현재 프로세스에서 즉시 렌더링).
+
+    단계 스크립트는 ``__main__`` 가드 없이 최상위에서 실행되므로, 워커는 스크립트를
+    다시 import하지 않는 fork 방식으로만 띄운다(fork 불가 플랫폼은 순차 렌더링).
+    """
+
+    def __init__(self, out_dir, n_jobs: int = 2, use_cache: bool = True):
+        self.cache_path = Path(out_dir) / CACHE_FILE
+        self.use_cache = use_cache
+        self.cache: Dict[str, str] = {}
+        if use_cache and self.cache_path.exists():
+            try:
+                self.cache = json.loads(self.cache_path.read_text())
+            except (OSError, ValueError):
+                self.cache = {}
+        self.n_jobs = max(int(n_jobs), 0) if "fork" in mp.get_all_start_methods() else 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: List[tuple] = []
+        self.skipped = 0
+        self.rendered = 0
+
+    def submit(self, path, kind: str, data: dict, **opts) -> Optional[Future]:
+        """명세 등록 ── 캐시 적중이면 ``None``, 아니면 렌더링 Future 반환."""
+        if kind not in RENDERERS:
+            raise ValueError(f"unknown figure kind: {kind}")
+        path = str(path)
+        digest = spec_hash(kind, data, opts)
+        if self.use_cache and self.cache.get(path) == digest and os.path.exists(path):
+            self.skipped += 1
+            return None
+        if self.n_jobs <= 1:
+            render(path, kind, data, opts)
+            self._done(path, digest)
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.n_jobs, mp_context=mp.get_context("fork"))
+        fut = self._pool.submit(render, path, kind, data, opts)
+        self._pending.append((fut, path, digest))
+        return fut
+
+    def _done(self, path: str, digest: str) -> None:
+        self.cache[path] = digest
+        self.rendered += 1
+
+    def close(self) -> None:
+        """대기 중인 렌더링 완료 후 캐시 저장(렌더링 오류는 여기서 재발생)."""
+        try:
+            for fut, path, digest in self._pending:
+                fut.result()
+                self._done(path, digest)
+        finally:
+            self._pending.clear()
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+            if self.use_cache:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                self.cache_path.write_text(json.dumps(self.cache, indent=1, ensure_ascii=False))
+
+    def __enter__(self) -> "FigureQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
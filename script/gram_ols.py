@@ -0,0 +1,485 @@
+"""Gram 행렬 기반 OLS·K-fold 교차검증.
+
+폴드별 충분통계량(XᵀX, Xᵀy, yᵀy)을 한 번의 패스로 계산해 두고, 각 폴드의 학습 해는
+(전체 − 검증 폴드) Gram에 대한 Cholesky 풀이로 구한다. 계수·SSE는 데이터를 다시 읽지
+않으며, HC3(또는 클러스터) 표준오차가 필요할 때만 학습 행을 청크 단위로 한 번 더 읽는다
+(HC3 레버리지는 Cholesky 인자에서 계산). 완전 공선(예: 지역 더미 전체 + 상수항)이면 고유분해 유사역행렬(최소 노름 해,
+statsmodels ``OLS``의 pinv 해와 동일)로 대체한다.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from scipy import linalg
+
+from fixed_effects import FixedEffects, predict_effects
+from parallel_jobs import parallel_map
+
+
+# 행 청크 작업 메모리 기본 상한(MB) ── float64 사본 하나 기준.
+CHUNK_MB = 64
+
+
+def design_matrix(df: pd.DataFrame, features: Sequence[str], const: bool = True,
+                  dtype="float64", rows: Optional[np.ndarray] = None,
+                  out: Optional[np.ndarray] = None) -> np.ndarray:
+    """상수항(선택)과 피처를 담은 C-연속 설계행렬(한 번만 생성).
+
+    ``dtype="float32"``면 메모리가 절반이고, ``rows``를 주면 그 순서로 행을 재배열하며(예: 폴드
+    순 정렬로 폴드 슬라이스를 뷰로 만들기), ``out``(예: memmap)이 있으면 그 버퍼를 채운다.
+    컬럼 단위로 채우므로 임시 메모리는 컬럼 하나 크기다.
+    """
+    n = len(df) if rows is None else len(rows)
+    shape = (n, len(features) + int(const))
+    X = np.empty(shape, dtype=dtype) if out is None else out
+    if X.shape != shape:
+        raise ValueError(f"output buffer shape {X.shape} != {shape}")
+    if const:
+        X[:, 0] = 1.0
+    for j, c in enumerate(features):
+        col = df[c].to_numpy(dtype="float64", na_value=np.nan)
+        X[:, j + int(const)] = col if rows is None else col[rows]
+    return X
+
+
+def chunk_rows(n_cols: int, memory_mb: Optional[float] = None) -> int:
+    """float64 작업 사본이 ``memory_mb``(기본 ``CHUNK_MB``)를 넘지 않는 행 청크 크기."""
+    mb = memory_mb if memory_mb else CHUNK_MB
+    return max(1_024, int(mb * 1024 ** 2 / (8 * max(n_cols, 1))))
+
+
+def feature_columns(frame: pd.DataFrame, exclude: Sequence[str] = ()) -> List[str]:
+    """회귀 피처 후보 ── 수치형(정수·실수·bool) 컬럼, ``exclude`` 제외.
+
+    메모리 경로는 로드한 패널을, 스트리밍 경로는 ``panel_io.schema_frame``(0행, 같은 dtype)을
+    넘겨 같은 규칙을 쓴다.
+    """
+    exclude = set(exclude)
+    return [c for c in frame.columns if is_numeric_dtype(frame[c]) and c not in exclude]
+
+
+def finite_rows(df: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """``columns`` 값이 모두 유한한 행 마스크(컬럼 단위 검사라 n×p 사본 없음)."""
+    ok = np.ones(len(df), dtype=bool)
+    for c in columns:
+        ok &= np.isfinite(df[c].to_numpy(dtype="float64", na_value=np.nan))
+    return ok
+
+
+def _take(X: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """행 인덱스가 연속이면 슬라이스 뷰(memmap은 해당 구간만 읽음), 아니면 복사."""
+    if len(idx) and idx[-1] - idx[0] + 1 == len(idx):
+        return X[idx[0]:idx[-1] + 1]
+    return X[idx]
+
+
+def _row_chunks(X: np.ndarray, y: np.ndarray, idx: np.ndarray, chunk: int):
+    """``idx`` 행을 청크 단위 float64 (X, y)로 순회(float32·memmap 입력도 청크만 상향 변환)."""
+    for s in range(0, len(idx), chunk):
+        part = idx[s:s + chunk]
+        yield (np.asarray(_take(X, part), dtype="float64"),
+               np.asarray(_take(y, part), dtype="float64"))
+
+
+class GramFactor:
+    """대각 스케일링한 Gram 행렬의 Cholesky 인자(특이하면 고유분해 유사역행렬).
+
+    유사역행렬은 원 척도 G의 Moore–Penrose 역행렬이므로 statsmodels ``OLS``(pinv)와 같은
+    최소 노름 해를 준다. ``null``은 원 척도 영공간의 정규직교 기저(완전 랭크면 0열).
+    """
+
+    def __init__(self, G: np.ndarray, rcond: float = 1e-10):
+        p = len(G)
+        d = np.sqrt(np.clip(np.diag(G), 0, None))
+        self.scale = 1.0 / np.where(d > 0, d, 1.0)
+        self.cho = None
+        self.pinv = None
+        self.null = np.zeros((p, 0))
+        if (d > 0).all():
+            try:
+                c, lower = linalg.cho_factor(G * np.outer(self.scale, self.scale), lower=True, check_finite=False)
+                piv = np.diag(c) ** 2
+                if piv.min() > rcond * piv.max():
+                    self.cho = (c, lower)
+            except linalg.LinAlgError:
+                pass
+        if self.cho is None:
+            # 랭크 판정은 스케일링 공간에서, 유사역행렬은 원 공간 영공간에 직교하도록 사영:
+            # G⁺ = P⊥ (S Gs⁺ S) P⊥, P⊥ = I − Q Qᵀ (Q: S·영공간 벡터의 정규직교 기저).
+            S = self.scale
+            w, V = np.linalg.eigh(G * np.outer(S, S))
+            keep = w > 1e-12 * max(w.max(), 0) * p
+            A = ((V[:, keep] / w[keep]) @ V[:, keep].T) * np.outer(S, S)
+            if (~keep).any():
+                Q, _ = np.linalg.qr(V[:, ~keep] * S[:, None])
+                self.null = Q
+                P = np.eye(p) - Q @ Q.T
+                A = P @ A @ P
+            self.pinv = (A + A.T) / 2
+            self.scale = np.ones(p)
+            self.rank = int(keep.sum())
+        else:
+            self.rank = p
+
+    @property
+    def full_rank(self) -> bool:
+        return self.cho is not None
+
+    def _scale_rows(self, b: np.ndarray) -> np.ndarray:
+        return b * (self.scale if b.ndim == 1 else self.scale[:, None])
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        """G β = b 풀이(특이하면 최소 노름 해)."""
+        bs = self._scale_rows(b)
+        z = linalg.cho_solve(self.cho, bs, check_finite=False) if self.cho else self.pinv @ bs
+        return self._scale_rows(z)
+
+    def inverse(self) -> np.ndarray:
+        """G⁻¹(또는 G⁺)."""
+        return self.solve(np.eye(len(self.scale))) if self.cho else self.pinv
+
+    def leverage(self, X: np.ndarray) -> np.ndarray:
+        """행별 레버리지 hᵢ = xᵢᵀ G⁻¹ xᵢ (Cholesky 인자 삼각 풀이)."""
+        if self.cho:
+            c, lower = self.cho
+            Z = linalg.solve_triangular(c, (X * self.scale).T, lower=lower, check_finite=False)
+            return np.einsum("ij,ij->j", Z, Z)
+        return np.einsum("ij,jk,ik->i", X, self.pinv, X)
+
+
+def hc3_meat(X: np.ndarray, resid: np.ndarray, factor: GramFactor) -> np.ndarray:
+    """HC3 meat Σ xᵢxᵢᵀ eᵢ²/(1−hᵢ)² (행 청크별로 합산 가능)."""
+    h = factor.leverage(X)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = (resid / (1.0 - h)) ** 2
+    w = np.where(np.isfinite(w), w, 0.0)
+    return (X * w[:, None]).T @ X
+
+
+def hc3_cov(X: np.ndarray, resid: np.ndarray, factor: GramFactor) -> np.ndarray:
+    """HC3 공분산 G⁻¹ [Σ xᵢxᵢᵀ eᵢ²/(1−hᵢ)²] G⁻¹."""
+    Ginv = factor.inverse()
+    return Ginv @ hc3_meat(X, resid, factor) @ Ginv
+
+
+def ols_fit(X: np.ndarray, y: np.ndarray, cov: Optional[str] = "HC3") -> Dict[str, np.ndarray]:
+    """단일 OLS 적합(Gram + Cholesky, 선택적으로 HC3)."""
+    G = X.T @ X
+    factor = GramFactor(G)
+    beta = factor.solve(X.T @ y)
+    out = {"params": beta, "rank": factor.rank}
+    if cov == "HC3":
+        out["cov"] = hc3_cov(X, y - X @ beta, factor)
+        out["bse"] = np.sqrt(np.clip(np.diag(out["cov"]), 0, None))
+    return out
+
+
+def _fold_stats(X: np.ndarray, y: np.ndarray, fold_ids: np.ndarray, k: int, chunk: int = 65_536):
+    """폴드 ``k`` 행의 (XᵀX, Xᵀy, yᵀy, n) ── 워커 프로세스에서 memmap 입력으로 실행 가능.
+
+    행 청크마다 float64로 올려 누적하므로 float32 설계행렬도 Gram 정밀도는 float64다.
+    """
+    idx = np.flatnonzero(fold_ids == k)
+    p = X.shape[1]
+    G, b, yy = np.zeros((p, p)), np.zeros(p), 0.0
+    for Xc, yc in _row_chunks(X, y, idx, chunk):
+        G += Xc.T @ Xc
+        b += Xc.T @ yc
+        yy += float(yc @ yc)
+    return G, b, yy, len(idx)
+
+
+def _fit_from_stats(X: np.ndarray, y: np.ndarray, fold_ids: np.ndarray,
+                    G: np.ndarray, b: np.ndarray, yy: float, n: int,
+                    exclude: Optional[int], cov: Optional[str], chunk: int = 65_536,
+                    clusters: Optional[np.ndarray] = None) -> Dict[str, object]:
+    """Gram 통계량으로 계수·SSE·R²(그리고 선택적으로 HC3 또는 클러스터 공분산) 계산.
+
+    강건 공분산은 학습 행을 청크 단위 float64로 한 번 읽는다(클러스터는 청크별 점수 합만
+    (G × p)로 누적하므로 작업 메모리는 청크 크기로 제한된다).
+    """
+    factor = GramFactor(G)
+    beta = factor.solve(b)
+    sse = float(yy - 2 * beta @ b + beta @ G @ beta)
+    ybar = b[0] / n if n else np.nan  # 첫 컬럼이 상수항이라고 가정
+    out = {"params": beta, "sse": max(sse, 0.0), "n": n, "rank": factor.rank,
+           "r2": 1 - sse / (yy - n * ybar ** 2) if n else np.nan}
+    if cov is None:
+        return out
+    idx = np.flatnonzero(fold_ids != exclude) if exclude is not None else np.arange(len(y))
+    if cov == "HC3":
+        meat = np.zeros_like(G)
+        for Xc, yc in _row_chunks(X, y, idx, chunk):
+            meat += hc3_meat(Xc, yc - Xc @ beta, factor)
+    elif cov == "cluster":
+        if clusters is None:
+            raise ValueError("cluster-robust covariance requires cluster codes")
+        codes = np.asarray(clusters, dtype="int64")
+        U = np.zeros((int(codes.max()) + 1 if len(codes) else 0, len(beta)))
+        for s, (Xc, yc) in zip(range(0, len(idx), chunk), _row_chunks(X, y, idx, chunk)):
+            U += cluster_sums(Xc * (yc - Xc @ beta)[:, None], codes[idx[s:s + chunk]], len(U))
+        # statsmodels와 같은 소표본 보정 G/(G−1)·(n−1)/(n−k), k는 설계 컬럼 수.
+        g = int((np.bincount(codes[idx], minlength=len(U)) > 0).sum())
+        meat = U.T @ U * (g / max(g - 1, 1)) * ((n - 1) / max(n - len(beta), 1))
+        out["n_clusters"] = g
+    else:
+        raise ValueError(f"unknown covariance type: {cov}")
+    Ginv = factor.inverse()
+    out["cov"] = Ginv @ meat @ Ginv
+    out["bse"] = np.sqrt(np.clip(np.diag(out["cov"]), 0, None))
+    return out
+
+
+class GramStats:
+    """폴드별 충분통계량(XᵀX, Xᵀy, yᵀy, n)만으로 학습 해를 구하는 K-fold OLS 기반(행 접근 없음).
+
+    ``GramCV``(메모리 설계행렬)와 ``StreamedGramCV``(row group 스트리밍)가 통계량 누적 방식만
+    달리해 공유한다. 첫 컬럼은 상수항이어야 한다.
+    """
+
+    def __init__(self, G: np.ndarray, b: np.ndarray, yy: np.ndarray, n: np.ndarray):
+        self.G = np.asarray(G, dtype="float64")
+        self.b = np.asarray(b, dtype="float64")
+        self.yy = np.asarray(yy, dtype="float64")
+        self.n = np.asarray(n, dtype="int64")
+        self.n_folds = len(self.n)
+        # 폴드 순서대로 합산(병렬 여부와 무관하게 같은 부동소수 결과).
+        self.G_total = self.G.sum(axis=0)
+        self.b_total = self.b.sum(axis=0)
+        self.yy_total = self.yy.sum()
+
+    def _stats(self, exclude: Optional[int]):
+        if exclude is None:
+            return self.G_total, self.b_total, self.yy_total, int(self.n.sum())
+        return (self.G_total - self.G[exclude], self.b_total - self.b[exclude],
+                self.yy_total - self.yy[exclude], int(self.n.sum() - self.n[exclude]))
+
+    def fit(self, exclude: Optional[int] = None) -> Dict[str, object]:
+        """폴드 ``exclude``를 뺀 학습 해(``None``이면 전체 표본) ── 계수·SSE·R²."""
+        return _fit_from_stats(None, None, None, *self._stats(exclude), exclude, None)
+
+    def fit_folds(self) -> List[Dict[str, object]]:
+        """모든 폴드의 학습 해(폴드 순서)."""
+        return [self.fit(k) for k in range(self.n_folds)]
+
+
+class GramCV(GramStats):
+    """메모리(또는 memmap) 설계행렬에서 폴드별 충분통계량을 한 번에 누적한 K-fold OLS 엔진.
+
+    Parameters
+    ----------
+    X, y : 설계행렬(상수항 포함, float64 또는 float32)과 타겟(결측 없음). 병렬 실행 시 memmap 권장.
+    fold_ids : 행별 폴드 번호(0..K−1). 행이 폴드 순으로 정렬돼 있으면 폴드 슬라이스는 뷰로 읽는다.
+    n_jobs : 폴드별 Gram 누적·HC3 계산 병렬 워커 수(결과는 순차 실행과 동일).
+    chunk : float64로 올려 처리할 행 청크 크기(``chunk_rows``로 메모리 예산에서 계산).
+    """
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, fold_ids: np.ndarray, n_jobs: int = 1,
+                 chunk: int = 65_536):
+        self.X = X
+        self.y = np.asarray(y, dtype="float64")
+        self.fold_ids = np.asarray(fold_ids, dtype="int64")
+        self.n_jobs = n_jobs
+        self.chunk = chunk
+        n_folds = int(self.fold_ids.max()) + 1 if len(self.fold_ids) else 0
+        stats = parallel_map(_fold_stats, [(X, self.y, self.fold_ids, k, chunk) for k in range(n_folds)],
+                             n_jobs)
+        p = X.shape[1]
+        super().__init__(np.array([s[0] for s in stats]).reshape(n_folds, p, p),
+                         np.array([s[1] for s in stats]).reshape(n_folds, p),
+                         np.array([s[2] for s in stats], dtype="float64"),
+                         np.array([s[3] for s in stats], dtype="int64"))
+
+    def rows(self, k: int, train: bool = False) -> np.ndarray:
+        """폴드 ``k``의 검증 행(또는 ``train=True``면 학습 행) 인덱스."""
+        return np.flatnonzero((self.fold_ids != k) if train else (self.fold_ids == k))
+
+    def fit(self, exclude: Optional[int] = None, cov: Optional[str] = None,
+            clusters: Optional[np.ndarray] = None) -> Dict[str, object]:
+        """폴드 ``exclude``를 뺀 학습 해(``None``이면 전체 표본).
+
+        계수·SSE·R²는 Gram에서만 계산하고, ``cov``(``"HC3"`` 또는 ``"cluster"`` ─ ``clusters``는
+        ``X`` 행 순서의 클러스터 코드)를 요청할 때만 학습 행을 청크 단위로 읽는다.
+        """
+        return _fit_from_stats(self.X, self.y, self.fold_ids, *self._stats(exclude), exclude, cov, self.chunk,
+                               clusters)
+
+    def fit_folds(self, cov: Optional[str] = None) -> List[Dict[str, object]]:
+        """모든 폴드의 학습 해(폴드 순서, HC3 요청 시 병렬)."""
+        tasks = [(self.X, self.y, self.fold_ids, *self._stats(k), k, cov, self.chunk) for k in range(self.n_folds)]
+        return parallel_map(_fit_from_stats, tasks, self.n_jobs if cov else 1)
+
+    def predict(self, beta: np.ndarray, k: int) -> np.ndarray:
+        """폴드 ``k`` 검증 행 예측."""
+        return np.concatenate([Xc @ beta for Xc, _ in _row_chunks(self.X, self.y, self.rows(k), self.chunk)]
+                              or [np.zeros(0)])
+
+
+def cluster_sums(scores: np.ndarray, clusters: np.ndarray, n_clusters: int) -> np.ndarray:
+    """클러스터별 점수 합 u_g (n_clusters × p, 행 청크별로 합산 가능)."""
+    clusters = np.asarray(clusters, dtype="int64")
+    U = np.empty((n_clusters, scores.shape[1]))
+    for j in range(scores.shape[1]):
+        U[:, j] = np.bincount(clusters, weights=scores[:, j], minlength=n_clusters)
+    return U
+
+
+def cluster_meat(scores: np.ndarray, clusters: np.ndarray) -> Tuple[np.ndarray, int]:
+    """클러스터 점수 합의 외적 Σ_g u_g u_gᵀ 와 클러스터 수(코드 0..G−1)."""
+    clusters = np.asarray(clusters, dtype="int64")
+    g = int(clusters.max()) + 1 if len(clusters) else 0
+    U = cluster_sums(scores, clusters, g)
+    return U.T @ U, g
+
+
+def absorbed_fit(X: np.ndarray, y: np.ndarray, codes: Sequence[np.ndarray], tol: float = 1e-8,
+                 cov: Optional[str] = None, clusters: Optional[np.ndarray] = None) -> Dict[str, object]:
+    """고정효과를 흡수한 OLS 적합(선택적으로 강건 공분산).
+
+    고정효과와 완전 공선인 피처(demean 후 분산 0)는 제외하고(``keep``), 잔차에서 상수항과
+    차원별 그룹 효과(``const``, ``alphas``)를 복원한다. ``cov``는 ``"HC1"`` 또는 ``"cluster"``
+    (``clusters`` 필요)이며, 소표본 보정의 k는 남은 피처 수 + 흡수 자유도다
+    (클러스터: G/(G−1)·(n−1)/(n−k), HC1: n/(n−k)).
+    """
+    X, y = np.asarray(X, dtype="float64"), np.asarray(y, dtype="float64")
+    fe = FixedEffects([np.asarray(c) for c in codes])
+    X_dm, n_iter = fe.demean(X, tol=tol)
+    y_dm, _ = fe.demean(y, tol=tol)
+    keep = X_dm.std(axis=0) > 1e-8 * np.maximum(X.std(axis=0, ddof=1), 1.0)
+    Z = X_dm[:, keep]
+    factor = GramFactor(Z.T @ Z)
+    beta = factor.solve(Z.T @ y_dm)
+    const, alphas = fe.effects(y - X[:, keep] @ beta, tol=tol)
+    n, dof_absorbed = len(y), fe.dof_absorbed()
+    k = len(beta) + dof_absorbed
+    out = {"params": beta, "keep": keep, "const": const, "alphas": alphas, "n": n,
+           "n_iter": n_iter, "dof_absorbed": dof_absorbed, "dof": n - k}
+    if cov is None:
+        return out
+    resid = y_dm - Z @ beta
+    if cov == "cluster":
+        if clusters is None:
+            raise ValueError("cluster-robust covariance requires cluster codes")
+        meat, g = cluster_meat(Z * resid[:, None], clusters)
+        meat *= (g / max(g - 1, 1)) * ((n - 1) / max(n - k, 1))
+        out["n_clusters"] = g
+    elif cov == "HC1":
+        meat = (Z * (resid ** 2)[:, None]).T @ Z * (n / max(n - k, 1))
+    else:
+        raise ValueError(f"unknown covariance type: {cov}")
+    Ginv = factor.inverse()
+    out["cov"] = Ginv @ meat @ Ginv
+    out["bse"] = np.sqrt(np.clip(np.diag(out["cov"]), 0, None))
+    return out
+
+
+def absorbed_fold_fit(X: np.ndarray, y: np.ndarray, codes: Sequence[np.ndarray],
+                      train_idx: np.ndarray, test_idx: np.ndarray,
+                      tol: float = 1e-8) -> Dict[str, object]:
+    """학습 행에서 고정효과를 흡수해 적합하고 검증 행을 예측(워커 실행 가능).
+
+    학습 잔차에서 복원한 고정효과 값으로 예측한다(학습에 없던 그룹은 0).
+    """
+    fit = absorbed_fit(X[train_idx], np.asarray(y)[train_idx], [np.asarray(c)[train_idx] for c in codes], tol=tol)
+    keep, beta = fit["keep"], fit["params"]
+    X_test = np.asarray(X[test_idx], dtype="float64")
+    y_pred = X_test[:, keep] @ beta + predict_effects(fit["const"], fit["alphas"],
+                                                      [np.asarray(c)[test_idx] for c in codes])
+    return {"params": beta, "keep": keep, "const": fit["const"], "y_pred": y_pred,
+            "n_iter": fit["n_iter"], "dof_absorbed": fit["dof_absorbed"]}
+
+
+# ---------------------------------------------------------------------------
+# 스트리밍(out-of-core) K-fold OLS.
+# ---------------------------------------------------------------------------
+
+def kfold_ids(n: int, n_folds: int, seed: int = 0) -> np.ndarray:
+    """행 위치별 폴드 번호 ── ``KFold(n_folds, shuffle=True, random_state=seed)``와 같은 분할.
+
+    행당 2바이트만 쓰므로 데이터를 읽지 않고 전체 행 수만으로 만든다.
+    """
+    idx = np.arange(n)
+    np.random.RandomState(seed).shuffle(idx)
+    sizes = np.full(n_folds, n // n_folds, dtype="int64")
+    sizes[: n % n_folds] += 1
+    fold_ids = np.empty(n, dtype="int16")
+    fold_ids[idx] = np.repeat(np.arange(n_folds, dtype="int16"), sizes)
+    return fold_ids
+
+
+class StreamedGramCV(GramStats):
+    """Parquet row group을 한 개씩 읽어 폴드별 Gram을 누적하는 K-fold OLS.
+
+    첫 패스에서 XᵀX·Xᵀy·yᵀy를 폴드별로 누적하고(메모리 = row group 1개 + 폴드 수 × p²),
+    검증 예측과 전체 표본 HC3 meat 행렬은 ``second_pass``에서 한 번 더 스트리밍으로 계산한다.
+    피처·타겟 결측 행은 메모리 경로와 같은 규칙(``finite_rows``)으로 제외한다.
+
+    Parameters
+    ----------
+    path : 패널 Parquet 경로.
+    features, target : 설계행렬 피처(상수항 자동 추가)와 타겟 컬럼.
+    fold_ids : 파일 행 순서 기준 폴드 번호(``kfold_ids``).
+    """
+
+    def __init__(self, path, features: Sequence[str], target: str, fold_ids: np.ndarray):
+        self.path = path
+        self.features = list(features)
+        self.target = target
+        self.fold_ids = np.asarray(fold_ids)
+        n_folds = int(self.fold_ids.max()) + 1 if len(self.fold_ids) else 0
+        p = len(self.features) + 1
+        G, b = np.zeros((n_folds, p, p)), np.zeros((n_folds, p))
+        yy, n = np.zeros(n_folds), np.zeros(n_folds, dtype="int64")
+        self.n_dropped = 0
+        for X, y, f in self._chunks(count_dropped=True):
+            for k in range(n_folds):
+                m = f == k
+                Xk, yk = X[m], y[m]
+                G[k] += Xk.T @ Xk
+                b[k] += Xk.T @ yk
+                yy[k] += yk @ yk
+                n[k] += len(yk)
+        super().__init__(G, b, yy, n)
+
+    def _chunks(self, count_dropped: bool = False):
+        """(X, y, fold) 청크 ── row group 순서대로, 결측 행 제외."""
+        from panel_io import iter_row_groups
+
+        offset = 0
+        for chunk in iter_row_groups(self.path, columns=self.features + [self.target]):
+            m = len(chunk)
+            ok = np.flatnonzero(finite_rows(chunk, self.features + [self.target]))
+            f = self.fold_ids[offset:offset + m]
+            offset += m
+            if count_dropped:
+                self.n_dropped += int(m - len(ok))
+            yield (design_matrix(chunk, self.features, rows=ok),
+                   chunk[self.target].to_numpy(dtype="float64", na_value=np.nan)[ok], f[ok])
+        if offset != len(self.fold_ids):
+            raise ValueError(f"fold_ids length {len(self.fold_ids)} does not match {offset} rows in {self.path}")
+
+    def second_pass(self, fold_params: Sequence[np.ndarray] = (), on_fold: Optional[Callable] = None,
+                    full: Optional[Dict[str, object]] = None) -> None:
+        """두 번째 스트리밍 패스.
+
+        ``on_fold(k, y_true, y_pred)``를 청크마다 폴드별 검증 행에 대해 호출하고,
+        ``full``(전체 표본 ``fit()`` 결과)이 주어지면 HC3 meat를 누적해 ``cov``·``bse``를 채운다.
+        """
+        factor = GramFactor(self.G_total) if full is not None else None
+        p = self.G_total.shape[0]
+        meat = np.zeros((p, p))
+        for X, y, f in self._chunks():
+            if on_fold is not None:
+                for k, beta in enumerate(fold_params):
+                    m = f == k
+                    if m.any():
+                        on_fold(k, y[m], X[m] @ beta)
+            if factor is not None:
+                meat += hc3_meat(X, y - X @ full["params"], factor)
+        if factor is not None:
+            Ginv = factor.inverse()
+            full["cov"] = Ginv @ meat @ Ginv
+            full["bse"] = np.sqrt(np.clip(np.diag(full["cov"]), 0, None))
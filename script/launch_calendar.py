@@ -0,0 +1,111 @@
+"""단지별 입주(사용승인) 월 인덱스 ── 거래 행 병합 없이 정수 gather로 τ 계산.
+
+메타 A에서 단지마다 하나의 정수 ``launch_idx``(1970-01 기준 월 인덱스)를 만들고, 거래·패널
+행은 ``complex_id``를 단지 코드로 한 번 변환한 뒤 ``τ = month_idx − launch_idx[code]``로
+계산한다. ``complex_id`` 표기 정규화(``"123.0"`` → ``"123"``)는 행 단위 문자열 치환 대신
+고유값에만 적용한다. 08(사건 연구)과 09(3기 예측)가 같은 인덱스를 쓴다.
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from date_index import datetime_to_month_idx, month_idx_to_datetime
+
+# 입주 월이 없는 단지의 launch_idx.
+MISSING = np.iinfo("int32").min
+
+
+def _canonical(v) -> Optional[str]:
+    if pd.isna(v):
+        return None
+    if isinstance(v, (float, np.floating)) and float(v).is_integer():
+        return str(int(v))
+    v = str(v)
+    return v[:-2] if v.endswith(".0") else v
+
+
+def canonical_ids(values) -> pd.Index:
+    """단지 ID 표기 통일 ── 정수형 실수(123.0)와 ``"123.0"`` 문자열은 ``"123"``(결측은 None)."""
+    return pd.Index([_canonical(v) for v in values], dtype=object)
+
+
+def detect_launch_column(meta: pd.DataFrame) -> str:
+    """메타 A의 입주(사용승인) 일자 컬럼 ── 이름에 '승인' 또는 '입주'가 든 첫 컬럼."""
+    cols = [c for c in meta.columns if "승인" in c or "입주" in c]
+    if not cols:
+        raise ValueError("No expected move-in date column found in meta A")
+    return cols[0]
+
+
+class LaunchCalendar:
+    """단지 ID → 정수 코드 → 입주 월 인덱스(및 선택적 단지 속성) 조회표.
+
+    Parameters
+    ----------
+    keys : 정규화된 단지 ID(중복 없음).
+    launch_idx : 단지별 입주 월 인덱스(int32, 미상은 ``MISSING``).
+    attrs : 단지별 속성(단지명, 코호트 등; ``keys`` 순서).
+    """
+
+    def __init__(self, keys: pd.Index, launch_idx: np.ndarray, attrs: Optional[pd.DataFrame] = None):
+        self.keys = pd.Index(keys)
+        if not self.keys.is_unique:
+            raise ValueError("launch calendar keys must be unique")
+        self.launch_idx = np.asarray(launch_idx, dtype="int32")
+        if len(self.launch_idx) != len(self.keys):
+            raise ValueError("launch_idx length does not match keys")
+        self.attrs = (pd.DataFrame(index=range(len(self.keys))) if attrs is None
+                      else attrs.reset_index(drop=True))
+
+    @classmethod
+    def from_meta(cls, meta: pd.DataFrame, date_col: Optional[str] = None,
+                  attrs: Sequence[str] = ()) -> "LaunchCalendar":
+        """메타 A에서 구성(ID 중복은 첫 행 사용, ``date_col`` 생략 시 자동 탐지)."""
+        date_col = date_col or detect_launch_column(meta)
+        if date_col not in meta.columns:
+            raise ValueError(f"Launch date column '{date_col}' not found in meta A")
+        missing = [c for c in attrs if c not in meta.columns]
+        if missing:
+            raise ValueError(f"Columns not found in meta A: {missing}")
+        keys = canonical_ids(meta["complex_id"].to_numpy())
+        first = ~keys.duplicated() & keys.notna()
+        idx = datetime_to_month_idx(pd.to_datetime(meta[date_col], errors="coerce"))[first]
+        launch = np.where(np.isfinite(idx), idx, MISSING).astype("int32")
+        return cls(keys[first], launch, meta.loc[first, list(attrs)])
+
+    # ------------------------------------------------------------------
+    def codes(self, complex_ids) -> np.ndarray:
+        """행별 단지 코드(조회표에 없으면 −1) ── 정규화·조회는 고유값에만 수행."""
+        row_codes, uniques = pd.factorize(pd.Series(complex_ids), sort=False)
+        lookup = self.keys.get_indexer(canonical_ids(np.asarray(uniques)))
+        lookup = np.append(lookup, -1)  # factorize 결측 코드 −1 → 마지막 항목
+        return lookup[row_codes].astype("int64")
+
+    def launch(self, codes: np.ndarray) -> np.ndarray:
+        """단지 코드 → 입주 월 인덱스(int64, 미상·미등록은 ``MISSING``)."""
+        codes = np.asarray(codes, dtype="int64")
+        out = np.full(len(codes), MISSING, dtype="int64")
+        ok = codes >= 0
+        out[ok] = self.launch_idx[codes[ok]]
+        return out
+
+    def tau(self, codes: np.ndarray, month_idx) -> np.ndarray:
+        """τ = month_idx − launch_idx[code] (float, 입주 월·거래 월 미상은 NaN)."""
+        month = np.asarray(month_idx, dtype="float64")
+        launch = self.launch(codes)
+        ok = (launch != MISSING) & np.isfinite(month)
+        return np.where(ok, np.where(ok, month, 0).astype("int64") - launch, np.nan)
+
+    def launch_dates(self, codes: np.ndarray) -> np.ndarray:
+        """단지 코드 → 입주 월초 datetime64(미상은 NaT)."""
+        launch = self.launch(codes).astype("float64")
+        return month_idx_to_datetime(np.where(launch == MISSING, np.nan, launch))
+
+    def attr(self, col: str, codes: np.ndarray) -> np.ndarray:
+        """단지 코드 → 속성 값(미등록은 None)."""
+        codes = np.asarray(codes, dtype="int64")
+        values = self.attrs[col].to_numpy(dtype=object)
+        return np.where(codes >= 0, values[np.clip(codes, 0, None)] if len(values) else None, None)
@@ -0,0 +1,258 @@
+"""헤도닉 모델 산출물 ── 계수·공분산·피처 스키마·변환 파라미터를 한 파일로 저장하고 배치 예측.
+
+07 단계가 ``model.json``을 저장하면 09·10 단계는 같은 피처 순서·변환 λ로 예측한다.
+고정효과 모형은 수준별 효과(학습 표본 가중 평균 0으로 정규화)를 수준 값 키로 함께 저장하고,
+학습에 없던 수준은 저장된 정책(``zero``: 평균 수준 효과 0, ``nan``: 예측 NaN, ``error``: 예외)을 따른다.
+예측 전 스키마(필수 컬럼 존재·수치형 여부)를 검사하므로, 누락 피처를 0으로 채우는 식의
+조용한 오류 대신 어떤 컬럼이 빠졌는지 알려주는 예외가 난다. ``score``는 DataFrame 또는
+Parquet 경로를 받아 ``batch_size`` 행씩 벡터 연산으로 예측한다.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, pandas_dtype
+
+from dist_transform import DistributionTransformer, ensure_transformed, target_to_price
+
+ARTIFACT_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+UNSEEN_POLICIES = ("zero", "nan", "error")
+
+
+# ---------------------------------------------------------------------------
+# 1. 학습 데이터 지문·스키마.
+# ---------------------------------------------------------------------------
+
+def data_fingerprint(chunks: Iterable[pd.DataFrame], columns: Sequence[str]) -> Dict[str, object]:
+    """행 수와 ``columns`` 값의 SHA-1 ── 청크 단위 갱신이라 전체 로드와 같은 값."""
+    h = hashlib.sha1()
+    n = 0
+    for chunk in chunks:
+        rows = pd.util.hash_pandas_object(chunk[list(columns)], index=False)
+        h.update(rows.to_numpy(dtype="uint64").tobytes())
+        n += len(chunk)
+    return {"n_rows": n, "columns": list(columns), "sha1": h.hexdigest()}
+
+
+def frame_dtypes(source, columns: Sequence[str]) -> Dict[str, str]:
+    """DataFrame 또는 Parquet 스키마에서 컬럼별 dtype 문자열."""
+    if isinstance(source, pd.DataFrame):
+        return {c: str(source[c].dtype) for c in columns}
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(source)
+    return {c: str(np.dtype(schema.field(c).type.to_pandas_dtype())) for c in columns}
+
+
+def _is_numeric(dtype: str) -> bool:
+    try:
+        return is_numeric_dtype(pandas_dtype(dtype))
+    except TypeError:
+        return False
+
+
+# ---------------------------------------------------------------------------
+# 2. 모델 산출물.
+# ---------------------------------------------------------------------------
+
+def _level_keys(values) -> pd.Index:
+    """고정효과 수준 키(문자열, 결측은 None) ── 저장·조회에 같은 표기를 쓴다."""
+    v = pd.Series(values)
+    return pd.Index(v.astype(str).where(v.notna(), None), dtype=object)
+
+
+class HedonicModel:
+    """선형 헤도닉 모델(상수항 + 피처 계수 + 선택적 고정효과 수준별 효과).
+
+    Parameters
+    ----------
+    coef : 피처명 → 계수(``const`` 포함, 순서가 설계행렬 컬럼 순서).
+    target : 학습 타겟 컬럼(변환 타겟이면 ``transformer``로 가격 척도 역변환).
+    cov : 계수 공분산(없으면 None, 순서는 ``coef``와 동일).
+    dtypes : 학습 시 피처 dtype.
+    transformer : 06 단계 분포 변환기(변환 피처를 같은 λ로 재계산).
+    fingerprint : 학습 데이터 지문(``data_fingerprint``).
+    meta : 추정 방식 등 부가 정보.
+    fe_effects : 고정효과 컬럼 → 수준별 효과 Series(인덱스는 수준 값, 가중 평균 0).
+    fe_unseen : 학습에 없던 수준(또는 결측)의 처리 ── ``zero``/``nan``/``error``.
+    """
+
+    def __init__(self, coef: pd.Series, target: str, cov: Optional[np.ndarray] = None,
+                 dtypes: Optional[Dict[str, str]] = None,
+                 transformer: Optional[DistributionTransformer] = None,
+                 fingerprint: Optional[dict] = None, meta: Optional[dict] = None,
+                 fe_effects: Optional[Dict[str, pd.Series]] = None, fe_unseen: str = "zero"):
+        self.coef = pd.Series(coef, dtype="float64")
+        self.target = target
+        self.cov = None if cov is None else np.asarray(cov, dtype="float64")
+        if self.cov is not None and self.cov.shape != (len(self.coef),) * 2:
+            raise ValueError(f"covariance shape {self.cov.shape} does not match {len(self.coef)} coefficients")
+        self.dtypes = dict(dtypes or {})
+        self.transformer = transformer
+        self.fingerprint = fingerprint or {}
+        self.meta = meta or {}
+        if fe_unseen not in UNSEEN_POLICIES:
+            raise ValueError(f"unknown unseen-level policy: {fe_unseen}")
+        self.fe_unseen = fe_unseen
+        self.fe_effects = {}
+        for col, eff in (fe_effects or {}).items():
+            eff = pd.Series(eff, dtype="float64")
+            keys = _level_keys(eff.index)
+            if not keys.is_unique or keys.hasnans:
+                raise ValueError(f"fixed-effect levels of '{col}' must be unique and non-missing")
+            self.fe_effects[col] = pd.Series(eff.to_numpy(), index=keys)
+
+    @property
+    def features(self) -> List[str]:
+        return [c for c in self.coef.index if c != "const"]
+
+    @property
+    def fe_columns(self) -> List[str]:
+        return list(self.fe_effects)
+
+    @property
+    def bse(self) -> Optional[pd.Series]:
+        if self.cov is None:
+            return None
+        return pd.Series(np.sqrt(np.clip(np.diag(self.cov), 0, None)), index=self.coef.index)
+
+    # ------------------------------------------------------------------
+    def _feature_inputs(self, available: Iterable[str]) -> List[str]:
+        available = set(available)
+        cols = []
+        for c in self.features:
+            if c in available:
+                cols.append(c)
+            elif self.transformer is not None and self.transformer.source_feature(c) in available:
+                cols.append(self.transformer.source_feature(c))
+        return list(dict.fromkeys(cols))
+
+    def input_columns(self, available: Iterable[str]) -> List[str]:
+        """``available`` 컬럼 중 예측에 읽어야 할 컬럼(변환 피처가 없으면 원 피처, 고정효과 키 포함)."""
+        available = set(available)
+        return list(dict.fromkeys(self._feature_inputs(available) + [c for c in self.fe_columns if c in available]))
+
+    def validate(self, columns: Iterable[str], dtypes: Optional[Dict[str, str]] = None) -> None:
+        """필수 피처가 있거나(변환 피처는 원 피처로 재계산 가능) 수치형인지 검사."""
+        columns = set(columns)
+        missing = []
+        for c in self.features:
+            if c in columns:
+                continue
+            src = self.transformer.source_feature(c) if self.transformer is not None else None
+            if src is None or src not in columns:
+                missing.append(c)
+        missing += [c for c in self.fe_columns if c not in columns]
+        if missing:
+            raise ValueError(f"Input is missing model features: {missing}")
+        if dtypes:
+            bad = {c: t for c, t in dtypes.items() if c in self._feature_inputs(columns) and not _is_numeric(t)}
+            if bad:
+                raise TypeError(f"Model features must be numeric, got: {bad}")
+
+    def effects(self, df: pd.DataFrame) -> np.ndarray:
+        """행별 고정효과 합(수준 조회는 고유값에만 수행, 미학습 수준은 ``fe_unseen`` 정책)."""
+        out = np.zeros(len(df))
+        for col, eff in self.fe_effects.items():
+            codes, uniques = pd.factorize(df[col], sort=False)
+            pos = eff.index.get_indexer(_level_keys(uniques))
+            row_pos = np.where(codes >= 0, pos[np.clip(codes, 0, None)] if len(pos) else -1, -1)
+            unseen = row_pos < 0
+            if unseen.any() and self.fe_unseen == "error":
+                levels = pd.unique(df[col].to_numpy()[unseen])[:5].tolist()
+                raise ValueError(f"{int(unseen.sum())} rows have '{col}' levels not seen in training, e.g. {levels}")
+            vals = eff.to_numpy()[np.clip(row_pos, 0, None)] if len(eff) else np.zeros(len(df))
+            out += np.where(unseen, np.nan if self.fe_unseen == "nan" else 0.0, vals)
+        return out
+
+    def predict(self, df: pd.DataFrame, price: bool = False) -> np.ndarray:
+        """타겟 척도 예측(``price=True``면 가격 척도). 피처 결측 행은 NaN."""
+        self.validate(df.columns, {c: str(df[c].dtype) for c in df.columns})
+        df = ensure_transformed(df, self.features, self.transformer)
+        X = np.empty((len(df), len(self.coef)), dtype="float64")
+        for j, c in enumerate(self.coef.index):
+            X[:, j] = 1.0 if c == "const" else df[c].to_numpy(dtype="float64", na_value=np.nan)
+        pred = X @ self.coef.to_numpy()
+        if self.fe_effects:
+            pred = pred + self.effects(df)
+        return target_to_price(pred, self.target, self.transformer) if price else pred
+
+    def iter_score(self, source: Union[pd.DataFrame, str, Path], batch_size: int = 100_000,
+                   keep: Sequence[str] = (), price: bool = False) -> Iterator[pd.DataFrame]:
+        """``batch_size`` 행씩 예측한 ``keep`` 컬럼 + ``pred`` 프레임을 차례로 반환.
+
+        Parquet 경로면 스키마로 먼저 검사한 뒤 필요한 컬럼만 배치 단위로 읽는다.
+        """
+        if isinstance(source, pd.DataFrame):
+            self.validate(source.columns, {c: str(source[c].dtype) for c in source.columns})
+            for s in range(0, len(source), batch_size):
+                batch = source.iloc[s:s + batch_size]
+                out = batch[list(keep)].copy()
+                out["pred"] = self.predict(batch, price=price)
+                yield out
+            return
+
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(source)
+        names = pf.schema_arrow.names
+        self.validate(names, frame_dtypes(source, self._feature_inputs(names)))
+        cols = list(dict.fromkeys(self.input_columns(names) + [c for c in keep if c in names]))
+        for rb in pf.iter_batches(batch_size=batch_size, columns=cols):
+            batch = rb.to_pandas()
+            out = batch[[c for c in keep if c in batch.columns]].copy()
+            out["pred"] = self.predict(batch, price=price)
+            yield out
+
+    def score(self, source: Union[pd.DataFrame, str, Path], batch_size: int = 100_000,
+              keep: Sequence[str] = (), price: bool = False) -> pd.DataFrame:
+        """``iter_score`` 결과를 한 프레임으로 결합."""
+        parts = list(self.iter_score(source, batch_size, keep, price))
+        if not parts:
+            return pd.DataFrame(columns=list(keep) + ["pred"])
+        return pd.concat(parts, ignore_index=isinstance(source, (str, Path)))
+
+    # ------------------------------------------------------------------
+    def to_dict(self) -> dict:
+        return {
+            "version": ARTIFACT_VERSION,
+            "target": self.target,
+            "features": list(self.coef.index),
+            "coef": self.coef.tolist(),
+            "cov": self.cov.tolist() if self.cov is not None else None,
+            "dtypes": self.dtypes,
+            "transform": self.transformer.to_dict() if self.transformer is not None else None,
+            "fingerprint": self.fingerprint,
+            "meta": self.meta,
+            "fixed_effects": {c: {"levels": e.index.tolist(), "effects": e.tolist()} for c, e in self.fe_effects.items()},
+            "fe_unseen": self.fe_unseen,
+        }
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False))
+        return path
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "HedonicModel":
+        if d.get("version") not in SUPPORTED_VERSIONS:
+            raise ValueError(f"unsupported model artifact version: {d.get('version')}")
+        tr = DistributionTransformer.from_dict(d["transform"]) if d.get("transform") else None
+        fe = {c: pd.Series(v["effects"], index=v["levels"]) for c, v in (d.get("fixed_effects") or {}).items()}
+        if not fe and (d.get("meta") or {}).get("fixed_effects"):
+            # 버전 1 산출물은 고정효과 값 없이 계수만 저장 ── 효과 없이 예측하면 편향되므로 거부.
+            raise ValueError("model artifact was fit with fixed effects but does not store their values; refit with stage 07")
+        return cls(pd.Series(d["coef"], index=d["features"]), d["target"], cov=d.get("cov"),
+                   dtypes=d.get("dtypes"), transformer=tr, fingerprint=d.get("fingerprint"),
+                   meta=d.get("meta"), fe_effects=fe, fe_unseen=d.get("fe_unseen", "zero"))
+
+    @classmethod
+    def load(cls, path) -> "HedonicModel":
+        return cls.from_dict(json.loads(Path(path).read_text()))
@@ -0,0 +1,101 @@
+"""거래 단위 → 단지×월 패널 집계.
+
+(complex_id, year_month) 키별 첫 행만 남기던 방식 대신, 한 번의 정렬과 한 번의
+벡터화 groupby로 거래 수·중위/평균 ㎡당 가격·면적 가중 가격·면적 구간별 거래 수를
+집계한다. 같은 정렬 결과에서 거래 단위 패널도 함께 만들어 단일 패스로 두 산출물을 얻는다.
+"""
+from __future__ import annotations
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+PANEL_KEYS = ("complex_id", "year_month")
+
+# 전용면적(㎡) 구간: 국민주택규모(85㎡) 기준 통상 분류.
+AREA_BINS: Dict[str, Tuple[float, float]] = {
+    "lt60": (0.0, 60.0),
+    "60_85": (60.0, 85.0),
+    "85_135": (85.0, 135.0),
+    "ge135": (135.0, np.inf),
+}
+
+
+def _area_bucket_frame(area: pd.Series, bins: Dict[str, Tuple[float, float]]) -> pd.DataFrame:
+    """면적 구간 지시변수(int32) 프레임 ── 집계 시 합계가 곧 구간별 거래 수."""
+    a = area.to_numpy(dtype="float64", na_value=np.nan)
+    return pd.DataFrame(
+        {f"n_area_{name}": ((a >= lo) & (a < hi)).astype("int32") for name, (lo, hi) in bins.items()},
+        index=area.index,
+    )
+
+
+def aggregate_panel(df: pd.DataFrame,
+                    keys: Sequence[str] = PANEL_KEYS,
+                    price_col: str = "price_per_m2",
+                    total_price_col: str = "price",
+                    area_col: str = "area_m2",
+                    area_bins: Dict[str, Tuple[float, float]] = AREA_BINS,
+                    exclude_prefixes: Sequence[str] = ("tm_",)) -> pd.DataFrame:
+    """키별 집계 패널 생성(키는 MultiIndex).
+
+    - ``n_trades``: 거래 수
+    - ``ppm2_median`` / ``ppm2_mean``: ㎡당 가격 중위·평균
+    - ``ppm2_area_weighted``: Σ거래금액 / Σ전용면적
+    - ``n_area_*``: 면적 구간별 거래 수
+    - 그 밖의 수치형 컬럼은 평균, 비수치형 컬럼은 첫 값
+    """
+    keys = list(keys)
+    work = df
+    if area_col in df.columns:
+        work = pd.concat([df, _area_bucket_frame(df[area_col], area_bins)], axis=1)
+    bucket_cols = [c for c in work.columns if c.startswith("n_area_")]
+    skip = set(keys) | set(bucket_cols)
+    other = [c for c in df.columns
+             if c not in skip and not any(str(c).startswith(p) for p in exclude_prefixes)]
+
+    named = {"n_trades": (keys[0], "size")}
+    if price_col in work.columns:
+        named["ppm2_median"] = (price_col, "median")
+        named["ppm2_mean"] = (price_col, "mean")
+    if total_price_col in work.columns and area_col in work.columns:
+        named["_price_sum"] = (total_price_col, "sum")
+        named["_area_sum"] = (area_col, "sum")
+    named.update({c: (c, "sum") for c in bucket_cols})
+    for c in other:
+        named[c] = (c, "mean" if is_numeric_dtype(work[c]) and work[c].dtype != bool else "first")
+
+    # 단일 groupby 호출로 모든 통계를 계산(입력이 키 정렬 상태면 sort 생략).
+    agg = work.groupby(keys, sort=False, dropna=False, observed=True).agg(**named)
+    if "_price_sum" in agg.columns:
+        area_sum = agg.pop("_area_sum")
+        agg["ppm2_area_weighted"] = agg.pop("_price_sum") / area_sum.where(area_sum > 0)
+    return agg
+
+
+def build_panels(df: pd.DataFrame,
+                 keys: Sequence[str] = PANEL_KEYS,
+                 dedup: str = "first",
+                 **agg_kwargs) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """정렬 1회로 거래 단위 패널과 단지×월 집계 패널을 함께 생성.
+
+    Parameters
+    ----------
+    dedup : ``"first"``이면 거래 단위 패널에서 키별 첫 행만 유지(기존 03 동작),
+            ``"none"``이면 모든 거래를 유지한다.
+
+    Returns
+    -------
+    (거래 단위 패널, 집계 패널) ── 둘 다 ``keys`` MultiIndex, 키 정렬 상태.
+    """
+    if dedup not in ("first", "none"):
+        raise ValueError(f"dedup must be 'first' or 'none', got {dedup!r}")
+    keys = list(keys)
+    ordered = df.sort_values(keys, kind="stable").reset_index(drop=True)
+    agg = aggregate_panel(ordered, keys=keys, **agg_kwargs)
+    txn = ordered
+    if dedup == "first":
+        txn = ordered[~ordered.duplicated(keys, keep="first")]
+    return txn.set_index(keys), agg
@@ -0,0 +1,149 @@
+"""패널 Parquet 산출물 입출력 ── 키 정렬·row group 인덱싱 레이아웃.
+
+``write_panel``은 (complex_id, year_month) 순으로 정렬한 뒤 크기를 조정한 row group,
+문자열 컬럼 dictionary 인코딩, zstd 압축으로 저장한다. 정렬 덕분에 row group별
+min/max 통계가 키 범위를 좁게 가지므로, ``read_panel``에 ``filters=``를 주면 특정
+단지·기간 조회 시 해당 row group만 읽는다.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import is_object_dtype, is_string_dtype
+
+PANEL_KEYS = ("complex_id", "year_month")
+
+# row group 목표 크기(비압축 기준)와 행 수 하한/상한.
+TARGET_ROW_GROUP_MB = 32
+MIN_ROW_GROUP_ROWS = 8_192
+MAX_ROW_GROUP_ROWS = 1_048_576
+
+
+def _row_group_rows(df: pd.DataFrame, target_mb: float) -> int:
+    """행당 메모리 크기로 목표 용량에 맞는 row group 행 수를 추정."""
+    if len(df) == 0:
+        return MIN_ROW_GROUP_ROWS
+    bytes_per_row = max(df.memory_usage(index=False, deep=False).sum() / len(df), 1.0)
+    rows = int(target_mb * 1024 ** 2 / bytes_per_row)
+    return max(MIN_ROW_GROUP_ROWS, min(rows, MAX_ROW_GROUP_ROWS))
+
+
+def _string_columns(df: pd.DataFrame) -> List[str]:
+    cols = [c for c in df.columns if is_object_dtype(df[c]) or is_string_dtype(df[c])
+            or isinstance(df[c].dtype, pd.CategoricalDtype)]
+    cols += [n for n in df.index.names if n is not None and
+             (is_object_dtype(df.index.get_level_values(n)) or is_string_dtype(df.index.get_level_values(n)))]
+    return [str(c) for c in cols]
+
+
+def write_panel(df: pd.DataFrame,
+                path,
+                keys: Sequence[str] = PANEL_KEYS,
+                row_group_size: Optional[int] = None,
+                target_mb: float = TARGET_ROW_GROUP_MB,
+                compression: str = "zstd",
+                compression_level: Optional[int] = 3) -> Path:
+    """패널을 키 정렬·row group 인덱싱 레이아웃으로 저장.
+
+    키가 인덱스 레벨이면 인덱스째 보존하고, 일반 컬럼이면 정렬 후 RangeIndex를 버린다.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    named_index = any(n is not None for n in df.index.names)
+    available = set(df.columns) | {n for n in df.index.names if n is not None}
+    sort_keys = [k for k in keys if k in available]
+    if sort_keys:
+        df = df.sort_values(sort_keys, kind="stable")
+    if not named_index:
+        df = df.reset_index(drop=True)
+    table = pa.Table.from_pandas(df, preserve_index=named_index)
+    pq.write_table(
+        table,
+        path,
+        row_group_size=row_group_size or _row_group_rows(df, target_mb),
+        compression=compression,
+        compression_level=compression_level,
+        use_dictionary=_string_columns(df) or False,
+        write_statistics=True,
+    )
+    return path
+
+
+def write_chunks(chunks: Iterable[pd.DataFrame],
+                 path,
+                 compression: str = "zstd",
+                 compression_level: Optional[int] = 3) -> int:
+    """DataFrame 청크를 하나의 Parquet 파일로 순차 저장(청크마다 row group, 스키마는 첫 청크 기준).
+
+    전체 결과를 메모리에 모으지 않고 쓸 때 사용한다. 반환값은 저장한 행 수.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = None
+    n_rows = 0
+    try:
+        for df in chunks:
+            table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression=compression,
+                                          compression_level=compression_level,
+                                          use_dictionary=_string_columns(df) or False)
+            writer.write_table(table.cast(writer.schema))
+            n_rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+
+def read_panel(path,
+               columns: Optional[Sequence[str]] = None,
+               filters=None) -> pd.DataFrame:
+    """패널 로드 ── ``columns``로 컬럼을, ``filters``로 row group을 가지치기.
+
+    ``filters``는 pyarrow 형식(예: ``[("complex_id", "in", ids)]``)이며
+    ``complex_filter``/``period_filter`` 헬퍼 결과를 그대로 쓸 수 있다.
+    저장 시 인덱스였던 키 컬럼은 ``columns`` 지정 여부와 관계없이 인덱스로 복원된다.
+    """
+    table = pq.read_pandas(path, columns=list(columns) if columns is not None else None,
+                           filters=filters)
+    return table.to_pandas()
+
+
+def panel_columns(path) -> List[str]:
+    """파일을 읽지 않고 스키마에서 컬럼명만 조회."""
+    return list(pq.read_schema(path).names)
+
+
+def schema_frame(path) -> pd.DataFrame:
+    """파일을 읽지 않고 0행 DataFrame 생성(``read_panel``과 같은 컬럼·dtype·인덱스 복원)."""
+    return pq.read_schema(path).empty_table().to_pandas()
+
+
+def complex_filter(complex_ids) -> list:
+    """특정 단지(들)만 읽는 필터."""
+    if isinstance(complex_ids, (str, int)):
+        complex_ids = [complex_ids]
+    return [("complex_id", "in", [str(c) for c in complex_ids])]
+
+
+def period_filter(start=None, end=None, col: str = "year_month") -> list:
+    """``start`` ≤ year_month ≤ ``end`` 기간만 읽는 필터(경계 생략 가능)."""
+    out = []
+    if start is not None:
+        out.append((col, ">=", pd.Timestamp(start).to_pydatetime()))
+    if end is not None:
+        out.append((col, "<=", pd.Timestamp(end).to_pydatetime()))
+    return out
+
+
+def iter_row_groups(path, columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """row group 단위로 순차 로드(메모리 상한 = row group 1개)."""
+    pf = pq.ParquetFile(path)
+    cols = list(columns) if columns is not None else None
+    for i in range(pf.num_row_groups):
+        yield pf.read_row_group(i, columns=cols, use_pandas_metadata=True).to_pandas()
@@ -0,0 +1,70 @@
+"""joblib 기반 병렬 적합 유틸리티 ── 큰 배열은 memmap으로 워커와 공유.
+
+교차검증 폴드·세그먼트별 적합·부트스트랩처럼 독립적인 작업을 워커 프로세스에 나눌 때,
+설계행렬은 임시 디렉토리의 ``.npy`` 파일로 한 번 저장하고 읽기 전용 memmap으로 넘긴다
+(joblib은 ``np.memmap`` 인자를 파일 참조로 직렬화하므로 데이터 복사본이 전달되지 않는다).
+작업 함수는 스크립트가 아닌 모듈 최상위에 정의해야 하며, 결과는 작업 순서대로 반환되어
+순차 실행과 동일하다.
+"""
+from __future__ import annotations
+
+import shutil
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class SharedArrays:
+    """워커 공유용 읽기 전용 memmap 배열 저장소(with 블록 종료 시 임시 파일 삭제)."""
+
+    def __init__(self, tmp_dir: Optional[str] = None, enabled: bool = True):
+        self.enabled = enabled
+        self.dir = Path(tempfile.mkdtemp(prefix="hedonic_mm_", dir=tmp_dir)) if enabled else None
+        self.arrays: Dict[str, np.ndarray] = {}
+        # 예외로 close()에 도달하지 못해도 인터프리터 종료 시 임시 파일 정리.
+        self._cleanup = weakref.finalize(self, shutil.rmtree, str(self.dir), True) if enabled else None
+
+    def put(self, name: str, arr) -> np.ndarray:
+        """배열을 ``{name}.npy``로 저장하고 memmap 반환(비활성화 시 원 배열 그대로)."""
+        arr = np.ascontiguousarray(arr)
+        if not self.enabled:
+            self.arrays[name] = arr
+            return arr
+        path = self.dir / f"{name}.npy"
+        np.save(path, arr)
+        self.arrays[name] = np.load(path, mmap_mode="r")
+        return self.arrays[name]
+
+    def empty(self, name: str, shape: tuple, dtype="float64") -> np.ndarray:
+        """``{name}.npy``에 쓰기 가능한 memmap을 할당(비활성화 시 일반 배열) ── 큰 배열을 제자리에서 채울 때."""
+        if not self.enabled:
+            self.arrays[name] = np.empty(shape, dtype=dtype)
+        else:
+            self.arrays[name] = np.lib.format.open_memmap(self.dir / f"{name}.npy", mode="w+",
+                                                          dtype=dtype, shape=shape)
+        return self.arrays[name]
+
+    def close(self) -> None:
+        self.arrays.clear()
+        if self._cleanup is not None:
+            self._cleanup()
+        self.dir = None
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def parallel_map(fn: Callable, tasks: Sequence[tuple], n_jobs: int = 1) -> List:
+    """``fn(*task)``를 작업 순서대로 실행(``n_jobs`` ≤ 1이면 현재 프로세스에서 순차 실행)."""
+    tasks = list(tasks)
+    if n_jobs == 1 or n_jobs == 0 or len(tasks) <= 1:
+        return [fn(*t) for t in tasks]
+    from joblib import Parallel, delayed
+
+    return Parallel(n_jobs=n_jobs, max_nbytes="1M", mmap_mode="r")(delayed(fn)(*t) for t in tasks)
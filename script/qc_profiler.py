@@ -0,0 +1,274 @@
+"""Parquet row group 단일 패스 스트리밍 QC 프로파일러.
+
+패널 전체를 메모리에 올리지 않고 row group을 한 번만 순회하며 컬럼별 결측 수,
+최소/최대, 1~4차 중심적률(Pébay 병합), 쌍별(pairwise-complete) 공분산 합,
+병합 가능한 분위수 스케치(KLL 방식 compactor)와 정규성 검정용 균등 표본(bottom-k)을
+누적한다. 메모리는 row group 1개 + O(p²)(쌍별 합, 선택) + 컬럼당 스케치 크기로 제한된다.
+"""
+from __future__ import annotations
+
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+# ---------------------------------------------------------------------------
+# 1. 분위수 스케치.
+# ---------------------------------------------------------------------------
+
+class QuantileSketch:
+    """KLL 방식의 병합 가능한 분위수 스케치.
+
+    레벨 h의 항목은 가중치 2^h를 가지며, 레벨 버퍼가 ``k``를 넘으면 정렬 후
+    무작위 오프셋으로 절반만 남겨 다음 레벨로 올린다(메모리 O(k·log(n/k))).
+    """
+
+    def __init__(self, k: int = 2_048, seed: int = 0):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def n(self) -> int:
+        return int(sum(len(lv) << h for h, lv in enumerate(self.levels)))
+
+    def update(self, values) -> "QuantileSketch":
+        v = np.asarray(values, dtype="float64")
+        v = v[np.isfinite(v)]
+        if len(v):
+            self.levels[0] = np.concatenate([self.levels[0], v])
+            self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        for h, lv in enumerate(other.levels):
+            if h >= len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], lv])
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            lv = self.levels[h]
+            if len(lv) > self.k:
+                items = np.sort(lv)
+                if len(items) % 2:
+                    # 홀수 개면 마지막 항목은 현재 레벨에 남긴다.
+                    items, rest = items[:-1], items[-1:]
+                else:
+                    rest = np.empty(0)
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[h] = rest
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantiles(self, qs) -> np.ndarray:
+        qs = np.atleast_1d(np.asarray(qs, dtype="float64"))
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return np.full(qs.shape, np.nan)
+        weights = np.concatenate([np.full(len(lv), float(1 << h)) for h, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, weights = items[order], weights[order]
+        cum = np.cumsum(weights) - 0.5 * weights
+        return np.interp(qs * weights.sum(), cum, items)
+
+
+# ---------------------------------------------------------------------------
+# 2. 컬럼 단위 적률·범위·표본.
+# ---------------------------------------------------------------------------
+
+class _Moments:
+    """컬럼별 n, 평균, M2~M4를 벡터화해 병합(Pébay 2008)."""
+
+    def __init__(self, p: int):
+        self.n = np.zeros(p)
+        self.mean = np.zeros(p)
+        self.M2 = np.zeros(p)
+        self.M3 = np.zeros(p)
+        self.M4 = np.zeros(p)
+
+    def update(self, X: np.ndarray, mask: np.ndarray) -> None:
+        nb = mask.sum(axis=0).astype("float64")
+        safe = np.where(nb > 0, nb, 1.0)
+        Z0 = np.where(mask, X, 0.0)
+        mb = Z0.sum(axis=0) / safe
+        D = np.where(mask, X - mb, 0.0)
+        D2 = D * D
+        M2b, M3b, M4b = D2.sum(axis=0), (D2 * D).sum(axis=0), (D2 * D2).sum(axis=0)
+
+        na = self.n
+        n = na + nb
+        n_safe = np.where(n > 0, n, 1.0)
+        d = mb - self.mean
+        M2a, M3a = self.M2, self.M3
+        self.M4 = (self.M4 + M4b + d ** 4 * na * nb * (na * na - na * nb + nb * nb) / n_safe ** 3
+                   + 6 * d ** 2 * (na * na * M2b + nb * nb * M2a) / n_safe ** 2
+                   + 4 * d * (na * M3b - nb * M3a) / n_safe)
+        self.M3 = (M3a + M3b + d ** 3 * na * nb * (na - nb) / n_safe ** 2
+                   + 3 * d * (na * M2b - nb * M2a) / n_safe)
+        self.M2 = M2a + M2b + d ** 2 * na * nb / n_safe
+        self.mean = self.mean + d * nb / n_safe
+        self.n = n
+
+
+class _BottomK:
+    """무작위 키가 가장 작은 k개를 유지하는 균등 표본(병합 가능)."""
+
+    def __init__(self, k: int, rng: np.random.Generator):
+        self.k, self._rng = k, rng
+        self.keys = np.empty(0)
+        self.values = np.empty(0)
+
+    def update(self, values: np.ndarray) -> None:
+        v = values[np.isfinite(values)]
+        keys = np.concatenate([self.keys, self._rng.random(len(v))])
+        vals = np.concatenate([self.values, v])
+        if len(keys) > self.k:
+            keep = np.argpartition(keys, self.k)[:self.k]
+            keys, vals = keys[keep], vals[keep]
+        self.keys, self.values = keys, vals
+
+
+# ---------------------------------------------------------------------------
+# 3. 프로파일러.
+# ---------------------------------------------------------------------------
+
+class StreamingProfiler:
+    """수치형 컬럼 집합에 대한 단일 패스 QC 누적기.
+
+    ``pairwise=False``이면 O(p²) 쌍별 합을 누적하지 않으며 ``correlation()``을 쓸 수 없다
+    (04단계는 이 모드로 돌리고 ``corr_topk.ColumnBuffer``·``topk_correlations``로 상관을 탐색).
+    """
+
+    def __init__(self, columns: Sequence[str], sample_cols: Sequence[str] = (),
+                 sample_size: int = 5_000, sketch_k: int = 2_048, seed: int = 0,
+                 pairwise: bool = True):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self._rng = np.random.default_rng(seed)
+        self.n_rows = 0
+        self.n_missing = np.zeros(p, dtype="int64")
+        self.min = np.full(p, np.inf)
+        self.max = np.full(p, -np.inf)
+        self.moments = _Moments(p)
+        self.sketches = {c: QuantileSketch(sketch_k, seed + i) for i, c in enumerate(self.columns)}
+        self.samples = {c: _BottomK(sample_size, self._rng) for c in sample_cols if c in self.columns}
+        self.pairwise = pairwise
+        # 쌍별 공분산 합(수치 안정성을 위해 첫 청크 평균만큼 이동한 값으로 누적)
+        self._shift: Optional[np.ndarray] = None
+        q = p if pairwise else 0
+        self._N = np.zeros((q, q))
+        self._S = np.zeros((q, q))
+        self._Q = np.zeros((q, q))
+        self._P = np.zeros((q, q))
+
+    def update(self, chunk: pd.DataFrame) -> "StreamingProfiler":
+        X = chunk[self.columns].to_numpy(dtype="float64", na_value=np.nan)
+        mask = np.isfinite(X)
+        self.n_rows += len(X)
+        self.n_missing += (~mask).sum(axis=0)
+        if len(X):
+            self.min = np.fmin(self.min, np.where(mask, X, np.inf).min(axis=0))
+            self.max = np.fmax(self.max, np.where(mask, X, -np.inf).max(axis=0))
+        self.moments.update(X, mask)
+        for j, c in enumerate(self.columns):
+            self.sketches[c].update(X[mask[:, j], j])
+        for c, smp in self.samples.items():
+            smp.update(X[:, self.columns.index(c)])
+
+        if not self.pairwise:
+            return self
+        if self._shift is None:
+            cnt = mask.sum(axis=0)
+            self._shift = np.where(cnt > 0, np.where(mask, X, 0.0).sum(axis=0) / np.maximum(cnt, 1), 0.0)
+        M = mask.astype("float64")
+        Z0 = np.where(mask, X - self._shift, 0.0)
+        self._N += M.T @ M
+        self._S += Z0.T @ M
+        self._Q += (Z0 * Z0).T @ M
+        self._P += Z0.T @ Z0
+        return self
+
+    # ------------------------------------------------------------------
+    def missing_rate(self) -> pd.Series:
+        rate = self.n_missing / max(self.n_rows, 1)
+        return pd.Series(rate, index=self.columns, name="missing_rate")
+
+    def correlation(self) -> pd.DataFrame:
+        """쌍별 완전 관측 기반 상관행렬(pandas ``corr()``와 같은 정의)."""
+        if not self.pairwise:
+            raise ValueError("profiler was built with pairwise=False")
+        N, S, Q, P = self._N, self._S, self._Q, self._P
+        St = S.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            num = N * P - S * St
+            den = np.sqrt((N * Q - S * S) * (N * Q.T - St * St))
+            R = np.where(N > 1, num / den, np.nan)
+        return pd.DataFrame(R, index=self.columns, columns=self.columns)
+
+    def summary(self, qs: Sequence[float] = (0.01, 0.25, 0.5, 0.75, 0.99)) -> pd.DataFrame:
+        """컬럼별 요약 통계 + 적률 기반 정규성(왜도·첨도·Jarque–Bera)."""
+        m = self.moments
+        n = m.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.where(n > 1, m.M2 / (n - 1), np.nan)
+            skew = np.sqrt(n) * m.M3 / m.M2 ** 1.5
+            kurt = n * m.M4 / m.M2 ** 2 - 3.0
+        jb = n / 6.0 * (skew ** 2 + kurt ** 2 / 4.0)
+        out = pd.DataFrame({
+            "n": n.astype("int64"),
+            "missing_rate": self.missing_rate().to_numpy(),
+            "mean": np.where(n > 0, m.mean, np.nan),
+            "std": np.sqrt(var),
+            "min": np.where(n > 0, self.min, np.nan),
+            "max": np.where(n > 0, self.max, np.nan),
+            "skew": skew,
+            "kurtosis": kurt,
+            "jarque_bera": jb,
+            "jb_p": np.exp(-jb / 2.0),  # χ²(2) 생존함수
+        }, index=self.columns)
+        qv = np.vstack([self.sketches[c].quantiles(qs) for c in self.columns]) if self.columns else np.empty((0, len(qs)))
+        for i, q in enumerate(qs):
+            out[f"q{int(round(q * 100)):02d}"] = qv[:, i]
+        return out
+
+    def sample(self, col: str) -> np.ndarray:
+        """정규성 검정·Box-Cox용 균등 표본."""
+        return self.samples[col].values.copy()
+
+
+def profile_chunks(chunks: Iterable[pd.DataFrame], columns: Sequence[str],
+                   consumers: Sequence[Callable[[pd.DataFrame], object]] = (),
+                   **kwargs) -> StreamingProfiler:
+    """청크를 한 번 순회하며 프로파일을 누적하고, 같은 청크를 ``consumers``에도 전달."""
+    prof = StreamingProfiler(columns, **kwargs)
+    for chunk in chunks:
+        prof.update(chunk)
+        for fn in consumers:
+            fn(chunk)
+    return prof
+
+
+def profile_parquet(path, columns: Sequence[str],
+                    consumers: Sequence[Callable[[pd.DataFrame], object]] = (),
+                    **kwargs) -> StreamingProfiler:
+    """Parquet 파일의 row group을 순회하며 프로파일 생성."""
+    from panel_io import iter_row_groups
+
+    return profile_chunks(iter_row_groups(path, columns=columns), columns, consumers, **kwargs)
+
+
+def numeric_columns(path) -> List[str]:
+    """Parquet 스키마에서 수치형(정수·실수) 컬럼명 목록."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(path)
+    return [f.name for f in schema
+            if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
@@ -0,0 +1,277 @@
+"""τ(입주 기준 경과 월) 스케일 곡선 ── 코호트별 τ 집계와 관측 수 가중 LOWESS.
+
+모든 코호트(전체 풀링 + 신도시·기수 등 그룹 컬럼의 각 수준)의 (코호트, τ) 칸별 가격 합·건수를
+하나의 평탄 인덱스에 대한 ``np.bincount`` 한 번으로 집계한다. 평활은 τ별 평균을 점으로,
+건수를 가중치로 쓰는 국소 선형 LOWESS(삼입방 커널 × 건수 × 강건 가중치)이므로 거래가 드문
+|τ| 꼬리가 밀집 구간과 같은 무게를 갖지 않는다. 가중치가 모두 같으면 statsmodels ``lowess``와
+같은 결과를 낸다. 코호트별 평활은 ``parallel_map``으로 병렬 실행한다.
+
+불확실성 밴드는 단지 클러스터 부트스트랩으로 만든다. 창 안에 거래가 있는 단지의 (단지, 코호트, τ)
+칸 합계를 CSR로 한 번 집계해 두고, 복제마다 그 단지들의 복원추출 횟수(``bincount``)를 가중치로 한
+희소 행렬곱으로 τ 평균을
+다시 계산한 뒤 재평활한다. 복제 블록은 ``SeedSequence`` 자식 시드로 병렬 실행하므로 결과는
+워커 수와 무관하다.
+"""
+from __future__ import annotations
+
+import warnings
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from parallel_jobs import parallel_map
+
+POOLED = "all"
+
+
+# ---------------------------------------------------------------------------
+# 1. 가중 LOWESS.
+# ---------------------------------------------------------------------------
+
+def _windows(xs: np.ndarray, k: int) -> np.ndarray:
+    """정렬된 ``xs``의 점별 k-최근접 연속 구간 시작 위치(statsmodels와 같은 이동 규칙)."""
+    n = len(xs)
+    left = np.empty(n, dtype="int64")
+    lo, hi = 0, k
+    for i in range(n):
+        while hi < n and xs[i] > (xs[lo] + xs[hi]) / 2.0:
+            lo += 1
+            hi += 1
+        left[i] = lo
+    return left
+
+
+def weighted_lowess(x: np.ndarray, y: np.ndarray, w: Optional[np.ndarray] = None,
+                    frac: float = 2 / 3, it: int = 3) -> np.ndarray:
+    """관측 가중치 ``w``를 반영한 LOWESS 적합값(``x`` 순서 그대로 반환).
+
+    statsmodels ``lowess``(delta=0)의 계산을 점별 k-최근접 구간(k = ⌊frac·n⌋, 최소 2)에서
+    같은 순서로 벡터화했다: 삼입방 커널 × 강건 가중치 × ``w``, 양의 가중치 점이 2개 미만이면
+    관측값 그대로, 가중 분산 하한 1e-12, 강건 가중치는 잔차의 이중제곱(척도 6 × 중앙 절대
+    잔차, 중앙값이 0이면 잔차가 0인 점만 1). 가중치가 모두 같으면 이웃이 좁아도(k ≤ 4)
+    statsmodels와 같은 값을 낸다. 작업 메모리는 n × k다.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    w = np.ones(len(x)) if w is None else np.asarray(w, dtype="float64")
+    n = len(x)
+    if n < 3:
+        return y.copy()
+    k = min(max(int(frac * n + 1e-10), 2), n)
+    order = np.argsort(x)
+    xs, ys, ws = x[order], y[order], w[order]
+    left = _windows(xs, k)
+    idx = left[:, None] + np.arange(k)
+    Xw, Yw = xs[idx], ys[idx]
+    radius = np.maximum(xs - xs[left], xs[left + k - 1] - xs)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.abs(Xw - xs[:, None]) / radius[:, None]
+    t = 1.0 - u * u * u
+    kern = t * t * t
+    # 같은 x의 점은 첫 점의 적합값을 공유(statsmodels의 중복 x 처리).
+    first = np.searchsorted(xs, xs, side="left")
+    robust = np.ones(n)
+    fitted = ys
+    for i in range(it + 1):
+        W = kern * (robust * ws)[idx]
+        reg_ok = (W > 1e-12).sum(axis=1) >= 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            W = W / W.sum(axis=1)[:, None]
+        xm = np.zeros(n)
+        for j in range(k):
+            xm = xm + W[:, j] * Xw[:, j]
+        sxx = np.zeros(n)
+        for j in range(k):
+            sxx = sxx + W[:, j] * (Xw[:, j] - xm) ** 2
+        sxx = np.maximum(sxx, 1e-12)
+        # 국소 선형 투영 Σ_j p_ij y_j, p_ij = W_ij · (1 + (x_i − x̄)(x_j − x̄)/sxx).
+        fit = np.zeros(n)
+        for j in range(k):
+            fit = fit + W[:, j] * (1.0 + (xs - xm) * (Xw[:, j] - xm) / sxx) * Yw[:, j]
+        fitted = np.where(reg_ok, fit, ys)[first]
+        if i == it:
+            break
+        resid = np.abs(ys - fitted)
+        m = np.median(resid)
+        r = np.minimum((resid > 0).astype("float64") if m == 0 else resid / (6.0 * m), 1.0)
+        t = 1.0 - r * r
+        robust = t * t
+    out = np.empty(n)
+    out[order] = fitted
+    return out
+
+
+# ---------------------------------------------------------------------------
+# 2. 코호트 × τ 집계.
+# ---------------------------------------------------------------------------
+
+def cohort_codes(df: pd.DataFrame, cohort_cols: Sequence[str]) -> Tuple[np.ndarray, pd.DataFrame]:
+    """행별 코호트 코드 행렬 (n, 1 + len(cohort_cols))과 코호트 목록.
+
+    0번 열은 전체 풀링 코호트(코드 0)이고, 이후 열은 그룹 컬럼 수준별 전역 코드(결측 −1)다.
+    코호트 목록은 ``cohort_var``/``cohort`` 컬럼의 DataFrame(코드 순).
+    """
+    labels = [(POOLED, POOLED)]
+    cols = [np.zeros(len(df), dtype="int64")]
+    for c in cohort_cols:
+        codes, uniques = pd.factorize(df[c], sort=True)
+        codes = codes.astype("int64")
+        cols.append(np.where(codes >= 0, codes + len(labels), -1))
+        labels += [(c, str(u)) for u in uniques]
+    return np.column_stack(cols), pd.DataFrame(labels, columns=["cohort_var", "cohort"])
+
+
+def _cells(tau: np.ndarray, price: np.ndarray, codes: np.ndarray, tau_min: int, tau_max: int):
+    """유효 (행, 코호트) 쌍의 평탄 칸 인덱스(코호트 × τ)와 가격, 원 행 위치."""
+    n_tau = tau_max - tau_min + 1
+    tau = np.asarray(tau, dtype="float64")
+    price = np.asarray(price, dtype="float64")
+    ok = np.isfinite(tau) & np.isfinite(price) & (tau >= tau_min) & (tau <= tau_max)
+    rows = np.flatnonzero(ok)
+    c = codes[rows]
+    valid = c >= 0
+    flat = (c * n_tau + (tau[rows].astype("int64") - tau_min)[:, None])[valid]
+    vals = np.broadcast_to(price[rows][:, None], c.shape)[valid]
+    return flat, vals, np.broadcast_to(rows[:, None], c.shape)[valid]
+
+
+def tau_aggregates(tau: np.ndarray, price: np.ndarray, codes: np.ndarray, n_cohorts: int,
+                   tau_min: int, tau_max: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(코호트, τ) 칸별 가격 합·건수 ── 모든 코호트를 bincount 한 번으로 집계.
+
+    Returns
+    -------
+    (sums, counts) : 각각 (n_cohorts, tau_max − tau_min + 1).
+    """
+    n_cells = n_cohorts * (tau_max - tau_min + 1)
+    flat, vals, _ = _cells(tau, price, codes, tau_min, tau_max)
+    sums = np.bincount(flat, weights=vals, minlength=n_cells)
+    counts = np.bincount(flat, minlength=n_cells)
+    return sums.reshape(n_cohorts, -1), counts.reshape(n_cohorts, -1)
+
+
+def cluster_aggregates(tau: np.ndarray, price: np.ndarray, codes: np.ndarray, n_cohorts: int,
+                       clusters: np.ndarray, tau_min: int, tau_max: int) -> Tuple[sp.csr_matrix, sp.csr_matrix]:
+    """클러스터(단지)별 (코호트, τ) 칸 합·건수 ── 각각 CSR (기여 클러스터 수, n_cohorts × n_tau).
+
+    창 안에 유효 행이 있는 클러스터만 행으로 두고(코드 순), 클러스터 코드가 −1인 행은
+    제외한다. 단지마다 관측 칸이 소수이므로 0이 아닌 칸만 저장한다. 클러스터 축 합계가
+    ``tau_aggregates``와 같다.
+    """
+    clusters = np.asarray(clusters, dtype="int64")
+    n_cells = n_cohorts * (tau_max - tau_min + 1)
+    flat, vals, rows = _cells(tau, price, codes, tau_min, tau_max)
+    k = clusters[rows]
+    keep = k >= 0
+    present, row = np.unique(k[keep], return_inverse=True)
+    shape = (len(present), n_cells)
+    sums = sp.csr_matrix((vals[keep], (row, flat[keep])), shape=shape)
+    counts = sp.csr_matrix((np.ones(len(row)), (row, flat[keep])), shape=shape)
+    return sums, counts
+
+
+# ---------------------------------------------------------------------------
+# 3. 코호트별 평활.
+# ---------------------------------------------------------------------------
+
+def _smooth_rows(means: np.ndarray, counts: np.ndarray, taus: np.ndarray,
+                 frac: float, weighted: bool) -> np.ndarray:
+    """(m, n_tau) 평균 행렬의 행별 LOWESS(건수 0인 τ는 NaN)."""
+    out = np.full(means.shape, np.nan)
+    for i in range(len(means)):
+        m = counts[i] > 0
+        out[i, m] = weighted_lowess(taus[m], means[i, m], counts[i, m] if weighted else None, frac=frac)
+    return out
+
+
+def smooth_curves(sums: np.ndarray, counts: np.ndarray, taus: np.ndarray, frac: float = 0.15,
+                  weighted: bool = True, n_jobs: int = 1, block: int = 16) -> np.ndarray:
+    """코호트별 (건수 가중) LOWESS 평활 곡선 (n_cohorts, n_tau) ── 코호트 블록 단위 병렬."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    tasks = [(means[s:s + block], counts[s:s + block], taus, frac, weighted)
+             for s in range(0, len(means), block)]
+    return np.vstack(parallel_map(_smooth_rows, tasks, n_jobs)) if tasks else means.copy()
+
+
+def curve_table(cohorts: pd.DataFrame, taus: np.ndarray, counts: np.ndarray,
+                means: np.ndarray, smoothed: np.ndarray,
+                extra: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+    """(코호트, τ) 롱 포맷 표 ── 건수 0인 칸은 제외."""
+    C, T = counts.shape
+    table = pd.DataFrame({
+        "cohort_var": np.repeat(cohorts["cohort_var"].to_numpy(), T),
+        "cohort": np.repeat(cohorts["cohort"].to_numpy(), T),
+        "tau": np.tile(taus, C),
+        "n_obs": counts.ravel(),
+        "raw_mean_price": means.ravel(),
+        "smoothed_price": smoothed.ravel(),
+    })
+    for name, values in (extra or {}).items():
+        table[name] = np.asarray(values).ravel()
+    return table[table["n_obs"] > 0].reset_index(drop=True)
+
+
+def select_curve(table: pd.DataFrame, cohort: str = POOLED) -> pd.DataFrame:
+    """롱 포맷 스케일 곡선에서 한 코호트의 τ 곡선 추출(``cohort`` 컬럼 없는 구 형식도 허용)."""
+    if "cohort" not in table.columns:
+        return table
+    out = table[table["cohort"].astype(str) == str(cohort)]
+    if out.empty:
+        raise ValueError(f"cohort '{cohort}' not found in scale curve")
+    if out["cohort_var"].nunique() > 1:
+        raise ValueError(f"cohort '{cohort}' is ambiguous across cohort variables")
+    return out
+
+
+# ---------------------------------------------------------------------------
+# 4. 단지 클러스터 부트스트랩 밴드.
+# ---------------------------------------------------------------------------
+
+def _boot_block(S: sp.csr_matrix, N: sp.csr_matrix, n_rep: int, seed, taus: np.ndarray,
+                frac: float, weighted: bool) -> np.ndarray:
+    """클러스터 복원추출 복제 블록의 평활 곡선 (n_rep, n_cells) ── 복제 가중치 × CSR 희소 곱."""
+    rng = np.random.default_rng(seed)
+    K = S.shape[0]
+    W = np.vstack([np.bincount(rng.integers(K, size=K), minlength=K) for _ in range(n_rep)]).astype("float64")
+    sums = np.asarray((S.T @ W.T).T).reshape(-1, len(taus))
+    counts = np.asarray((N.T @ W.T).T).reshape(-1, len(taus))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    return _smooth_rows(means, counts, taus, frac, weighted).reshape(n_rep, -1)
+
+
+def bootstrap_curves(S: np.ndarray, N: np.ndarray, taus: np.ndarray, n_boot: int = 200,
+                     frac: float = 0.15, weighted: bool = True, seed: int = 0, n_jobs: int = 1,
+                     block: int = 25) -> np.ndarray:
+    """단지 클러스터 부트스트랩 평활 곡선 (n_boot, n_cohorts, n_tau).
+
+    ``S``/``N``은 ``cluster_aggregates`` 결과(기여 단지만 복원추출). 복제에서 관측이 없는 칸은 NaN.
+    """
+    sizes = [min(block, n_boot - s) for s in range(0, n_boot, block)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    parts = parallel_map(_boot_block, [(S, N, m, sd, taus, frac, weighted) for m, sd in zip(sizes, seeds)], n_jobs)
+    return np.vstack(parts).reshape(n_boot, -1, len(taus))
+
+
+def curve_bands(draws: np.ndarray, taus: np.ndarray, level: float = 0.95,
+                ref_tau: int = 0) -> Dict[str, np.ndarray]:
+    """부트스트랩 백분위 밴드 ── 평활 가격과 기준 τ 대비 비율(복제별 f_τ / f_ref).
+
+    비율 밴드는 09단계처럼 가격에 f_τ / f₀를 곱할 때 쓰며, 기준 τ가 창 밖이면 NaN이다.
+    """
+    a = (1 - level) / 2
+    out: Dict[str, np.ndarray] = {}
+    # 모든 복제에서 관측이 없는 칸은 NaN(빈 슬라이스 경고 억제).
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        out["smoothed_lo"], out["smoothed_hi"] = np.nanquantile(draws, [a, 1 - a], axis=0)
+        pos = np.flatnonzero(taus == ref_tau)
+        if len(pos):
+            ratio = draws / draws[:, :, pos[0]][:, :, None]
+            out["ratio_lo"], out["ratio_hi"] = np.nanquantile(ratio, [a, 1 - a], axis=0)
+        else:
+            out["ratio_lo"] = out["ratio_hi"] = np.full(draws.shape[1:], np.nan)
+    return out
@@ -0,0 +1,117 @@
+"""3기 신도시 시나리오 격자 가격 밴드 ── (단지 × τ × 시나리오) 텐서를 한 번의 브로드캐스트로 계산.
+
+가격 경로는 세 배수의 곱이다.
+
+    price[c, τ, s] = base[c] · f(τ) · exp(ε_rate·Δrate_s + ε_ltv·ΔLTV_s + ε_supply·Δsupply_s)^φ(τ)
+
+- ``f(τ)``: 08단계 스케일 곡선의 f_τ / f₀(부트스트랩 비율 밴드가 있으면 하한·상한 포함).
+  곡선 창 밖 τ는 가장 가까운 끝값으로 평탄 외삽하고 ``extrapolated``로 표시한다.
+- 충격 배수: 금리(%p)·LTV(%p)·공급(비율) 충격의 반탄력성 선형 결합. 시나리오는 세 격자의
+  데카르트 곱이다.
+- ``φ(τ) = min(τ / phase_in, 1)``: 충격이 ``phase_in``개월에 걸쳐 선형으로 반영(0이면 즉시).
+
+시나리오 축 배수를 먼저 (τ × 시나리오) 행렬로 만들고 단지 블록마다 외적으로 확장하므로,
+결과 표는 블록 단위로 생성·저장되어 메모리가 블록 크기로 제한된다.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+BANDS = ("price_lo", "price", "price_hi")
+
+
+def parse_grid(spec: str) -> np.ndarray:
+    """``"a,b,c"`` 목록 또는 ``"start:stop[:step]"``(stop 포함) 범위 → float 배열."""
+    spec = spec.strip()
+    if ":" in spec:
+        parts = [float(v) for v in spec.split(":")]
+        start, stop = parts[0], parts[1]
+        step = parts[2] if len(parts) > 2 else 1.0
+        if step <= 0:
+            raise ValueError(f"grid step must be positive: {spec}")
+        n = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return start + step * np.arange(max(n, 0))
+    return np.array([float(v) for v in spec.split(",") if v.strip()])
+
+
+def scenario_table(rate: np.ndarray, ltv: np.ndarray, supply: np.ndarray) -> pd.DataFrame:
+    """충격 격자의 데카르트 곱 시나리오 표(``scenario_id`` 순)."""
+    R, L, S = np.meshgrid(rate, ltv, supply, indexing="ij")
+    return pd.DataFrame({"scenario_id": np.arange(R.size, dtype="int32"),
+                         "rate_shock": R.ravel(), "ltv_shock": L.ravel(), "supply_shock": S.ravel()})
+
+
+def scale_path(curve: pd.DataFrame, taus: np.ndarray, ref_tau: int = 0) -> Dict[str, np.ndarray]:
+    """τ 격자 위의 스케일 비율 f_τ / f_ref(중앙·하한·상한)과 외삽 여부.
+
+    ``curve``는 한 코호트의 스케일 곡선(``tau``, ``smoothed_price``, 선택적으로 ``ratio_lo``/``ratio_hi``).
+    """
+    curve = curve.sort_values("tau")
+    t = curve["tau"].to_numpy(dtype="float64")
+    f = curve["smoothed_price"].to_numpy(dtype="float64")
+    ok = np.isfinite(f)
+    t, f = t[ok], f[ok]
+    if not len(t):
+        raise ValueError("scale curve has no finite smoothed prices")
+    f_ref = np.interp(ref_tau, t, f)
+    mid = np.interp(taus, t, f) / f_ref
+    out = {"price": mid, "extrapolated": (taus < t[0]) | (taus > t[-1])}
+    if {"ratio_lo", "ratio_hi"} <= set(curve.columns):
+        for band, col in (("price_lo", "ratio_lo"), ("price_hi", "ratio_hi")):
+            r = curve[col].to_numpy(dtype="float64")[ok]
+            fin = np.isfinite(r)
+            out[band] = np.interp(taus, t[fin], r[fin]) if fin.any() else mid.copy()
+    else:
+        out["price_lo"] = out["price_hi"] = mid
+    return out
+
+
+def shock_multipliers(scenarios: pd.DataFrame, taus: np.ndarray, rate_elasticity: float,
+                      ltv_elasticity: float, supply_elasticity: float, phase_in: float = 0) -> np.ndarray:
+    """(τ, 시나리오) 충격 배수 행렬 exp(Σ ε·Δ)^φ(τ)."""
+    log_m = (rate_elasticity * scenarios["rate_shock"].to_numpy()
+             + ltv_elasticity * scenarios["ltv_shock"].to_numpy()
+             + supply_elasticity * scenarios["supply_shock"].to_numpy())
+    phase = np.ones(len(taus)) if phase_in <= 0 else np.clip(np.asarray(taus, dtype="float64") / phase_in, 0, 1)
+    return np.exp(phase[:, None] * log_m[None, :])
+
+
+def band_tensor(base: np.ndarray, path: Dict[str, np.ndarray], mult: np.ndarray) -> Dict[str, np.ndarray]:
+    """밴드별 (단지, τ, 시나리오) 가격 텐서 ── base ⊗ f(τ) ⊙ 배수(τ, 시나리오)."""
+    base = np.asarray(base, dtype="float64")
+    return {b: base[:, None, None] * (path[b][:, None] * mult)[None, :, :] for b in BANDS}
+
+
+def iter_band_frames(ids: np.ndarray, base: np.ndarray, taus: np.ndarray, path: Dict[str, np.ndarray],
+                     mult: np.ndarray, scenarios: Optional[pd.DataFrame] = None,
+                     block_rows: int = 2_000_000) -> Iterator[pd.DataFrame]:
+    """(단지 × τ × 시나리오) 롱 포맷 밴드 표를 단지 블록 단위로 생성.
+
+    ``complex_id``는 전체 단지 범주의 Categorical(블록 간 같은 사전), ``scenarios``를 주면 충격
+    컬럼을 함께 싣는다.
+    """
+    n_tau, n_scen = mult.shape
+    per_complex = n_tau * n_scen
+    step = max(1, block_rows // max(per_complex, 1))
+    cats = pd.Categorical(ids)
+    tau_col = np.repeat(np.asarray(taus).astype("int16"), n_scen)
+    scen_col = np.tile(np.arange(n_scen, dtype="int32"), n_tau)
+    extrap = np.repeat(path["extrapolated"], n_scen)
+    shock_cols = {} if scenarios is None else {
+        c: np.tile(scenarios[c].to_numpy(dtype="float32"), n_tau) for c in ("rate_shock", "ltv_shock", "supply_shock")}
+    for s in range(0, len(base), step):
+        e = min(s + step, len(base))
+        m = e - s
+        prices = band_tensor(base[s:e], path, mult)
+        frame = {
+            "complex_id": pd.Categorical.from_codes(np.repeat(cats.codes[s:e], per_complex), cats.categories),
+            "tau": np.tile(tau_col, m),
+            "scenario_id": np.tile(scen_col, m),
+            **{c: np.tile(v, m) for c, v in shock_cols.items()},
+        }
+        frame.update({b: prices[b].ravel() for b in BANDS})
+        frame["extrapolated"] = np.tile(extrap, m)
+        yield pd.DataFrame(frame)
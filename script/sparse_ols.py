@@ -0,0 +1,227 @@
+"""희소 고차원 헤도닉 OLS ── 밀집 피처 + CSR 고정효과 더미 혼합 설계.
+
+단지(complex) 수천 개 수준의 고정효과를 밀집 더미 행렬 없이 CSR로 붙이고,
+(1) 희소 정규방정식(scikit-sparse CHOLMOD가 있으면 사용, 없으면 SuperLU) 또는
+(2) LSQR로 푼다. 표준오차는 요청한 계수 부분집합(기본: 밀집 피처)에 대해서만
+A = G⁻¹E_s (k×s)를 풀어 (XA)ᵀ W (XA) 형태로 계산하므로 k×k 행렬을 밀집화하지 않는다.
+HC3 레버리지는 단일 고정효과면 FWL 분해(1/n_g + 그룹 내 demean한 밀집 블록의 레버리지)로
+희소 풀이 없이 계산하고, 다중 고정효과면 행 청크별 다중 우변 풀이를 쓴다(더미 수 × 행 수에
+비례해 느리므로 다중 고정효과에는 클러스터·HC1을 권장).
+완전 공선 방향(지역 더미 ⊂ 단지 효과, 학습에 없는 단지 등)은 대각 스케일링 공간의
+아주 작은 ridge로 최소 노름 해에 수렴시킨다(식별되는 계수에는 영향이 무시할 수준).
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import lsqr, splu
+
+from gram_ols import GramFactor
+
+
+# ---------------------------------------------------------------------------
+# 1. 설계행렬.
+# ---------------------------------------------------------------------------
+
+def one_hot(codes: np.ndarray, n_levels: Optional[int] = None, drop_first: bool = True) -> sp.csr_matrix:
+    """정수 코드(0..G−1, 결측 −1은 전부 0인 행) → CSR 더미 행렬."""
+    codes = np.asarray(codes, dtype="int64")
+    g = int(codes.max()) + 1 if n_levels is None else int(n_levels)
+    rows = np.flatnonzero(codes >= 0)
+    M = sp.csr_matrix((np.ones(len(rows)), (rows, codes[rows])), shape=(len(codes), g))
+    return M[:, 1:] if drop_first else M
+
+
+def mixed_design(dense: np.ndarray, fe_codes: Sequence[np.ndarray] = (),
+                 fe_names: Sequence[str] = (), dense_names: Sequence[str] = ()) -> Tuple[sp.csr_matrix, List[str]]:
+    """[밀집 피처 | 고정효과 더미] CSR 설계행렬과 컬럼명(더미는 ``{fe}=code``)."""
+    blocks = [sp.csr_matrix(np.asarray(dense, dtype="float64"))]
+    names = list(dense_names) if dense_names else [f"x{j}" for j in range(dense.shape[1])]
+    for j, codes in enumerate(fe_codes):
+        D = one_hot(codes)
+        blocks.append(D)
+        fe = fe_names[j] if j < len(fe_names) else f"fe{j}"
+        names += [f"{fe}={g}" for g in range(1, D.shape[1] + 1)]
+    return sp.hstack(blocks, format="csr"), names
+
+
+def dummy_effects(params: np.ndarray, fe_codes: Sequence[np.ndarray], n_dense: int) -> Tuple[float, List[np.ndarray]]:
+    """``mixed_design`` 더미 계수(첫 수준 기준 0) → 수준별 효과와 상수항 이동량.
+
+    효과는 학습 빈도 가중 평균 0으로 정규화하고 그만큼 상수항으로 옮기므로(예측 불변),
+    흡수 모형의 ``FixedEffects.effects``와 같은 척도가 된다.
+    """
+    params = np.asarray(params, dtype="float64")
+    pos, shift, out = n_dense, 0.0, []
+    for codes in fe_codes:
+        codes = np.asarray(codes, dtype="int64")
+        g = int(codes.max()) + 1
+        eff = np.concatenate([[0.0], params[pos:pos + g - 1]])
+        pos += g - 1
+        w = np.bincount(codes[codes >= 0], minlength=g).astype("float64")
+        s = float(w @ eff / w.sum())
+        out.append(eff - s)
+        shift += s
+    return shift, out
+
+
+def share_csr(shared, name: str, X: sp.csr_matrix) -> tuple:
+    """CSR 구성 배열을 ``SharedArrays`` memmap으로 저장(워커에서 ``csr_from_parts``로 복원)."""
+    return (shared.put(f"{name}_data", X.data), shared.put(f"{name}_indices", X.indices),
+            shared.put(f"{name}_indptr", X.indptr), X.shape)
+
+
+def csr_from_parts(parts) -> sp.csr_matrix:
+    if sp.issparse(parts):
+        return parts.tocsr()
+    data, indices, indptr, shape = parts
+    return sp.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+
+
+# ---------------------------------------------------------------------------
+# 2. 희소 정규방정식 인자.
+# ---------------------------------------------------------------------------
+
+class SparseGramFactor:
+    """대각 스케일링 + ridge를 더한 희소 Gram 행렬 인자 ── ``solve(B)``는 G⁻¹B."""
+
+    def __init__(self, G: sp.spmatrix, ridge: float = 1e-10):
+        d = np.sqrt(np.asarray(G.diagonal(), dtype="float64"))
+        self.scale = 1.0 / np.where(d > 0, d, 1.0)
+        S = sp.diags(self.scale)
+        Gs = (S @ G @ S).tocsc() + ridge * sp.identity(G.shape[0], format="csc")
+        self.backend = "superlu"
+        try:
+            from sksparse.cholmod import cholesky  # 선택 의존성
+
+            self._solve = cholesky(Gs)
+            self.backend = "cholmod"
+        except ImportError:
+            self._solve = splu(Gs).solve
+
+    def solve(self, B: np.ndarray) -> np.ndarray:
+        B = np.asarray(B, dtype="float64")
+        sc = self.scale if B.ndim == 1 else self.scale[:, None]
+        return self._solve(B * sc) * sc
+
+
+def _leverage(X: sp.csr_matrix, factor: SparseGramFactor, chunk: int = 2_048) -> np.ndarray:
+    """hᵢ = xᵢᵀ G⁻¹ xᵢ ── 행 청크별로 G⁻¹X_cᵀ를 풀어 계산(밀집 k×n 행렬 미생성)."""
+    h = np.empty(X.shape[0])
+    for s in range(0, X.shape[0], chunk):
+        Xc_T = X[s:s + chunk].T.toarray()
+        h[s:s + chunk] = np.einsum("ij,ij->j", Xc_T, factor.solve(Xc_T))
+    return h
+
+
+def _oneway_leverage(X: sp.csr_matrix, codes: np.ndarray, n_dense: int) -> np.ndarray:
+    """[상수 | 밀집 피처 | 단일 고정효과 더미] 설계의 레버리지(FWL).
+
+    더미와 상수항은 그룹 지시 행렬을 생성하므로 hᵢ = 1/n_g + x̃ᵢᵀ(X̃ᵀX̃)⁺x̃ᵢ 이고,
+    x̃는 밀집 피처(상수항 제외)의 그룹 내 편차다. 희소 풀이가 필요 없다.
+    """
+    codes = np.asarray(codes, dtype="int64")
+    g = int(codes.max()) + 1
+    n_g = np.maximum(np.bincount(codes, minlength=g), 1).astype("float64")
+    h = 1.0 / n_g[codes]
+    if n_dense > 1:
+        D = X[:, 1:n_dense].toarray()
+        for j in range(D.shape[1]):
+            D[:, j] -= (np.bincount(codes, weights=D[:, j], minlength=g) / n_g)[codes]
+        h += GramFactor(D.T @ D).leverage(D)
+    return h
+
+
+# ---------------------------------------------------------------------------
+# 3. 적합.
+# ---------------------------------------------------------------------------
+
+def sparse_ols(X, y: np.ndarray, method: str = "cholesky", ridge: float = 1e-10,
+               cov: Optional[str] = None, se_cols: Optional[Sequence[int]] = None,
+               clusters: Optional[np.ndarray] = None, lsqr_tol: float = 1e-10,
+               chunk: int = 2_048, k_dof: Optional[int] = None,
+               fe_codes: Sequence[np.ndarray] = (), n_dense: Optional[int] = None) -> Dict[str, object]:
+    """혼합 설계 OLS.
+
+    Parameters
+    ----------
+    X : CSR 설계행렬(또는 ``share_csr`` 구성 튜플).
+    method : ``"cholesky"``(희소 정규방정식) 또는 ``"lsqr"``.
+    cov : ``None`` / ``"HC1"`` / ``"HC3"`` / ``"cluster"``(``clusters`` 필요).
+    se_cols : 표준오차를 계산할 계수 인덱스(기본: 전체 ─ 고정효과가 많으면 밀집 피처만 지정).
+    k_dof : HC1·클러스터 소표본 보정의 k(기본: 설계 컬럼 수 ─ 고정효과 더미가 서로 공선이면
+        흡수 모형과 같은 랭크 기반 값을 넘긴다).
+    fe_codes, n_dense : ``mixed_design``의 고정효과 코드와 밀집 블록 폭(상수항 포함). 고정효과가
+        하나이고 결측 코드가 없으면 HC3 레버리지를 FWL로 계산한다(미지정 시 청크별 희소 풀이).
+
+    Returns
+    -------
+    dict
+        ``params``, ``resid``, ``n_iter``(LSQR), 그리고 ``cov`` 지정 시 ``se_cols``/``cov``/``bse``.
+    """
+    X = csr_from_parts(X)
+    y = np.asarray(y, dtype="float64")
+    n, k = X.shape
+    need_factor = method == "cholesky" or cov is not None
+    factor = SparseGramFactor((X.T @ X).tocsc(), ridge) if need_factor else None
+    out: Dict[str, object] = {"method": method, "n_iter": 0}
+    if method == "cholesky":
+        beta = factor.solve(X.T @ y)
+    elif method == "lsqr":
+        d = np.sqrt(np.asarray(X.multiply(X).sum(axis=0)).ravel())
+        scale = 1.0 / np.where(d > 0, d, 1.0)
+        res = lsqr(X @ sp.diags(scale), y, damp=np.sqrt(ridge), atol=lsqr_tol, btol=lsqr_tol,
+                   iter_lim=max(10 * k, 1_000))
+        beta = res[0] * scale
+        out["n_iter"] = int(res[2])
+    else:
+        raise ValueError(f"unknown sparse solver method: {method}")
+    resid = y - X @ beta
+    out.update(params=beta, resid=resid)
+    if factor is not None:
+        out["backend"] = factor.backend
+    if cov is None:
+        return out
+
+    # 부분 공분산: A = G⁻¹E_s, V = (XA)ᵀ W (XA) 또는 클러스터 점수 합.
+    k_corr = k if k_dof is None else int(k_dof)
+    idx = np.arange(k) if se_cols is None else np.asarray(se_cols, dtype="int64")
+    E = np.zeros((k, len(idx)))
+    E[idx, np.arange(len(idx))] = 1.0
+    XA = X @ factor.solve(E)
+    if cov in ("HC1", "HC3"):
+        if cov == "HC3":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if len(fe_codes) == 1 and n_dense is not None and (np.asarray(fe_codes[0]) >= 0).all():
+                    h = _oneway_leverage(X, fe_codes[0], n_dense)
+                else:
+                    h = _leverage(X, factor, chunk)
+                w = (resid / (1.0 - h)) ** 2
+            w = np.where(np.isfinite(w), w, 0.0)
+        else:
+            w = resid ** 2 * n / max(n - k_corr, 1)
+        V = (XA * w[:, None]).T @ XA
+    elif cov == "cluster":
+        if clusters is None:
+            raise ValueError("cluster-robust covariance requires cluster codes")
+        codes = np.asarray(clusters, dtype="int64")
+        g = int(codes.max()) + 1
+        U = np.zeros((g, len(idx)))
+        np.add.at(U, codes, XA * resid[:, None])
+        # statsmodels와 같은 소표본 보정 G/(G−1)·(n−1)/(n−k).
+        V = U.T @ U * (g / max(g - 1, 1)) * ((n - 1) / max(n - k_corr, 1))
+    else:
+        raise ValueError(f"unknown covariance type: {cov}")
+    out.update(se_cols=idx, cov=V, bse=np.sqrt(np.clip(np.diag(V), 0, None)))
+    return out
+
+
+def sparse_fold_fit(X_parts, y: np.ndarray, train_idx: np.ndarray, test_idx: np.ndarray,
+                    method: str = "cholesky", ridge: float = 1e-10) -> Dict[str, object]:
+    """한 폴드의 학습·예측(워커 실행 가능, 학습에 없는 더미 수준의 계수는 0)."""
+    X = csr_from_parts(X_parts)
+    fit = sparse_ols(X[train_idx], np.asarray(y)[train_idx], method=method, ridge=ridge)
+    return {"params": fit["params"], "y_pred": X[test_idx] @ fit["params"], "n_iter": fit["n_iter"],
+            "backend": fit.get("backend")}
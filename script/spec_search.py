@@ -0,0 +1,222 @@
+"""헤도닉 모형 사양 탐색 ── 전체 Gram 행렬 한 번 + Cholesky 갱신으로 피처 부분집합 평가.
+
+후보 피처 전체(상수항 포함)의 폴드별 충분통계량(XᵀX, Xᵀy, yᵀy)을 ``GramCV``로 한 번만
+누적한다. 부분집합 S의 학습 해는 (전체 − 검증 폴드) Gram의 S 블록 Cholesky 인자로 풀고,
+피처 추가는 경계 확장(rank-one, O(|S|²)), 삭제는 꼬리 블록의 rank-one 갱신으로 인자를 고친다.
+검증 SSE·R²·AIC·BIC는 Gram에서만 계산하고, 가격 척도 MAPE만 고정 평가 표본 행의 예측으로
+계산하므로 사양 하나의 평가 비용은 데이터 행 수와 무관하다.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import linalg
+
+from gram_ols import GramCV
+
+
+# ---------------------------------------------------------------------------
+# 1. Cholesky 인자 갱신.
+# ---------------------------------------------------------------------------
+
+def chol_update(L: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """L Lᵀ + x xᵀ의 하삼각 Cholesky 인자(rank-one 갱신, O(m²))."""
+    L = L.copy()
+    x = np.array(x, dtype="float64")
+    for k in range(len(x)):
+        r = np.hypot(L[k, k], x[k])
+        c, s = r / L[k, k], x[k] / L[k, k]
+        L[k, k] = r
+        if k + 1 < len(x):
+            L[k + 1:, k] = (L[k + 1:, k] + s * x[k + 1:]) / c
+            x[k + 1:] = c * x[k + 1:] - s * L[k + 1:, k]
+    return L
+
+
+class CholState:
+    """Gram 행렬 ``G``의 인덱스 부분집합 ``idx`` 블록에 대한 하삼각 Cholesky 인자."""
+
+    def __init__(self, G: np.ndarray, idx: Sequence[int] = (), L: Optional[np.ndarray] = None):
+        self.G = G
+        self.idx = list(idx)
+        self.L = np.zeros((0, 0)) if L is None else L
+
+    def add(self, j: int, tol: float = 1e-10) -> Optional["CholState"]:
+        """피처 ``j`` 추가(경계 확장). 기존 피처와 (거의) 공선이면 None."""
+        m = len(self.idx)
+        g = self.G[self.idx, j]
+        l = linalg.solve_triangular(self.L, g, lower=True, check_finite=False) if m else np.zeros(0)
+        d2 = self.G[j, j] - l @ l
+        if not d2 > tol * max(self.G[j, j], 1e-300):
+            return None
+        L = np.zeros((m + 1, m + 1))
+        L[:m, :m] = self.L
+        L[m, :m] = l
+        L[m, m] = np.sqrt(d2)
+        return CholState(self.G, self.idx + [j], L)
+
+    def drop(self, j: int) -> "CholState":
+        """피처 ``j`` 삭제(행·열 제거 후 꼬리 블록 rank-one 갱신)."""
+        pos = self.idx.index(j)
+        keep = [i for i in range(len(self.idx)) if i != pos]
+        L = self.L[np.ix_(keep, keep)]
+        if pos < len(self.idx) - 1:
+            L[pos:, pos:] = chol_update(L[pos:, pos:], self.L[pos + 1:, pos])
+        return CholState(self.G, [i for i in self.idx if i != j], L)
+
+    def solve(self, b: np.ndarray) -> np.ndarray:
+        """G[S,S] β = b[S] 풀이."""
+        return linalg.cho_solve((self.L, True), b[self.idx], check_finite=False)
+
+
+# ---------------------------------------------------------------------------
+# 2. 사양 평가.
+# ---------------------------------------------------------------------------
+
+class SpecSearch:
+    """후보 피처 부분집합의 CV R²·MAPE·AIC·BIC를 Gram 통계량으로 평가.
+
+    Parameters
+    ----------
+    X, y : 상수항(0번 컬럼)과 모든 후보 피처를 담은 설계행렬, 타겟.
+    fold_ids : 행별 폴드 번호.
+    names : ``X`` 컬럼명.
+    price_fn : 타겟 척도 → 가격 척도 변환(MAPE용, 기본 항등).
+    mape_rows : MAPE 평가 표본 행 수(폴드 배정은 그대로, 0이면 MAPE 생략).
+    seed : 평가 표본 추출 시드.
+    """
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, fold_ids: np.ndarray, names: Sequence[str],
+                 price_fn: Optional[Callable] = None, mape_rows: int = 50_000, seed: int = 0):
+        cv = GramCV(X, y, fold_ids)
+        self.names = list(names)
+        self.n_folds = cv.n_folds
+        self.n = cv.n.astype("float64")
+        # 대각 스케일링 공간에서 인자를 관리(피처 척도 차이에 따른 조건수 악화 방지).
+        d = np.sqrt(np.clip(np.diag(cv.G_total), 0, None))
+        self.scale = 1.0 / np.where(d > 0, d, 1.0)
+        S = np.outer(self.scale, self.scale)
+        self.G_test = cv.G * S
+        self.b_test = cv.b * self.scale
+        self.yy_test = cv.yy
+        self.G_train = [(cv.G_total - cv.G[k]) * S for k in range(self.n_folds)]
+        self.b_train = [(cv.b_total - cv.b[k]) * self.scale for k in range(self.n_folds)]
+        self.G_full = cv.G_total * S
+        self.b_full = cv.b_total * self.scale
+        self.yy_full = cv.yy_total
+        self.price_fn = price_fn or (lambda v: v)
+        rng = np.random.default_rng(seed)
+        rows = np.sort(rng.choice(len(y), size=min(mape_rows, len(y)), replace=False)) if mape_rows else np.zeros(0, int)
+        self.eval_X = np.asarray(X[rows], dtype="float64") * self.scale
+        self.eval_fold = np.asarray(fold_ids)[rows]
+        self.eval_price = np.asarray(self.price_fn(np.asarray(y)[rows]), dtype="float64")
+
+    def start(self, idx: Sequence[int] = (0,)) -> Optional[List[CholState]]:
+        """부분집합 ``idx``의 (폴드별 학습 + 전체 표본) 인자 목록(공선이면 None)."""
+        states = [CholState(G) for G in self.G_train] + [CholState(self.G_full)]
+        for j in idx:
+            states = self.add(states, j)
+            if states is None:
+                return None
+        return states
+
+    @staticmethod
+    def add(states: List[CholState], j: int) -> Optional[List[CholState]]:
+        out = [s.add(j) for s in states]
+        return None if any(s is None for s in out) else out
+
+    @staticmethod
+    def drop(states: List[CholState], j: int) -> List[CholState]:
+        return [s.drop(j) for s in states]
+
+    def evaluate(self, states: List[CholState]) -> Dict[str, object]:
+        """검증 R²(폴드 평균)·가격 척도 MAPE(평가 표본)·전체 표본 AIC/BIC."""
+        idx = states[-1].idx
+        r2 = np.empty(self.n_folds)
+        ape = np.empty(len(self.eval_fold))
+        for k in range(self.n_folds):
+            beta = states[k].solve(self.b_train[k])
+            Gk = self.G_test[k][np.ix_(idx, idx)]
+            sse = self.yy_test[k] - 2 * beta @ self.b_test[k][idx] + beta @ Gk @ beta
+            # 0번 컬럼이 상수항: 검증 폴드 평균 = b[0]/n (스케일 보정).
+            ybar = self.b_test[k][0] / self.scale[0] / self.n[k]
+            r2[k] = 1 - sse / (self.yy_test[k] - self.n[k] * ybar ** 2)
+            m = self.eval_fold == k
+            if m.any():
+                pred = np.asarray(self.price_fn(self.eval_X[m][:, idx] @ beta), dtype="float64")
+                ape[m] = np.abs(pred - self.eval_price[m]) / np.maximum(np.abs(self.eval_price[m]),
+                                                                        np.finfo("float64").eps)
+        beta = states[-1].solve(self.b_full)
+        n = self.n.sum()
+        sse = max(self.yy_full - 2 * beta @ self.b_full[idx] + beta @ self.G_full[np.ix_(idx, idx)] @ beta, 1e-300)
+        llf = -n / 2 * (np.log(2 * np.pi * sse / n) + 1)
+        k_par = len(idx)
+        return {"n_features": k_par - 1, "cv_r2": float(r2.mean()),
+                "cv_mape": float(ape.mean()) if len(ape) else np.nan,
+                "aic": float(2 * k_par - 2 * llf), "bic": float(k_par * np.log(n) - 2 * llf),
+                "features": [self.names[i] for i in idx if i != 0]}
+
+
+# ---------------------------------------------------------------------------
+# 3. 단계적 탐색.
+# ---------------------------------------------------------------------------
+
+def _better(a: dict, b: Optional[dict], criterion: str) -> bool:
+    if b is None:
+        return True
+    if criterion == "cv_r2":
+        return a["cv_r2"] > b["cv_r2"]
+    return a[criterion] < b[criterion]
+
+
+def stepwise(search: SpecSearch, mode: str = "forward", criterion: str = "bic",
+             include: Sequence[int] = (), candidates: Optional[Sequence[int]] = None,
+             max_features: Optional[int] = None) -> List[Dict[str, object]]:
+    """전진(``forward``) 또는 후진(``backward``) 단계적 탐색.
+
+    각 단계에서 가능한 모든 추가(삭제) 사양을 평가해 기록하고, ``criterion``(``cv_r2``는 클수록,
+    ``aic``/``bic``/``cv_mape``는 작을수록 좋음)이 가장 좋은 사양으로 이동한다. 개선이 없으면
+    멈춘다. 후진 탐색의 시작 사양은 후보를 순서대로 추가하며 공선 피처를 건너뛴 최대 집합이다.
+    반환값의 각 행은 ``step``/``action``/``feature``/``selected``와 ``SpecSearch.evaluate`` 결과.
+    """
+    p = len(search.names)
+    candidates = [j for j in (candidates if candidates is not None else range(1, p)) if j != 0]
+    fixed = [0] + [j for j in include if j != 0]
+    states = search.start(fixed)
+    if states is None:
+        raise ValueError("forced features are collinear")
+    if mode == "backward":
+        for j in candidates:
+            if j not in fixed:
+                states = search.add(states, j) or states
+    elif mode != "forward":
+        raise ValueError(f"unknown search mode: {mode}")
+
+    current = search.evaluate(states)
+    rows = [{"step": 0, "action": "start", "feature": "", "selected": True, **current}]
+    limit = max_features if max_features is not None else p
+    step = 0
+    while True:
+        step += 1
+        in_model = set(states[-1].idx)
+        if mode == "forward":
+            if len(in_model) - 1 >= limit:
+                break
+            moves = [(j, search.add(states, j)) for j in candidates if j not in in_model]
+        else:
+            moves = [(j, search.drop(states, j)) for j in states[-1].idx if j not in fixed]
+        best = None
+        for j, new in moves:
+            if new is None:
+                continue  # 현재 사양과 공선
+            res = search.evaluate(new)
+            rows.append({"step": step, "action": "add" if mode == "forward" else "drop",
+                         "feature": search.names[j], "selected": False, **res})
+            if best is None or _better(res, best[1], criterion):
+                best = (len(rows) - 1, res, new)
+        if best is None or not _better(best[1], current, criterion):
+            break
+        rows[best[0]]["selected"] = True
+        current, states = best[1], best[2]
+    return rows